@@ -0,0 +1,274 @@
+"""
+LXP - Advanced AI development Workshop: cache of agent answers
+
+Many users ask the same questions ("who is on the terrorism list?"). Each one
+runs the full agent loop: several Gemini calls and tool calls. The answer
+cache returns a previous answer instead, in milliseconds and without any LLM
+call. It has two layers:
+
+1. Exact hits: same normalized question, same language, same catalog version
+2. Near hits: a question worded differently ("show me the terrorism list",
+   "terrorism list please"), found with a local character n-gram TF-IDF
+   index (CPU only, no embedding service)
+
+A near hit is only accepted when both questions have the same meaningful
+words once stemmed: only filler words, word order and word forms
+("fugitive", "fugitives") may differ. Numbers, IDs and names must be the
+same, so "fugitives from the Miami office" never returns the answer about
+Dallas, nor "rewards over 500000" the one about 50000.
+
+Answers are tied to the catalog version: as soon as a sync changes the data,
+the whole cache is dropped. Questions that refer to earlier messages ("tell me
+more about him") are never cached, since their answer depends on the
+conversation.
+"""
+
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from deadline import STOPPED_KEY
+from router import split_language
+from text_search import stem
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words that do not change what a question asks for
+FILLER_WORDS = frozenset("""
+a an the of on in to for from with by at about and or me please show list give get display tell find
+can could you would i want need who what which is are was were be do does have has there all any some
+fbi s
+""".split())
+
+# Words that point back at the conversation: the answer depends on the history
+CONTEXT_WORDS = frozenset("""
+he him his she her hers they them their it its this that these those
+one ones more else again also previous above earlier last first second third same other
+""".split())
+
+NGRAM_SIZE = 3
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase a question and keep only its words, single-spaced."""
+    return " ".join(WORD_PATTERN.findall(text.lower()))
+
+
+def failed_step(action: Any, observation: Any) -> bool:
+    """Whether an agent step failed: a tool error or an unparsable LLM reply."""
+    if getattr(action, "tool", None) == "_Exception":
+        return True  # Output parsing error handled by the executor
+    return isinstance(observation, str) and observation.startswith("Error")
+
+
+def content_words(question: str) -> Set[str]:
+    """The words of a normalized question that carry its meaning."""
+    return {word for word in question.split() if word not in FILLER_WORDS}
+
+
+def char_ngrams(question: str) -> Counter:
+    """Character n-grams of a normalized question (words padded with spaces)."""
+    grams = Counter()
+    for word in content_words(question) or question.split():
+        padded = f" {word} "
+        for i in range(len(padded) - NGRAM_SIZE + 1):
+            grams[padded[i:i + NGRAM_SIZE]] += 1
+    return grams
+
+
+class AnswerCache:
+    """
+    Thread-safe LRU cache of agent responses, with exact and near lookups.
+
+    Use it as: check lookup() before running the agent, store() afterwards.
+    Both take the catalog version the answer depends on.
+    """
+
+    def __init__(self, max_entries: int = 500, min_similarity: float = 0.7):
+        """
+        Create an empty cache.
+
+        Args:
+            max_entries: Number of answers kept (least recently used go first)
+            min_similarity: Cosine similarity needed for a near hit (0 to 1)
+        """
+        self.max_entries = max_entries
+        self.min_similarity = min_similarity
+
+        # (language, question) -> response, least recently used first
+        self._entries: "OrderedDict[Tuple[Optional[str], str], Dict[str, Any]]" = OrderedDict()
+        # n-gram -> keys of the entries having it, to find near-hit candidates
+        self._by_ngram: Dict[str, Set[Tuple[Optional[str], str]]] = {}
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cacheable(message: str) -> bool:
+        """Whether a message can be answered without the conversation history."""
+        _, text = split_language(message)
+        question = normalize_question(text)
+        return bool(question) and not (set(question.split()) & CONTEXT_WORDS)
+
+    def lookup(self, message: str, version: int) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached answer to a message.
+
+        Args:
+            message: User message, with its language instruction
+            version: Current catalog version
+
+        Returns:
+            The cached response (`output` and `intermediate_steps`), or None
+        """
+        if not self.cacheable(message):
+            return None
+
+        language, text = split_language(message)
+        key = (language, normalize_question(text))
+
+        with self._lock:
+            self._check_version(version)
+
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return response
+
+            near_key = self._nearest(key)
+            if near_key is not None:
+                self._entries.move_to_end(near_key)
+                self.near_hits += 1
+                return self._entries[near_key]
+
+            self.misses += 1
+            return None
+
+    def store(self, message: str, version: int, response: Dict[str, Any]):
+        """
+        Cache the answer to a message.
+
+        Args:
+            message: User message, with its language instruction
+            version: Catalog version the answer was computed with
+            response: Agent response (`output` and `intermediate_steps`;
+                not stored if `stopped` is set, see deadline.py, or if a
+                step failed)
+        """
+        if not self.cacheable(message) or not response.get("output"):
+            return
+        if response.get(STOPPED_KEY):
+            return  # Iteration or time limit: not an answer worth repeating
+        if any(failed_step(action, observation) for action, observation in response.get("intermediate_steps", [])):
+            return  # Built on a failed tool call: the next attempt may do better
+
+        language, text = split_language(message)
+        key = (language, normalize_question(text))
+
+        with self._lock:
+            self._check_version(version)
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = {
+                "output": response["output"],
+                "intermediate_steps": response.get("intermediate_steps", []),
+            }
+            for gram in char_ngrams(key[1]):
+                self._by_ngram.setdefault(gram, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._by_ngram.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict with exact_hits, near_hits, misses, hit_rate and entries
+        """
+        with self._lock:
+            lookups = self.exact_hits + self.near_hits + self.misses
+            return {
+                'exact_hits': self.exact_hits,
+                'near_hits': self.near_hits,
+                'misses': self.misses,
+                'hit_rate': (self.exact_hits + self.near_hits) / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+            }
+
+    def _check_version(self, version: int):
+        """Drop every answer computed from another catalog version (lock held)."""
+        if version != self._version:
+            self._entries.clear()
+            self._by_ngram.clear()
+            self._version = version
+
+    def _nearest(self, key: Tuple[Optional[str], str]) -> Optional[Tuple[Optional[str], str]]:
+        """
+        Most similar cached question in the same language, if it is close
+        enough to reuse its answer (lock held).
+        """
+        language, question = key
+        grams = char_ngrams(question)
+        if not grams:
+            return None
+
+        # Rare n-grams weigh more (TF-IDF over the cached questions)
+        query_vector = {gram: count * self._idf(gram) for gram, count in grams.items()}
+        query_norm = math.sqrt(sum(weight * weight for weight in query_vector.values()))
+
+        candidates = set()
+        for gram in grams:
+            candidates |= self._by_ngram.get(gram, set())
+
+        scored = []
+        for candidate in candidates:
+            if candidate[0] != language:
+                continue
+
+            candidate_grams = char_ngrams(candidate[1])
+            candidate_vector = {gram: count * self._idf(gram) for gram, count in candidate_grams.items()}
+            dot = sum(weight * candidate_vector.get(gram, 0.0) for gram, weight in query_vector.items())
+            norm = math.sqrt(sum(weight * weight for weight in candidate_vector.values()))
+            score = dot / (query_norm * norm) if query_norm and norm else 0.0
+
+            if score >= self.min_similarity:
+                scored.append((score, candidate))
+
+        for _, candidate in sorted(scored, key=lambda item: item[0], reverse=True):
+            if self._same_meaning(question, candidate[1]):
+                return candidate
+        return None
+
+    def _idf(self, gram: str) -> float:
+        """Smoothed inverse document frequency of an n-gram (at least 1)."""
+        return math.log((1 + len(self._entries)) / (1 + len(self._by_ngram.get(gram, ())))) + 1
+
+    @staticmethod
+    def _same_meaning(question: str, other: str) -> bool:
+        """Whether two questions have the same meaningful words, once stemmed."""
+        words = {stem(word) for word in content_words(question)}
+        return bool(words) and words == {stem(word) for word in content_words(other)}
+
+    def _remove(self, key: Tuple[Optional[str], str]):
+        """Remove an entry and its n-gram postings (lock held)."""
+        del self._entries[key]
+        for gram in char_ngrams(key[1]):
+            keys = self._by_ngram.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_ngram[gram]
@@ -3,13 +3,15 @@ LXP - Advanced AI development Workshop: FBI Chatbot backend
 """
 
 import os
+import threading
 import tools
-from typing import List, Dict, Any
+from typing import Tuple, Dict, Any, List, Optional
 from dotenv import load_dotenv
 
 # LangChain imports - these handle the AI conversation logic
 from langchain.agents import ConversationalChatAgent, AgentExecutor
 from langchain.memory import ConversationBufferMemory
+from langchain_core.language_models import BaseChatModel
 from langchain_core.runnables import RunnableConfig
 from langchain_google_genai import ChatGoogleGenerativeAI
 
@@ -17,7 +19,14 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langfuse.callback import CallbackHandler
 
 # Local imports - our custom prompts and tools
+from answer_cache import AnswerCache
+from catalog import get_catalog
+from deadline import DeadlineAgentExecutor, DeadlineBinding, DeadlineChatAgent, turn_deadline
+from metrics import MetricsCallbackHandler, get_metrics
 from prompts import SYSTEM_PROMPT, TOOLS_PROMPT
+from router import IntentRouter
+from streaming import AnswerStream
+from tracing import BackgroundCallbackHandler
 
 # Remove single-input tool validation from ConversationalChatAgent
 ConversationalChatAgent._validate_tools = lambda *_, **__: ...
@@ -38,7 +47,7 @@ class ChatBackend:
     - Allows for easy testing and modification
     """
     
-    def __init__(self):
+    def __init__(self, llm: Optional[BaseChatModel] = None, tracing: bool = True):
         """
         Initialize the FBI chatbot backend with all necessary components.
         
@@ -47,6 +56,11 @@ class ChatBackend:
         2. Sets up monitoring with Langfuse
         3. Initializes the LLM model
         4. Prepares available FBI tools
+        
+        Args:
+            llm: Chat model to use instead of Gemini (e.g. the scripted model
+                of the benchmarks, see benchmarks/fake_llm.py)
+            tracing: Whether to send traces to Langfuse
         """
         # Load environment variables from config.env file
         # This keeps sensitive information like API keys out of the code
@@ -60,17 +74,44 @@ class ChatBackend:
         # This helps track usage, costs, and performance
         self.langfuse_public_key = os.getenv("LANGFUSE_PUBLIC_KEY")
         self.langfuse_secret_key = os.getenv("LANGFUSE_SECRET_KEY")
-        self.langfuse_handler = self._setup_langfuse()
+        self.langfuse_handler = self._setup_langfuse() if tracing else None
+        
+        # Local latency histograms (LLM calls, tools, agent iterations),
+        # shown in the sidebar; see metrics.py
+        self.metrics_handler = MetricsCallbackHandler(get_metrics())
+        
+        # Time budget of a whole turn, shared by every LLM call and FBI API
+        # request it makes; when it runs out, the agent answers with what it
+        # has found so far (see deadline.py)
+        self.turn_budget = float(os.getenv("TURN_BUDGET_SECONDS", "60"))
         
         # Initialize the AI model
         # We use Google's Gemini model here, but this could be swapped for others
-        self.llm = self._setup_llm()
+        self.llm = llm if llm is not None else self._setup_llm()
         
         # Set up available FBI tools the AI can use
         # Tools extend what the AI can do beyond just text generation
         self.tools = self._setup_tools()
+        
+        # Build the agent and a memory-less executor once; each session's
+        # memory is bound at call time (see process_message)
+        self.agent = self._setup_agent()
+        self.agent_executor = self._build_executor(memory=None)
+        
+        # Simple questions ("show me the most wanted list") are answered by
+        # one tool call, without the LLM (see router.py)
+        router_enabled = os.getenv("INTENT_ROUTER_ENABLED", "true").lower() != "false"
+        self.router = IntentRouter() if router_enabled else None
+        
+        # Answers to repeated questions, valid until the catalog changes
+        # (see answer_cache.py)
+        cache_enabled = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() != "false"
+        self.answer_cache = AnswerCache(
+            max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "500")),
+            min_similarity=float(os.getenv("ANSWER_CACHE_MIN_SIMILARITY", "0.7")),
+        ) if cache_enabled else None
     
-    def _setup_langfuse(self) -> CallbackHandler:
+    def _setup_langfuse(self) -> BackgroundCallbackHandler:
         """
         Set up Langfuse monitoring for the AI conversations.
         
@@ -80,16 +121,26 @@ class ChatBackend:
         - Debug issues with AI responses
         - Analyze user interactions
         
+        The handler is wrapped so that its work happens in a background
+        thread: tracing never slows down a user turn, and if Langfuse cannot
+        keep up, events are dropped (and counted) instead (see tracing.py).
+        
         Returns:
-            CallbackHandler: Configured Langfuse handler
+            BackgroundCallbackHandler: Configured Langfuse handler
         """
-        return CallbackHandler(
+        handler = CallbackHandler(
             # These keys allow Langfuse to track your AI usage
             # In production, these should come from environment variables too
             public_key=self.langfuse_public_key,
             secret_key=self.langfuse_secret_key,
             host="https://us.cloud.langfuse.com"
         )
+        return BackgroundCallbackHandler(
+            handler,
+            max_events=int(os.getenv("TRACING_QUEUE_MAX_EVENTS", "10000")),
+            batch_size=int(os.getenv("TRACING_BATCH_SIZE", "100")),
+            flush_interval=float(os.getenv("TRACING_FLUSH_INTERVAL_SECONDS", "1.0")),
+        )
     
     def _setup_llm(self) -> ChatGoogleGenerativeAI:
         """
@@ -106,7 +157,7 @@ class ChatBackend:
             model="gemini-2.5-flash-preview-05-20"  # Specific model version
         )
     
-    def _setup_tools(self) -> List:
+    def _setup_tools(self) -> Tuple:
         """
         Set up FBI tools that the AI can use during conversations.
         
@@ -124,23 +175,64 @@ class ChatBackend:
         3. Add it to the list returned here
         
         Returns:
-            List: Available FBI tools for the AI agent
+            Tuple: Available FBI tools for the AI agent (immutable, since the
+            backend is shared by every session)
         """
-        return [
+        return (
             tools.get_fbi_most_wanted,              # Get FBI most wanted list
             tools.search_fbi_person_by_name,        # Search person by name
             tools.search_fbi_by_field_office_tool,  # Search by FBI field office
             tools.search_fbi_by_status_tool,        # Search by status (captured, etc.)
             tools.search_fbi_by_classification_tool, # Search by classification (main, vicap, etc.)
             tools.get_fbi_person_details_tool,      # Get detailed person info by ID
+            tools.get_fbi_person_section_tool,      # Get one long section of a record in full
             tools.get_fbi_terrorism_list,           # Get terrorism list
             tools.get_fbi_by_poster_classification, # Search by poster classification
             tools.get_fbi_advanced_search,          # Advanced search with sorting
+            tools.search_fbi_by_criteria_tool,      # Combined office/status/category search
+            tools.aggregate_fbi_cases,              # Counts and reward statistics per group
+            tools.search_fbi_by_description,        # Full-text search of case narratives
             # You can include additional tools here as needed:
             # search_by_reward_amount,
             # get_fugitive_alerts,
             # search_by_crime_date,
-        ]
+        )
+    
+    def _setup_agent(self) -> DeadlineChatAgent:
+        """
+        Create the conversational agent: the LLM plus its prompt and tools.
+        
+        Rendering the prompt template and the tool descriptions is the
+        expensive part of building an agent, so it is done once per backend
+        and shared by every conversation.
+        
+        Returns:
+            DeadlineChatAgent: Agent ready to decide which FBI tools to use
+        """
+        # This agent knows how to use FBI tools and maintain conversation context.
+        # Its LLM calls use Gemini's streaming API, so the final answer can be
+        # shown token by token (see stream_message), and each call's timeout
+        # is the time left in the turn
+        return DeadlineChatAgent.from_llm_and_tools(
+            llm=DeadlineBinding(bound=self.llm, kwargs={"stream": True}),
+            tools=self.tools,
+            system_message=SYSTEM_PROMPT,  # Defines the AI's personality and behavior
+            human_message=TOOLS_PROMPT,    # Instructions for how to use tools
+            verbose=True  # Enables detailed logging (helpful for debugging)
+        )
+    
+    def _build_executor(self, memory: Optional[ConversationBufferMemory]) -> AgentExecutor:
+        """Wrap the shared agent in an executor, optionally bound to a memory."""
+        # The executor handles the conversation flow and FBI tool usage,
+        # and stops at the turn's deadline
+        return DeadlineAgentExecutor.from_agent_and_tools(
+            agent=self.agent,
+            tools=self.tools,
+            memory=memory,
+            return_intermediate_steps=True,  # Shows FBI tool usage in UI
+            handle_parsing_errors=True,      # Gracefully handles AI mistakes
+            verbose=True                     # Detailed logging
+        )
     
     def create_agent_executor(self, memory: ConversationBufferMemory) -> AgentExecutor:
         """
@@ -152,39 +244,56 @@ class ChatBackend:
         3. Uses tools to gather information from the FBI database
         4. Formulates a response based on FBI data and conversation history
         
+        The agent itself is shared; only a light executor holding `memory` is
+        created. Prefer process_message(message, memory=memory), which needs
+        no executor at all.
+        
         Args:
             memory: Conversation history to maintain context
             
         Returns:
             AgentExecutor: Configured AI agent ready to help with FBI inquiries
         """
-        # Create the conversational agent
-        # This agent knows how to use FBI tools and maintain conversation context
-        chat_agent = ConversationalChatAgent.from_llm_and_tools(
-            llm=self.llm,
-            tools=self.tools,
-            system_message=SYSTEM_PROMPT,  # Defines the AI's personality and behavior
-            human_message=TOOLS_PROMPT,    # Instructions for how to use tools
-            verbose=True  # Enables detailed logging (helpful for debugging)
-        )
+        return self._build_executor(memory)
+    
+    def _monitoring_callbacks(self) -> List:
+        """Callback handlers attached to every run: Langfuse (if enabled) and metrics."""
+        return [handler for handler in (self.langfuse_handler, self.metrics_handler) if handler is not None]
+    
+    def _prepare_turn(self,
+                      message: str,
+                      executor: Optional[AgentExecutor],
+                      memory: Optional[ConversationBufferMemory],
+                      streamlit_callback,
+                      callbacks: Optional[List] = None) -> Tuple[AgentExecutor, Any, RunnableConfig]:
+        """
+        Pick the executor, inputs and config for one conversation turn.
         
-        # Create the executor that runs the agent
-        # The executor handles the conversation flow and FBI tool usage
-        executor = AgentExecutor.from_agent_and_tools(
-            agent=chat_agent,
-            tools=self.tools,
-            memory=memory,
-            return_intermediate_steps=True,  # Shows FBI tool usage in UI
-            handle_parsing_errors=True,      # Gracefully handles AI mistakes
-            verbose=True                     # Detailed logging
-        )
-
-        return executor
+        Without an explicit executor the shared one is used, and the
+        session's history is loaded from `memory` into the inputs.
+        """
+        # Set up callbacks for monitoring and UI updates
+        handlers = self._monitoring_callbacks()
+        if streamlit_callback:
+            handlers.append(streamlit_callback)
+        handlers.extend(callbacks or [])
+        
+        # Configure the execution
+        config = RunnableConfig()
+        config["callbacks"] = handlers
+        
+        if executor is not None:
+            return executor, message, config
+        
+        history = memory.load_memory_variables({}) if memory is not None else {"chat_history": []}
+        return self.agent_executor, {"input": message, **history}, config
     
     def process_message(self, 
                        message: str, 
-                       executor: AgentExecutor, 
-                       streamlit_callback=None) -> Dict[str, Any]:
+                       executor: Optional[AgentExecutor] = None, 
+                       streamlit_callback=None,
+                       memory: Optional[ConversationBufferMemory] = None,
+                       callbacks: Optional[List] = None) -> Dict[str, Any]:
         """
         Process a user message about FBI wanted persons and generate an AI response.
         
@@ -195,36 +304,190 @@ class ChatBackend:
         
         Args:
             message: User's input message (FBI-related query)
-            executor: The AI agent executor
+            executor: Optional executor from create_agent_executor(); by
+                default the shared executor is used with `memory`
             streamlit_callback: Optional callback for UI updates
+            memory: This session's conversation memory (when no executor is given)
+            callbacks: Extra callback handlers for the agent run
             
         Returns:
             Dict containing the AI response and intermediate FBI tool steps
         """
-        # Set up callbacks for monitoring and UI updates
-        callbacks = [self.langfuse_handler]
-        if streamlit_callback:
-            callbacks.append(streamlit_callback)
+        # Everything the turn does shares one time budget (see deadline.py)
+        with turn_deadline(self.turn_budget):
+            return self._process_message(message, executor, streamlit_callback, memory, callbacks)
+    
+    def _process_message(self,
+                         message: str,
+                         executor: Optional[AgentExecutor],
+                         streamlit_callback,
+                         memory: Optional[ConversationBufferMemory],
+                         callbacks: Optional[List]) -> Dict[str, Any]:
+        """Body of process_message(), run within the turn's deadline."""
+        # A question asked before is answered from the cache, as long as
+        # the catalog has not changed since
+        version = self._cache_version()
+        if self.answer_cache is not None and version is not None:
+            response = self.answer_cache.lookup(message, version)
+            if response is not None:
+                get_metrics().increment("turn.answer_cache")
+                self._remember(message, response, memory if executor is None else executor.memory)
+                return response
         
-        # Configure the execution
-        config = RunnableConfig()
-        config["callbacks"] = callbacks
+        # Then the fast path: one tool call, no LLM
+        if self.router is not None:
+            response = self.router.route(message, callbacks=self._monitoring_callbacks())
+            if response is not None:
+                get_metrics().increment("turn.router")
+                self._remember(message, response, memory if executor is None else executor.memory)
+                return response
+        
+        executor, inputs, config = self._prepare_turn(message, executor, memory, streamlit_callback, callbacks)
         
         # Process the message through the AI agent
         # This is where the AI thinks, uses FBI tools, and generates a response
-        response = executor.invoke(message, config)
+        response = executor.invoke(inputs, config)
+        
+        # The shared executor has no memory of its own: record the turn
+        if executor is self.agent_executor:
+            self._remember(message, response, memory)
+        
+        if self.answer_cache is not None and version is not None:
+            self.answer_cache.store(message, version, response)
         
         return response
+    
+    def stream_message(self,
+                       message: str,
+                       streamlit_callback=None,
+                       memory: Optional[ConversationBufferMemory] = None,
+                       thread_initializer=None) -> AnswerStream:
+        """
+        Process a message like process_message(), yielding the answer as it is written.
+        
+        The turn runs in a worker thread; iterating over the returned stream
+        gives the final answer's text as Gemini produces it, so the user sees
+        the first words without waiting for the whole answer.
+        
+        Args:
+            message: User's input message (FBI-related query)
+            streamlit_callback: Optional callback for UI updates
+            memory: This session's conversation memory
+            thread_initializer: Called with the worker thread before it starts
+            
+        Returns:
+            AnswerStream: Iterable of text pieces; its `response` attribute
+            holds the full response once the iteration is over
+        """
+        return AnswerStream(
+            lambda handler: self.process_message(
+                message, streamlit_callback=streamlit_callback, memory=memory, callbacks=[handler]
+            ),
+            thread_initializer=thread_initializer,
+        )
+    
+    async def aprocess_message(self,
+                               message: str,
+                               executor: Optional[AgentExecutor] = None,
+                               streamlit_callback=None,
+                               memory: Optional[ConversationBufferMemory] = None) -> Dict[str, Any]:
+        """
+        Async version of process_message().
+        
+        The agent runs with `ainvoke`: Gemini is called through its async API
+        and tools run their coroutine implementations, so a single event loop
+        can serve many conversations without dedicating a thread to each.
+        
+        Args:
+            message: User's input message (FBI-related query)
+            executor: Optional executor from create_agent_executor()
+            streamlit_callback: Optional callback for UI updates
+            memory: This session's conversation memory (when no executor is given)
+            
+        Returns:
+            Dict containing the AI response and intermediate FBI tool steps
+        """
+        with turn_deadline(self.turn_budget):
+            return await self._aprocess_message(message, executor, streamlit_callback, memory)
+    
+    async def _aprocess_message(self,
+                                message: str,
+                                executor: Optional[AgentExecutor],
+                                streamlit_callback,
+                                memory: Optional[ConversationBufferMemory]) -> Dict[str, Any]:
+        """Body of aprocess_message(), run within the turn's deadline."""
+        version = self._cache_version()
+        if self.answer_cache is not None and version is not None:
+            response = self.answer_cache.lookup(message, version)
+            if response is not None:
+                get_metrics().increment("turn.answer_cache")
+                self._remember(message, response, memory if executor is None else executor.memory)
+                return response
+        
+        if self.router is not None:
+            response = await self.router.aroute(message, callbacks=self._monitoring_callbacks())
+            if response is not None:
+                get_metrics().increment("turn.router")
+                self._remember(message, response, memory if executor is None else executor.memory)
+                return response
+        
+        executor, inputs, config = self._prepare_turn(message, executor, memory, streamlit_callback)
+        
+        response = await executor.ainvoke(inputs, config)
+        
+        if executor is self.agent_executor:
+            self._remember(message, response, memory)
+        
+        if self.answer_cache is not None and version is not None:
+            self.answer_cache.store(message, version, response)
+        
+        return response
+    
+    @staticmethod
+    def _cache_version() -> Optional[int]:
+        """
+        Catalog version to key the answer cache with, or None to bypass the cache.
+        
+        This never waits for the FBI API: a due refresh of a populated
+        catalog runs in the background, and an empty one is left to the tools
+        to sync if the turn needs data. While the catalog is empty or its
+        last sync failed, answers are neither looked up nor stored.
+        """
+        catalog = get_catalog()
+        if not len(catalog):
+            return None
+        catalog.ensure_fresh()  # Only starts a background sync: the catalog has records
+        if catalog.last_sync_error is not None:
+            return None
+        return catalog.version
+    
+    @staticmethod
+    def _remember(message: str, response: Dict[str, Any], memory: Optional[ConversationBufferMemory]):
+        """Record a turn in the session's memory, if there is one."""
+        if memory is not None:
+            memory.save_context({"input": message}, {"output": response["output"]})
+
+
+_backend_instance = None
+_backend_lock = threading.Lock()
 
 
 def get_backend_instance() -> ChatBackend:
     """
-    Factory function to get a ChatBackend instance.
+    Get the process-wide ChatBackend instance, creating it on first use.
     
-    This function provides a clean way for the frontend to get a backend instance
-    without needing to understand the initialization details.
+    The backend holds no per-conversation state (memory lives in each
+    session), so a single instance - one LLM client, one Langfuse handler,
+    one tool list - is shared by every session and every Streamlit rerun.
+    The lock makes sure concurrent first requests build it only once.
     
     Returns:
         ChatBackend: Ready-to-use FBI chatbot backend instance
     """
-    return ChatBackend()
\ No newline at end of file
+    global _backend_instance
+    
+    if _backend_instance is None:
+        with _backend_lock:
+            if _backend_instance is None:
+                _backend_instance = ChatBackend()
+    return _backend_instance
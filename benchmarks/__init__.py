@@ -0,0 +1,10 @@
+"""
+LXP - Advanced AI development Workshop: offline benchmarks
+
+Run from the repository root:
+
+    python -m benchmarks.run
+
+See run.py for the scenarios, mock_fbi_server.py for the local stand-in of
+api.fbi.gov and fake_llm.py for the scripted chat model replacing Gemini.
+"""
@@ -0,0 +1,130 @@
+"""
+LXP - Advanced AI development Workshop: scripted chat model
+
+Stands in for Gemini in the benchmarks. It answers like the agent's LLM
+would, with the JSON blobs ConversationalChatAgent expects:
+
+- to a user message matching one of its rules: the rule's tool call
+- to a tool response: a final answer quoting the start of the tool output
+- to anything else: a fixed final answer
+
+Replies depend only on the messages, not on call order, so one instance can
+serve any number of concurrent conversations. Latency (time to first token
+and time per token) is configurable, replies can be streamed, and like
+Gemini a call given a `timeout` fails with TimeoutError once it is reached.
+"""
+
+import json
+import re
+import time
+from typing import Any, Iterator, List, Optional, Tuple
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# Marker of the agent's message carrying a tool output
+TOOL_RESPONSE = "TOOL RESPONSE:"
+
+# The user's text follows this sentence in the agent's prompt (see TOOLS_PROMPT)
+USER_INPUT_MARKER = "NOTHING else):"
+
+DEFAULT_ANSWER = "I can only help with questions about FBI wanted persons."
+
+
+def agent_reply(action: str, action_input: str) -> str:
+    """Format a reply the way the agent's output parser expects it."""
+    return "```json\n" + json.dumps({"action": action, "action_input": action_input}, indent=4) + "\n```"
+
+
+class ScriptedChatModel(BaseChatModel):
+    r"""
+    Chat model replying from a script of (regex, tool, tool input) rules.
+    The tool input may refer to the groups of the regex (\1, \g<name>).
+
+    Example:
+        ScriptedChatModel(rules=[(r"most wanted", "get_fbi_most_wanted", ""),
+                                 (r"details for ([0-9a-f]{32})", "get_fbi_person_details", r"\1")])
+    """
+
+    rules: List[Tuple[str, str, str]] = []
+    first_token_latency: float = 0.0  # Seconds before the first token
+    token_latency: float = 0.0        # Seconds between two tokens
+    answer_chars: int = 300           # Length of the tool output quoted in final answers
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def reply(self, messages: List[BaseMessage]) -> str:
+        """The reply to a conversation."""
+        last = next((m for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+        text = last.content if last is not None and isinstance(last.content, str) else ""
+
+        if text.startswith(TOOL_RESPONSE):
+            observation = text[len(TOOL_RESPONSE):].split("USER'S INPUT", 1)[0].strip("-\n ")
+            return agent_reply("Final Answer", "Here is what I found: " + observation[:self.answer_chars])
+
+        user_input = text.rsplit(USER_INPUT_MARKER, 1)[-1].strip()
+        for pattern, tool, tool_input in self.rules:
+            match = re.search(pattern, user_input, re.IGNORECASE)
+            if match:
+                return agent_reply(tool, match.expand(tool_input))
+        return agent_reply("Final Answer", DEFAULT_ANSWER)
+
+    @staticmethod
+    def _usage(messages: List[BaseMessage], reply: str) -> dict:
+        """Token counts estimated at 4 characters per token."""
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        output_tokens = len(reply) // 4
+        return {'input_tokens': input_tokens, 'output_tokens': output_tokens,
+                'total_tokens': input_tokens + output_tokens}
+
+    def _generate(self,
+                  messages: List[BaseMessage],
+                  stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None,
+                  **kwargs: Any) -> ChatResult:
+        reply = self.reply(messages)
+        _wait(self.first_token_latency + self.token_latency * len(_tokens(reply)), _call_deadline(kwargs))
+        message = AIMessage(content=reply, usage_metadata=self._usage(messages, reply))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self,
+                messages: List[BaseMessage],
+                stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None,
+                **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        reply = self.reply(messages)
+        deadline = _call_deadline(kwargs)
+        _wait(self.first_token_latency, deadline)
+
+        tokens = _tokens(reply)
+        for i, token in enumerate(tokens):
+            if i:
+                _wait(self.token_latency, deadline)
+            usage = self._usage(messages, reply) if i == len(tokens) - 1 else None
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token, usage_metadata=usage))
+            if run_manager is not None:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+def _tokens(text: str) -> List[str]:
+    """Split a reply into pseudo-tokens (about 4 characters each)."""
+    return [text[i:i + 4] for i in range(0, len(text), 4)] or [""]
+
+
+def _call_deadline(kwargs: dict) -> Optional[float]:
+    """Monotonic time at which a call given a `timeout` must fail."""
+    timeout = kwargs.get('timeout')
+    return time.monotonic() + timeout if timeout is not None else None
+
+
+def _wait(seconds: float, deadline: Optional[float]):
+    """Sleep `seconds`, or until `deadline` and then raise TimeoutError."""
+    if deadline is not None and time.monotonic() + seconds > deadline:
+        time.sleep(max(deadline - time.monotonic(), 0))
+        raise TimeoutError("Scripted model call timed out")
+    time.sleep(seconds)
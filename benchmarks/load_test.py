@@ -0,0 +1,241 @@
+"""
+LXP - Advanced AI development Workshop: multi-session load test
+
+Drives many simulated chat sessions through one ChatBackend at once, the way
+a Streamlit server does (one thread per running script), against the mock FBI
+API and the scripted LLM. Each session has its own SummaryWindowMemory, like
+a browser tab, and sends its turns one at a time.
+
+Turns arrive at a fixed average rate (Poisson arrivals, open loop: new turns
+keep arriving even when the process falls behind). The test runs one stage
+per rate and reports, for each: achieved throughput, latency percentiles
+(measured from the arrival of the turn, so waiting counts), errors, thread
+count and memory growth. The first stage where throughput falls behind the
+arrival rate, or p95 latency exceeds the target, is the saturation point.
+
+    python -m benchmarks.load_test --sessions 50 --rates 2,5,10,20,40 --llm-latency-ms 300
+    python -m benchmarks.load_test --executor-per-session --json load.json
+"""
+
+import argparse
+import json
+import random
+import resource
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from langchain_core.chat_history import InMemoryChatMessageHistory
+
+from benchmarks.run import add_stack_arguments, percentile, start_stack
+from memory import SummaryWindowMemory
+
+
+def rss_kib() -> float:
+    """Current resident memory of the process in KiB (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Session:
+    """One simulated user: a memory, optionally an executor, and a script of questions."""
+
+    def __init__(self, backend, questions: List[str], executor_per_session: bool):
+        self.memory = SummaryWindowMemory(
+            llm=backend.llm,
+            chat_memory=InMemoryChatMessageHistory(),
+            return_messages=True,
+            memory_key="chat_history",
+            output_key="output",
+        )
+        self.executor = None
+        if executor_per_session:
+            self.executor = backend.create_agent_executor(self.memory)
+            self.executor.verbose = False
+        self.questions = questions
+        self.turns = 0
+        self.lock = threading.Lock()  # A user waits for an answer before asking again
+
+    def next_question(self) -> str:
+        question = self.questions[self.turns % len(self.questions)]
+        self.turns += 1
+        return question
+
+
+def session_questions(catalog, count: int, seed: int) -> List[List[str]]:
+    """
+    Scripts of the simulated users: an agent question, a follow-up, a
+    details request and a question answered by the router. Offices and
+    persons vary between sessions, so the answer cache gets some hits but
+    not only hits.
+    """
+    rng = random.Random(seed)
+    offices = catalog.vocabulary('field_offices')
+    uids = [person.uid for person in catalog.query({'pageSize': 50})['items']]
+
+    return [[
+        f"Which captured fugitives come from the {rng.choice(offices)} office?",
+        "Tell me more about the first one",
+        f"Tell me everything about {rng.choice(uids)}",
+        "Show me the most wanted list",
+    ] for _ in range(count)]
+
+
+class ThreadSampler:
+    """Samples the number of live threads in the background, keeping the peak."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="thread-sampler")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self) -> "ThreadSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_stage(backend, sessions: List[Session], pool: ThreadPoolExecutor,
+              rate: float, duration: float, rng: random.Random) -> Dict[str, Any]:
+    """
+    Send turns at `rate` per second for `duration` seconds, then wait for them.
+
+    Returns:
+        Dict with the stage's statistics (latencies in milliseconds)
+    """
+    latencies: List[float] = []
+    service_times: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def turn(session: Session, arrival: float):
+        with session.lock:
+            started = time.perf_counter()
+            try:
+                message = session.next_question()
+                if session.executor is not None:
+                    backend.process_message(message, executor=session.executor)
+                else:
+                    backend.process_message(message, memory=session.memory)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+            finished = time.perf_counter()
+        with lock:
+            latencies.append((finished - arrival) * 1000)
+            service_times.append((finished - started) * 1000)
+
+    rss_before = rss_kib()
+    futures = []
+    with ThreadSampler() as threads:
+        stage_start = time.perf_counter()
+        next_arrival = stage_start
+        while next_arrival < stage_start + duration:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            session = sessions[len(futures) % len(sessions)]
+            futures.append(pool.submit(turn, session, next_arrival))
+            next_arrival += rng.expovariate(rate)
+
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - stage_start
+
+    return {
+        'rate': rate,
+        'turns': len(futures),
+        'throughput_per_s': len(futures) / elapsed,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'service_p50_ms': percentile(service_times, 50),
+        'errors': errors[0],
+        'peak_threads': threads.peak,
+        'rss_growth_kib': rss_kib() - rss_before,
+    }
+
+
+def saturation_point(stages: List[Dict[str, Any]], slo_ms: float) -> Optional[Dict[str, Any]]:
+    """First stage falling behind its arrival rate or over the p95 target."""
+    for stage in stages:
+        if stage['throughput_per_s'] < 0.9 * stage['rate'] or stage['p95_ms'] > slo_ms:
+            return stage
+    return None
+
+
+def print_report(stages: List[Dict[str, Any]], slo_ms: float, rss_start: float):
+    """Print the stages as a table, followed by the saturation point."""
+    header = (f"{'rate/s':>7} {'turns':>6} {'done/s':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+              f"{'svc p50':>9} {'errors':>6} {'threads':>7} {'RSS +KiB':>9}")
+    print(header)
+    print("-" * len(header))
+    for stage in stages:
+        print(f"{stage['rate']:>7.1f} {stage['turns']:>6} {stage['throughput_per_s']:>7.1f} "
+              f"{stage['p50_ms']:>9.1f} {stage['p95_ms']:>9.1f} {stage['p99_ms']:>9.1f} "
+              f"{stage['service_p50_ms']:>9.1f} {stage['errors']:>6} {stage['peak_threads']:>7} "
+              f"{stage['rss_growth_kib']:>9.0f}")
+
+    print(f"\nMemory: {rss_start / 1024:.1f} MiB at start, {rss_kib() / 1024:.1f} MiB at the end")
+    saturated = saturation_point(stages, slo_ms)
+    if saturated is None:
+        print(f"No saturation up to {stages[-1]['rate']:.1f} turns/s (p95 target {slo_ms:.0f} ms)")
+    else:
+        print(f"Saturated at {saturated['rate']:.1f} turns/s: {saturated['throughput_per_s']:.1f} turns/s done, "
+              f"p95 {saturated['p95_ms']:.0f} ms (target {slo_ms:.0f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent multi-session load test of the FBI assistant")
+    parser.add_argument("--sessions", type=int, default=20, help="Number of simulated users")
+    parser.add_argument("--rates", default="1,2,5,10,20", help="Comma-separated arrival rates (turns per second)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of arrivals per stage")
+    parser.add_argument("--workers", type=int, default=64, help="Threads serving turns (Streamlit: one per session)")
+    parser.add_argument("--slo-ms", type=float, default=5000.0, help="p95 latency target")
+    parser.add_argument("--executor-per-session", action="store_true",
+                        help="Give each session its own executor (create_agent_executor) instead of the shared one")
+    parser.add_argument("--seed", type=int, default=7)
+    add_stack_arguments(parser)
+    parser.add_argument("--json", metavar="PATH", help="Also write the results to PATH")
+    args = parser.parse_args()
+
+    rss_start = rss_kib()
+    server, backend, catalog = start_stack(args)
+    rng = random.Random(args.seed)
+
+    scripts = session_questions(catalog, args.sessions, args.seed)
+    sessions = [Session(backend, questions, args.executor_per_session) for questions in scripts]
+
+    stages = []
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="session") as pool:
+            for rate in (float(value) for value in args.rates.split(",")):
+                stage = run_stage(backend, sessions, pool, rate, args.duration, rng)
+                stages.append(stage)
+                print(f"  done: {rate:.1f} turns/s (p95 {stage['p95_ms']:.0f} ms)", flush=True)
+    finally:
+        server.stop()
+
+    print()
+    print_report(stages, args.slo_ms, rss_start)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({'settings': vars(args), 'stages': stages,
+                       'saturation': saturation_point(stages, args.slo_ms)}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
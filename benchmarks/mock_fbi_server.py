@@ -0,0 +1,299 @@
+"""
+LXP - Advanced AI development Workshop: local stand-in for the FBI API
+
+Serves /wanted/v1/list and /@wanted-person/<uid> from records kept in memory,
+with configurable latency and error rate, so the catalog, the tools and the
+backend can be measured without api.fbi.gov. Point the app at it with
+FBI_API_BASE_URL.
+
+The records come from a recording of the real API (see --record) or, by
+default, from a deterministic synthetic dataset shaped like it.
+
+    # Record the real list once
+    python -m benchmarks.mock_fbi_server --record benchmarks/data/wanted.json
+
+    # Serve it with 80 ms of latency and 1% of errors
+    python -m benchmarks.mock_fbi_server --data benchmarks/data/wanted.json --latency-ms 80 --error-rate 0.01
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+LIST_PATH = "/wanted/v1/list"
+PERSON_PREFIX = "/@wanted-person/"
+
+MAX_PAGE_SIZE = 50  # Like the real API
+
+FIELD_OFFICES = ["miami", "newyork", "chicago", "dallas", "losangeles", "phoenix", "cincinnati", "littlerock"]
+SUBJECTS = [
+    "Violent Crime - Murders", "Seeking Information - Terrorism", "Most Wanted Terrorists",
+    "Kidnappings and Missing Persons", "ViCAP Missing Persons", "Cyber's Most Wanted",
+    "Ten Most Wanted Fugitives", "Criminal Enterprise Investigations", "White-Collar Crime",
+]
+FIRST_NAMES = ["JOHN", "MARIA", "ROBERT", "ALEKSEI", "WEI", "FATIMA", "CARLOS", "EMILY", "OMAR", "SVETLANA"]
+LAST_NAMES = ["SMITH", "GARCIA", "IVANOV", "CHEN", "HASSAN", "MARTINEZ", "JOHNSON", "NGUYEN", "DIXON", "PIKE"]
+CRIMES = ["Murder", "Armed robbery", "Wire fraud", "Kidnapping", "Bombing", "Computer intrusion", "Racketeering"]
+PLACES = ["Miami, Florida", "Dallas, Texas", "Chicago, Illinois", "Phoenix, Arizona", "New York, New York"]
+
+
+def synthetic_records(count: int = 1000, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generate records shaped like the FBI API's, always the same for a seed.
+
+    Args:
+        count: Number of records
+        seed: Random seed
+
+    Returns:
+        List of records
+    """
+    rng = random.Random(seed)
+    records = []
+
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        crime, place = rng.choice(CRIMES), rng.choice(PLACES)
+        year = rng.randint(2005, 2025)
+        narrative = (f"<p>{first.title()} {last.title()} is wanted for {crime.lower()} committed in "
+                     f"{place} in {year}. ") + "Witnesses described a dark sedan leaving the scene. " * rng.randint(1, 8) + "</p>"
+
+        records.append({
+            'uid': f"{rng.getrandbits(128):032x}",
+            'title': f"{first} {last}",
+            'aliases': [f"{first.title()} {rng.choice(LAST_NAMES).title()}"] if rng.random() < 0.5 else None,
+            'subjects': [rng.choice(SUBJECTS)],
+            'field_offices': [rng.choice(FIELD_OFFICES)],
+            'status': "captured" if rng.random() < 0.2 else "na",
+            'person_classification': rng.choice(["Main", "Main", "Victim", "Accomplice"]),
+            'poster_classification': rng.choice(["default", "default", "missing", "information", "terrorist"]),
+            'reward_text': f"The FBI is offering a reward of up to ${rng.choice([10, 25, 50, 100, 250])},000." if rng.random() < 0.6 else None,
+            'description': f"<p>{crime}; Unlawful Flight to Avoid Prosecution</p>",
+            'caution': narrative,
+            'details': narrative if rng.random() < 0.3 else None,
+            'remarks': f"<p>May travel to {rng.choice(PLACES)}.</p>",
+            'warning_message': "SHOULD BE CONSIDERED ARMED AND DANGEROUS" if rng.random() < 0.3 else None,
+            'sex': rng.choice(["Male", "Female"]),
+            'race_raw': rng.choice(["White", "Black", "Hispanic", "Asian"]),
+            'hair_raw': rng.choice(["Black", "Brown", "Blond", "Gray"]),
+            'eyes_raw': rng.choice(["Brown", "Blue", "Green", "Hazel"]),
+            'height_min': rng.randint(60, 70), 'height_max': rng.randint(70, 76),
+            'weight': f"{rng.randint(120, 240)} pounds",
+            'nationality': rng.choice(["American", "Mexican", "Russian", "Chinese", None]),
+            'scars_and_marks': "Tattoo on the left forearm" if rng.random() < 0.3 else None,
+            'images': [{'original': f"https://example.invalid/{i}.jpg", 'thumb': None, 'large': None, 'caption': None}],
+            'files': [{'url': f"https://example.invalid/{i}.pdf", 'name': "English"}],
+            'url': f"https://www.fbi.gov/wanted/{last.lower()}-{i}",
+            'publication': f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00",
+            'modified': f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{i % 60:02d}:00+00:00",
+        })
+
+    return records
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    """Load records recorded with --record (a JSON list of records)."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def record_api(path: str, base_url: str = "https://api.fbi.gov", max_pages: int = 200):
+    """
+    Download the whole list from the real API and save it for --data.
+
+    Args:
+        path: JSON file to write
+        base_url: API to record
+        max_pages: Safety limit on the number of pages
+    """
+    import requests
+
+    records = []
+    for page in range(1, max_pages + 1):
+        response = requests.get(f"{base_url}{LIST_PATH}",
+                                params={'page': page, 'pageSize': MAX_PAGE_SIZE, 'sort_on': 'modified', 'sort_order': 'desc'},
+                                timeout=30)
+        response.raise_for_status()
+        items = response.json().get('items', [])
+        if not items:
+            break
+        records.extend(items)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f)
+    print(f"Recorded {len(records)} records to {path}")
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: "MockFBIServer"
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        server.count_request()
+
+        delay = server.latency + server.rng_uniform(0, server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if server.rng_uniform(0, 1) < server.error_rate:
+            self._send(503, {'error': "Injected error"})
+            return
+
+        if url.path == LIST_PATH:
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            self._send(200, server.list_page(params))
+        elif url.path.startswith(PERSON_PREFIX):
+            record = server.records_by_uid.get(url.path[len(PERSON_PREFIX):])
+            if record is None:
+                self._send(404, {'error': "Not found"})
+            else:
+                self._send(200, record)
+        else:
+            self._send(404, {'error': "Unknown endpoint"})
+
+    def _send(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # One line per request would drown the benchmark output
+
+
+class MockFBIServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering like the FBI API.
+
+    Use it as a context manager; `base_url` is what FBI_API_BASE_URL should be.
+    """
+
+    daemon_threads = True
+
+    def __init__(self,
+                 records: Optional[List[Dict[str, Any]]] = None,
+                 port: int = 0,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 error_rate: float = 0.0,
+                 seed: int = 42):
+        """
+        Args:
+            records: Records to serve (default: synthetic_records())
+            port: Port to listen on (0: any free port)
+            latency: Seconds added to every response
+            jitter: Up to this many extra seconds, at random
+            error_rate: Share of requests answered with a 503 (0 to 1)
+            seed: Seed of the latency and error draws
+        """
+        super().__init__(("127.0.0.1", port), _RequestHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.set_records(records if records is not None else synthetic_records())
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def set_records(self, records: List[Dict[str, Any]]):
+        """Replace the served records."""
+        self.records = list(records)
+        self.records_by_uid = {record['uid']: record for record in self.records}
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def rng_uniform(self, low: float, high: float) -> float:
+        with self._lock:
+            return self._rng.uniform(low, high)
+
+    def handle_error(self, request, client_address):
+        # Clients giving up on slow responses (timeouts, turn deadlines) are expected
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def list_page(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """Answer a /list query: exact-match filters, sorting and paging."""
+        items = self.records
+
+        title = params.get('title', '').lower()
+        if title:
+            items = [item for item in items if title in (item.get('title') or '').lower()]
+        field_office = params.get('field_offices', '').lower()
+        if field_office:
+            items = [item for item in items if field_office in (item.get('field_offices') or [])]
+        for key in ('status', 'person_classification', 'poster_classification'):
+            value = params.get(key, '').lower()
+            if value:
+                items = [item for item in items if (item.get(key) or '').lower() == value]
+
+        sort_on = params.get('sort_on', 'publication')
+        reverse = params.get('sort_order', 'desc') == 'desc'
+        items = sorted(items, key=lambda item: str(item.get(sort_on) or ''), reverse=reverse)
+
+        page = max(int(params.get('page', 1)), 1)
+        page_size = min(max(int(params.get('pageSize', 20)), 1), MAX_PAGE_SIZE)
+        start = (page - 1) * page_size
+        return {'total': len(items), 'page': page, 'items': items[start:start + page_size]}
+
+    def start(self) -> "MockFBIServer":
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True, name="mock-fbi-api")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "MockFBIServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the FBI wanted API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data", help="JSON list of records (from --record); synthetic records otherwise")
+    parser.add_argument("--records", type=int, default=1000, help="Number of synthetic records")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--record", metavar="PATH", help="Record the real API to PATH and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        record_api(args.record)
+        return
+
+    records = load_records(args.data) if args.data else synthetic_records(args.records)
+    server = MockFBIServer(records, port=args.port, latency=args.latency_ms / 1000,
+                           jitter=args.jitter_ms / 1000, error_rate=args.error_rate)
+    print(f"Serving {len(records)} records on {server.base_url} (FBI_API_BASE_URL={server.base_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
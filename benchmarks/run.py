@@ -0,0 +1,256 @@
+"""
+LXP - Advanced AI development Workshop: benchmark scenarios
+
+Measures the catalog, every tool of tools.py and full conversation turns,
+offline: the FBI API is replaced by the mock server (mock_fbi_server.py) and
+Gemini by the scripted model (fake_llm.py). For each scenario it reports the
+p50/p95/p99 latency, the throughput and the peak memory allocated during a
+call (traced with tracemalloc, in a separate pass so tracing does not skew
+the timings).
+
+    python -m benchmarks.run                          # Everything
+    python -m benchmarks.run --only tool. --iterations 200
+    python -m benchmarks.run --api-latency-ms 80 --llm-latency-ms 400 --json results.json
+
+Save results with --json before and after a change to compare them.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.fake_llm import ScriptedChatModel
+from benchmarks.mock_fbi_server import MockFBIServer, load_records, synthetic_records
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(int(round(p / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def measure(name: str, func: Callable[[], Any], iterations: int, warmup: int, memory_iterations: int) -> Dict[str, Any]:
+    """
+    Time a scenario.
+
+    Args:
+        name: Scenario name
+        func: One call of the scenario
+        iterations: Number of timed calls
+        warmup: Calls made first, untimed (to warm up caches and lazy indexes)
+        memory_iterations: Calls made under tracemalloc to find the peak memory
+
+    Returns:
+        Dict with the scenario's statistics (latencies in milliseconds)
+    """
+    for _ in range(warmup):
+        try:
+            func()
+        except Exception:
+            pass
+
+    samples = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception:
+            errors += 1  # e.g. errors injected by the mock API; still timed
+        samples.append((time.perf_counter() - start) * 1000)
+    elapsed = time.perf_counter() - started
+
+    peak = 0
+    if memory_iterations:
+        tracemalloc.start()
+        for _ in range(memory_iterations):
+            tracemalloc.reset_peak()
+            try:
+                func()
+            except Exception:
+                pass
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {
+        'scenario': name,
+        'iterations': iterations,
+        'errors': errors,
+        'p50_ms': percentile(samples, 50),
+        'p95_ms': percentile(samples, 95),
+        'p99_ms': percentile(samples, 99),
+        'mean_ms': sum(samples) / len(samples),
+        'throughput_per_s': iterations / elapsed if elapsed else 0.0,
+        'peak_kib': peak / 1024,
+    }
+
+
+def pick_inputs(catalog) -> Dict[str, Any]:
+    """
+    Choose tool inputs among the served records, so every tool finds
+    something to format: the person with the longest caution among the
+    latest publications, their field office, name and a subject word.
+    """
+    records = catalog.query({'pageSize': 50})['items']
+    person = max(records, key=lambda record: len(record.caution or ''))
+    return {
+        'person': person,
+        'office': (person.field_offices or ('miami',))[0],
+        'name': person.title.title(),
+        'subject_word': (person.subjects or ('murder',))[0].split()[-1].lower(),
+    }
+
+
+def build_scenarios(backend, catalog, client, inputs: Dict[str, Any]) -> Dict[str, Callable[[], Any]]:
+    """Build every scenario against a synced catalog, with inputs from pick_inputs()."""
+    import tools
+
+    person, office, name, subject_word = inputs['person'], inputs['office'], inputs['name'], inputs['subject_word']
+
+    def turn(message: str, router: bool, cache: bool):
+        def run():
+            saved = backend.router, backend.answer_cache
+            backend.router = saved[0] if router else None
+            backend.answer_cache = saved[1] if cache else None
+            try:
+                return backend.process_message(message)
+            finally:
+                backend.router, backend.answer_cache = saved
+        return run
+
+    def cold_sync():
+        client.cache.clear()
+        return catalog.full_sync()
+
+    return {
+        'catalog.full_sync': cold_sync,
+        'catalog.incremental_sync': catalog.incremental_sync,
+        'tool.get_fbi_most_wanted': lambda: tools.get_fbi_most_wanted.invoke(""),
+        'tool.search_fbi_person_by_name': lambda: tools.search_fbi_person_by_name.invoke(name),
+        'tool.search_fbi_by_field_office': lambda: tools.search_fbi_by_field_office_tool.invoke(f"{office}, 10"),
+        'tool.search_fbi_by_status': lambda: tools.search_fbi_by_status_tool.invoke("captured, 10"),
+        'tool.search_fbi_by_classification': lambda: tools.search_fbi_by_classification_tool.invoke("main, 10"),
+        'tool.get_fbi_person_details': lambda: tools.get_fbi_person_details_tool.invoke(person.uid),
+        'tool.get_fbi_person_section': lambda: tools.get_fbi_person_section_tool.invoke(f"{person.uid}, caution"),
+        'tool.get_fbi_terrorism_list': lambda: tools.get_fbi_terrorism_list.invoke(""),
+        'tool.get_fbi_by_poster_classification': lambda: tools.get_fbi_by_poster_classification.invoke({'classification': "missing"}),
+        'tool.get_fbi_advanced_search': lambda: tools.get_fbi_advanced_search.invoke({'title': name.split()[-1], 'sort_criteria': "modified"}),
+        'tool.search_fbi_by_criteria': lambda: tools.search_fbi_by_criteria_tool.invoke(f"{office}, na, {subject_word}"),
+        'tool.aggregate_fbi_cases': lambda: tools.aggregate_fbi_cases.invoke({'group_by': "field_office", 'status': "active", 'min_reward': "50k", 'published_since': "2015"}),
+        'tool.search_fbi_by_description': lambda: tools.search_fbi_by_description.invoke({'query': "dark sedan leaving the scene"}),
+        'turn.agent': turn(f"Which captured fugitives come from the {office} office?", router=False, cache=False),
+        'turn.agent_details': turn(f"Tell me everything about {person.uid}", router=False, cache=False),
+        'turn.router': turn("Show me the most wanted list", router=True, cache=False),
+        'turn.answer_cache': turn(f"Which captured fugitives come from the {office} office?", router=False, cache=True),
+    }
+
+
+# Rules of the scripted LLM: (pattern of the user message, tool, tool input),
+# the input may refer to the pattern's groups (see ScriptedChatModel)
+AGENT_RULES = [
+    (r"captured fugitives come from the (\w+) office", "search_fbi_by_criteria", r"\1, captured, "),
+    (r"everything about ([0-9a-f]{32})", "get_fbi_person_details", r"\1"),
+    (r"most wanted", "get_fbi_most_wanted", ""),
+]
+
+
+def add_stack_arguments(parser: argparse.ArgumentParser):
+    """Command-line options of start_stack()."""
+    parser.add_argument("--records", type=int, default=1000, help="Number of synthetic records")
+    parser.add_argument("--data", help="Recorded records to serve instead (see mock_fbi_server --record)")
+    parser.add_argument("--api-latency-ms", type=float, default=0.0)
+    parser.add_argument("--api-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Scripted LLM time to first token")
+    parser.add_argument("--llm-token-ms", type=float, default=0.0, help="Scripted LLM time per token")
+
+
+def start_stack(args) -> Tuple[MockFBIServer, Any, Any]:
+    """
+    Start the mock API and build a backend on top of it, with the scripted LLM.
+
+    Args:
+        args: Parsed options (see add_stack_arguments())
+
+    Returns:
+        (mock server, ChatBackend, synced WantedCatalog); stop the server when done
+    """
+    records = load_records(args.data) if args.data else synthetic_records(args.records)
+    server = MockFBIServer(records, latency=args.api_latency_ms / 1000).start()
+
+    # The client and the catalog read their settings on first use:
+    # point them at the mock server and a throwaway mirror file
+    workdir = tempfile.mkdtemp(prefix="fbi-bench-")
+    os.environ["FBI_API_BASE_URL"] = server.base_url
+    os.environ["FBI_CATALOG_PATH"] = os.path.join(workdir, "catalog.json")
+
+    from backend import ChatBackend
+    from catalog import get_catalog
+
+    catalog = get_catalog()
+    catalog.full_sync()
+    server.error_rate = args.api_error_rate  # Only once the catalog is loaded
+
+    llm = ScriptedChatModel(rules=AGENT_RULES,
+                            first_token_latency=args.llm_latency_ms / 1000,
+                            token_latency=args.llm_token_ms / 1000)
+    backend = ChatBackend(llm=llm, tracing=False)
+    backend.agent_executor.verbose = False  # Printing every step would be measured too
+
+    return server, backend, catalog
+
+
+def print_report(results: List[Dict[str, Any]]):
+    """Print the results as a table."""
+    header = f"{'scenario':<40} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>9} {'peak KiB':>9} {'errors':>6}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(f"{result['scenario']:<40} {result['iterations']:>6} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+              f"{result['p99_ms']:>9.2f} {result['throughput_per_s']:>9.1f} {result['peak_kib']:>9.1f} {result['errors']:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the FBI assistant")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed calls per scenario")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--memory-iterations", type=int, default=3, help="Calls traced for peak memory (0: skip)")
+    parser.add_argument("--only", default="", help="Run only scenarios whose name starts with this")
+    add_stack_arguments(parser)
+    parser.add_argument("--json", metavar="PATH", help="Also write the results to PATH")
+    args = parser.parse_args()
+
+    from fbi_client import get_client
+
+    server, backend, catalog = start_stack(args)
+    inputs = pick_inputs(catalog)
+
+    scenarios = build_scenarios(backend, catalog, get_client(), inputs)
+    results = []
+    try:
+        for name, func in scenarios.items():
+            if not name.startswith(args.only):
+                continue
+            results.append(measure(name, func, args.iterations, args.warmup, args.memory_iterations))
+            print(f"  done: {name}", flush=True)
+    finally:
+        server.stop()
+
+    print()
+    print_report(results)
+    print(f"\nMock API requests served: {server.requests}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({'settings': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
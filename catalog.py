@@ -0,0 +1,825 @@
+"""
+LXP - Advanced AI development Workshop: local FBI wanted persons catalog
+
+The catalog mirrors the whole /wanted/v1/list dataset into a JSON file on disk
+and keeps it fresh with incremental syncs based on each record's `modified`
+timestamp. Tools query the mirror instead of calling the FBI API on every
+agent step, which turns a network round-trip into an in-memory lookup.
+Records are kept as compact WantedPerson objects (see models.py) rather
+than the API's JSON dictionaries.
+
+Once the mirror holds data, due syncs run in the background
+(stale-while-revalidate): queries never wait for the FBI API, even when it is
+slow or down, and staleness() tells tools when the data may be out of date.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+
+from catalog_columns import CatalogColumns
+from catalog_index import CatalogIndex
+from deadline import DeadlineExceeded, remaining
+from fbi_client import UID_PATTERN, backoff_delay, get_client
+from metrics import timed
+from models import WantedPerson
+from name_search import NameSearchIndex
+from text_search import BM25Index, record_text, snippet
+
+logger = logging.getLogger(__name__)
+
+# The FBI API refuses page sizes above 50
+MAX_PAGE_SIZE = 50
+
+# Safety net so a misbehaving API can never keep a sync looping forever
+MAX_SYNC_PAGES = 200
+
+# Fields the /list endpoint can sort on
+SORT_FIELDS = ("publication", "modified", "title", "subjects")
+
+# Delay before retrying a failed sync: up to this many seconds, doubling
+# with each consecutive failure (capped by the refresh interval)
+SYNC_RETRY_BASE_SECONDS = 15
+
+# Persons fetched one at a time are written to disk at most this often
+SAVE_DELAY_SECONDS = 5
+
+# Query parameters answered by the inverted index (see catalog_index.py)
+INDEXED_PARAMS = ('field_offices', 'status', 'person_classification', 'poster_classification', 'subjects')
+
+
+class WantedCatalog:
+    """
+    Local mirror of the FBI wanted persons list.
+
+    Records are kept as WantedPerson objects in a dictionary keyed by `uid`
+    and persisted to a JSON file, so a restarted process starts warm. Two kinds of sync keep it fresh:
+    - a full sync pages through the whole dataset (also drops removed records)
+    - an incremental sync only downloads records modified since the last sync
+
+    `query()` accepts the same parameters as the /list endpoint and returns a
+    response shaped like the API's, with WantedPerson items.
+    """
+
+    def __init__(self,
+                 path: str,
+                 refresh_interval: float = 900,
+                 full_sync_interval: float = 86400,
+                 sync_workers: int = 4,
+                 miss_ttl: float = 300):
+        """
+        Create a catalog backed by the JSON file at `path`.
+
+        Args:
+            path: Location of the on-disk mirror
+            refresh_interval: Seconds before an incremental sync is due
+            full_sync_interval: Seconds before a full resync is due
+            sync_workers: Maximum number of list pages downloaded concurrently
+            miss_ttl: Seconds during which a uid the FBI API does not know is
+                answered as unknown without asking it again
+        """
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.full_sync_interval = full_sync_interval
+        self.sync_workers = sync_workers
+        self.miss_ttl = miss_ttl
+
+        # Readers never take a lock: syncs build a new dictionary and index and
+        # swap them in; results found through the index are checked against
+        # the records, so a reader between the two swaps stays correct
+        self._records: Dict[str, WantedPerson] = {}
+        self._index = CatalogIndex()
+
+        # Persons fetched by uid between syncs (see get). They are kept apart
+        # because readers iterate _records without a lock; the next sync
+        # merges them. Unknown uids are remembered until their expiry time.
+        self._fetched: Dict[str, WantedPerson] = {}
+        self._missing: Dict[str, float] = {}
+        self._fetched_lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None
+
+        # Built on first name search, rebuilt once the records are swapped
+        self._name_index = NameSearchIndex()
+        self._name_index_source: Optional[Dict[str, WantedPerson]] = None
+        self._name_index_lock = threading.Lock()
+
+        # Built on first full-text search, then updated record by record
+        self._text_index = BM25Index()
+        self._text_index_source: Dict[str, WantedPerson] = {}
+        self._text_index_lock = threading.Lock()
+
+        # Columnar snapshot for analytics, built on first use, rebuilt once the
+        # records are swapped
+        self._columns: Optional[CatalogColumns] = None
+        self._columns_source: Optional[Dict[str, WantedPerson]] = None
+        self._columns_lock = threading.Lock()
+        self._high_water_mark = ""  # Most recent `modified` timestamp seen
+        self._synced_at = 0.0
+
+        # Bumped by every sync that changes the records, so caches of answers
+        # derived from the catalog can tell they are out of date (a person
+        # fetched by uid does not count: answers about others stay valid)
+        self.version = 0
+        self._full_synced_at = 0.0
+
+        # Only one sync may run at a time (re-entrant so ensure_fresh can hold it)
+        self._sync_lock = threading.RLock()
+
+        # Background refreshes (see ensure_fresh): one at a time, and after a
+        # failure the next attempt waits with jittered exponential backoff
+        self._refreshing = False
+        self._refresh_lock = threading.Lock()
+        self._failed_syncs = 0
+        self._next_sync_attempt = 0.0
+        self.last_sync_error: Optional[str] = None
+
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        """Load the mirror from disk if a previous process saved one."""
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable catalog file %s: %s", self.path, e)
+            return
+
+        self._records = {item["uid"]: WantedPerson.from_api(item) for item in state.get("items", []) if item.get("uid")}
+        self._index = CatalogIndex.build(self._records.values())
+        self._high_water_mark = state.get("high_water_mark", "")
+        self._synced_at = state.get("synced_at", 0.0)
+        self._full_synced_at = state.get("full_synced_at", 0.0)
+
+    def _save(self):
+        """Write the mirror to disk atomically (write a temp file, then rename)."""
+        state = {
+            "high_water_mark": self._high_water_mark,
+            "synced_at": self._synced_at,
+            "full_synced_at": self._full_synced_at,
+            "items": [person.to_dict() for person in self._records.values()],
+        }
+        with self._fetched_lock:
+            self._save_timer = None
+            state["items"] += [person.to_dict() for uid, person in self._fetched.items() if uid not in self._records]
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+    def _schedule_save(self):
+        """Write the mirror in SAVE_DELAY_SECONDS, together with any other change until then (lock held)."""
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(SAVE_DELAY_SECONDS, self._delayed_save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _delayed_save(self):
+        """Timer callback of _schedule_save()."""
+        try:
+            with self._sync_lock:
+                self._save()
+        except OSError as e:
+            logger.warning("Could not write the catalog file %s: %s", self.path, e)
+
+    # ------------------------------------------------------------------
+    # Synchronisation with the FBI API
+    # ------------------------------------------------------------------
+
+    def _fetch_page(self, page: int) -> Dict[str, Any]:
+        """Download one page of the list, most recently modified first."""
+        params = {
+            'page': page,
+            'pageSize': MAX_PAGE_SIZE,
+            'sort_on': 'modified',
+            'sort_order': 'desc'
+        }
+        return get_client().list_persons(params)
+
+    def _iter_pages(self) -> Iterator[List[WantedPerson]]:
+        """
+        Yield the persons of every list page.
+
+        The first page tells how many pages there are; the remaining ones are
+        then downloaded concurrently by a bounded pool of workers and yielded
+        as they complete, so the whole dataset takes roughly as long as a
+        couple of page downloads. When the caller stops iterating early, pages
+        that have not started yet are cancelled.
+
+        Workers run in a copy of the caller's context, so a sync made during a
+        chat turn keeps the turn's deadline (see deadline.py) in every request.
+
+        Raises:
+            DeadlineExceeded: If the turn's deadline passes before all pages arrive
+        """
+        first = self._fetch_page(1)
+        yield _persons(first)
+
+        page_count = min(math.ceil((first.get('total') or 0) / MAX_PAGE_SIZE), MAX_SYNC_PAGES)
+        if page_count <= 1:
+            return
+
+        pool = ThreadPoolExecutor(max_workers=self.sync_workers, thread_name_prefix="fbi-catalog")
+        # One context copy per task: a context cannot be entered by two threads at once
+        futures = [pool.submit(contextvars.copy_context().run, self._fetch_page, page)
+                   for page in range(2, page_count + 1)]
+        left = remaining()
+        try:
+            for future in as_completed(futures, timeout=None if left is None else max(left, 0)):
+                yield _persons(future.result())
+        except FuturesTimeoutError:
+            if left is None:
+                raise  # A worker's own timeout, not the turn's
+            raise DeadlineExceeded("Turn deadline reached during the catalog sync") from None
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @timed("catalog.full_sync")
+    def full_sync(self) -> int:
+        """
+        Download the whole dataset and replace the mirror with it.
+
+        Returns:
+            int: Number of records in the refreshed mirror
+        """
+        with self._sync_lock:
+            records = {}
+
+            for persons in self._iter_pages():
+                for person in persons:
+                    records[person.uid] = person
+
+            now = time.time()
+            self._index = CatalogIndex.build(records.values())
+            self._records = records
+            self._high_water_mark = max((person.modified or "" for person in records.values()), default="")
+            self._synced_at = now
+            self._full_synced_at = now
+            self.version += 1
+            with self._fetched_lock:
+                self._fetched = {}  # The full listing is authoritative
+            self._save()
+
+            return len(records)
+
+    @timed("catalog.incremental_sync")
+    def incremental_sync(self) -> int:
+        """
+        Download only the records modified since the last sync.
+
+        Pages are requested newest-modified first, so the sync stops at the
+        first record older than the high-water mark. Records already mirrored
+        with the same `modified` timestamp (at least the one that set the
+        mark) are not counted as changes.
+
+        Returns:
+            int: Number of records added or updated
+        """
+        with self._sync_lock:
+            changed = {}
+
+            for page in range(1, MAX_SYNC_PAGES + 1):
+                response = self._fetch_page(page)
+                persons = _persons(response)
+                reached_known_records = False
+
+                for person in persons:
+                    if (person.modified or "") < self._high_water_mark:
+                        reached_known_records = True
+                        break
+                    known = self._records.get(person.uid)
+                    if known is None or known.modified != person.modified:
+                        changed[person.uid] = person
+
+                if not response.get('items') or reached_known_records:
+                    break
+
+            if changed:
+                self._high_water_mark = max(
+                    [self._high_water_mark] + [person.modified or "" for person in changed.values()]
+                )
+            self._synced_at = time.time()
+            with self._fetched_lock:
+                fetched, self._fetched = self._fetched, {}
+            if changed or fetched:
+                # Records from the listing are newer than persons fetched before it
+                self.ingest({**fetched, **changed}.values())
+                self.version += 1
+
+            return len(changed)
+
+    def ingest(self, persons) -> int:
+        """
+        Add or update records seen in any FBI API response.
+
+        Incremental syncs go through here, together with the persons looked up
+        individually since the previous sync, so the uid index covers every
+        record any tool has seen. The mirror is written through to disk.
+
+        Only syncs move the high-water mark: a single fresh record must not
+        make the next incremental sync skip other recent changes.
+
+        Args:
+            persons: WantedPerson records built from an FBI API response
+
+        Returns:
+            int: Number of records added or updated
+        """
+        changed = {person.uid: person for person in persons}
+
+        with self._sync_lock:
+            if changed:
+                # Copy-on-write so concurrent readers keep a consistent view
+                previous = [self._records[uid] for uid in changed if uid in self._records]
+                records = dict(self._records)
+                records.update(changed)
+                self._index = self._index.updated(previous, changed.values())
+                self._records = records
+                self._save()
+
+        return len(changed)
+
+    def ensure_fresh(self):
+        """
+        Sync the mirror if it is empty or older than the configured intervals.
+
+        An empty mirror is synced right away, since there is nothing to answer
+        from. Otherwise queries keep being answered from the mirror and the
+        due sync runs in a background thread; if it fails (FBI API slow or
+        unreachable), the error is logged, the next attempt is delayed with
+        jittered exponential backoff and staleness() reports the data age.
+        """
+        if not self._is_stale():
+            return
+
+        if not self._records:
+            self._sync()
+        else:
+            self._start_background_sync()
+
+    async def aensure_fresh(self):
+        """
+        Async version of ensure_fresh() for coroutine tools.
+
+        A populated mirror never waits (its syncs run in the background); an
+        empty one is filled in a worker thread so the event loop keeps serving
+        other conversations meanwhile.
+        """
+        if self._records:
+            self.ensure_fresh()
+        elif self._is_stale():
+            await asyncio.to_thread(self.ensure_fresh)
+
+    def staleness(self) -> Optional[float]:
+        """
+        Get the age of the data when it may be out of date.
+
+        Returns:
+            Seconds since the last successful sync if the last sync failed or
+            no sync succeeded for twice the refresh interval, otherwise None
+        """
+        if not self._records or not self._synced_at:
+            return None
+
+        age = time.time() - self._synced_at
+        if (self.last_sync_error is not None and age > self.refresh_interval) or age > 2 * self.refresh_interval:
+            return age
+        return None
+
+    def _is_stale(self) -> bool:
+        """Check whether the mirror is empty or due for a sync (and not backing off)."""
+        now = time.time()
+        if not self._records:
+            return True
+        if now < self._next_sync_attempt:
+            return False
+        return (now - self._full_synced_at > self.full_sync_interval
+                or now - self._synced_at > self.refresh_interval)
+
+    def _sync(self):
+        """Run the due sync (full or incremental) and record its outcome."""
+        try:
+            with self._sync_lock:
+                # Another thread may have synced while we waited for the lock
+                now = time.time()
+                if not self._records or now - self._full_synced_at > self.full_sync_interval:
+                    self.full_sync()
+                elif now - self._synced_at > self.refresh_interval:
+                    self.incremental_sync()
+        except (requests.RequestException, ValueError) as e:
+            self._failed_syncs += 1
+            self._next_sync_attempt = time.time() + backoff_delay(
+                self._failed_syncs - 1, SYNC_RETRY_BASE_SECONDS, self.refresh_interval
+            )
+            self.last_sync_error = str(e)
+            raise
+
+        self._failed_syncs = 0
+        self._next_sync_attempt = 0.0
+        self.last_sync_error = None
+
+    def _start_background_sync(self):
+        """Start a sync in a background thread, unless one is already running."""
+        with self._refresh_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        threading.Thread(target=self._background_sync, daemon=True, name="fbi-catalog-refresh").start()
+
+    def _background_sync(self):
+        try:
+            self._sync()
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("FBI catalog sync failed, serving local mirror: %s", e)
+        finally:
+            with self._refresh_lock:
+                self._refreshing = False
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @timed("catalog.get")
+    def get(self, uid: str) -> Optional[WantedPerson]:
+        """
+        Get a single record by its unique ID.
+
+        A warm record is a single dictionary probe with no network access.
+        On a miss the person is fetched individually from the FBI API and
+        kept for the next lookup; a uid the FBI does not know is remembered
+        for `miss_ttl` seconds, and a string that is not an FBI ID is never
+        looked up at all.
+
+        Args:
+            uid: The FBI unique ID of the person (any case, surrounding spaces ignored)
+
+        Returns:
+            The record, or None if the FBI does not know this ID
+        """
+        uid = uid.strip().lower()  # FBI IDs are lowercase hexadecimal
+        record = self._records.get(uid) or self._fetched.get(uid)
+        if record is not None:
+            return record
+
+        if not UID_PATTERN.fullmatch(uid):
+            return None
+        if self._missing.get(uid, 0) > time.time():
+            return None
+
+        # A cold mirror is filled in one go rather than one person at a time
+        if not self._records:
+            self.ensure_fresh()
+            record = self._records.get(uid)
+            if record is not None:
+                return record
+
+        return self._fetch_person(uid)
+
+    async def aget(self, uid: str) -> Optional[WantedPerson]:
+        """
+        Async version of get(): warm records are returned directly, misses are
+        fetched in a worker thread.
+        """
+        uid = uid.strip().lower()
+        record = self._records.get(uid) or self._fetched.get(uid)
+        if record is not None:
+            return record
+        return await asyncio.to_thread(self.get, uid)
+
+    def _fetch_person(self, uid: str) -> Optional[WantedPerson]:
+        """
+        Fetch one person from the FBI API.
+
+        The person is not ingested right away: copying the records and
+        rewriting the mirror for every lookup would make each miss O(catalog).
+        They are kept in _fetched, written to disk with a short delay and
+        merged into the records by the next sync.
+        """
+        item = get_client().get_person(uid)
+        now = time.time()
+
+        with self._fetched_lock:
+            if not item or item.get('uid') != uid:
+                self._missing = {key: expiry for key, expiry in self._missing.items() if expiry > now}
+                self._missing[uid] = now + self.miss_ttl
+                return None
+
+            person = WantedPerson.from_api(item)
+            self._fetched[uid] = person
+            self._missing.pop(uid, None)
+            self._schedule_save()
+        return person
+
+    @timed("catalog.query")
+    def query(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Answer a /list query from the mirror.
+
+        Supported parameters mirror the FBI API: title, field_offices, status,
+        person_classification, poster_classification, sort_on, sort_order,
+        page and pageSize. On top of those, `subjects` takes a list of words
+        and keeps records with a subject containing any of them.
+
+        Args:
+            params: Query parameters, as they would be sent to the API
+
+        Returns:
+            Dict with `total`, `page` and `items` (WantedPerson records), like
+            the API response
+        """
+        self.ensure_fresh()
+
+        items = self._filter(self._candidates(params), params)
+
+        sort_on = str(params.get('sort_on') or 'publication').lower()
+        if sort_on in SORT_FIELDS:
+            reverse = str(params.get('sort_order') or 'desc').lower() == 'desc'
+            items.sort(key=lambda item: _sort_key(item, sort_on), reverse=reverse)
+
+        page = max(int(params.get('page') or 1), 1)
+        page_size = min(max(int(params.get('pageSize') or 20), 1), MAX_PAGE_SIZE)
+        start = (page - 1) * page_size
+
+        return {
+            'total': len(items),
+            'page': page,
+            'items': items[start:start + page_size],
+        }
+
+    @timed("catalog.find")
+    def find(self, params: Dict[str, Any], limit: int) -> Dict[str, Any]:
+        """
+        Find every record matching the filters of query(), newest publications first.
+
+        With a populated mirror the filters are answered from the index, so
+        results are complete. With an empty mirror the list pages are
+        streamed through the filters as they arrive (see _iter_pages()) and
+        the scan stops as soon as `limit` matches are found; every page seen
+        is still added to the mirror.
+
+        Args:
+            params: Filter parameters, as accepted by query()
+            limit: Maximum number of records to return
+
+        Returns:
+            Dict with `items` (at most `limit` matches), `total` (matches found)
+            and `complete` (False if the scan stopped early)
+        """
+        if not self._records:
+            return self._scan_pages(params, limit)
+
+        self.ensure_fresh()
+
+        matches = self._filter(self._candidates(params), params)
+        matches.sort(key=lambda item: _sort_key(item, 'publication'), reverse=True)
+
+        return {'total': len(matches), 'items': matches[:limit], 'complete': True}
+
+    @timed("catalog.search_names")
+    def search_names(self, name: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Fuzzy search on names and aliases, tolerant to typos and sound-alikes.
+
+        Args:
+            name: Name as typed by the user
+            limit: Maximum number of persons to return
+
+        Returns:
+            List of dicts with `record`, `score` and `matched_name`, best first
+        """
+        self.ensure_fresh()
+
+        records = self._records
+        with self._name_index_lock:
+            if self._name_index_source is not records:
+                self._name_index = NameSearchIndex.build(records.values())
+                self._name_index_source = records
+            name_index = self._name_index
+
+        return [
+            {'record': records[match['uid']], 'score': match['score'], 'matched_name': match['matched_name']}
+            for match in name_index.search(name, limit=limit)
+            if match['uid'] in records
+        ]
+
+    @timed("catalog.search_text")
+    def search_text(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        BM25 full-text search over the narrative fields of every record.
+
+        The text index is brought up to date first: only records added,
+        removed or modified since the previous search are re-indexed.
+
+        Args:
+            query: Free-text question or keywords
+            k: Number of results to return
+
+        Returns:
+            List of dicts with `record`, `score` and `snippet`, best first
+        """
+        self.ensure_fresh()
+
+        records = self._records
+        with self._text_index_lock:
+            if self._text_index_source is not records:
+                previous = self._text_index_source
+                for uid in previous.keys() - records.keys():
+                    self._text_index.remove(uid)
+                for uid, record in records.items():
+                    old = previous.get(uid)
+                    if old is None or (old is not record and old.modified != record.modified):
+                        self._text_index.add(uid, record_text(record))
+                self._text_index_source = records
+
+        # The index keeps no text: excerpts come from the records, for the hits only
+        return [
+            {'record': records[hit['uid']], 'score': hit['score'],
+             'snippet': snippet(record_text(records[hit['uid']]), hit['terms'])}
+            for hit in self._text_index.search(query, k=k)
+            if hit['uid'] in records
+        ]
+
+    def columns(self) -> CatalogColumns:
+        """
+        Get the columnar snapshot of the records (see catalog_columns.py).
+
+        Returns:
+            CatalogColumns: Snapshot of the current records
+        """
+        self.ensure_fresh()
+
+        records = self._records
+        with self._columns_lock:
+            if self._columns_source is not records:
+                self._columns = CatalogColumns.build(list(records.values()))
+                self._columns_source = records
+            return self._columns
+
+    @timed("catalog.aggregate")
+    def aggregate(self, params: Dict[str, Any], group_by: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Statistics over every record matching the filters, optionally per group.
+
+        Args:
+            params: Filters (see CatalogColumns.mask)
+            group_by: Field to group by (see catalog_columns.GROUP_FIELDS), or None
+
+        Returns:
+            Dict with `summary` (see CatalogColumns.summary) and `groups` (see
+            CatalogColumns.group_by, empty without group_by)
+        """
+        columns = self.columns()
+        mask = columns.mask(params)
+        return {
+            'summary': columns.summary(mask),
+            'groups': columns.group_by(group_by, mask) if group_by else [],
+        }
+
+    def vocabulary(self, field: str) -> List[str]:
+        """
+        Get the distinct values of an indexed field, e.g. every field office.
+
+        Args:
+            field: One of the indexed fields (see catalog_index.INDEXED_FIELDS)
+
+        Returns:
+            Sorted list of lowercase values
+        """
+        self.ensure_fresh()
+        return sorted(self._index.vocabulary(field))
+
+    def _scan_pages(self, params: Dict[str, Any], limit: int) -> Dict[str, Any]:
+        """Stream list pages through the filters until enough matches are found."""
+        seen = []
+        matches = []
+        complete = True
+
+        pages = self._iter_pages()
+        try:
+            for items in pages:
+                seen.extend(items)
+                matches.extend(self._filter(items, params))
+                if len(matches) >= limit:
+                    complete = False
+                    break
+        finally:
+            pages.close()
+
+        self.ingest(seen)
+        matches.sort(key=lambda item: _sort_key(item, 'publication'), reverse=True)
+
+        return {'total': len(matches), 'items': matches[:limit], 'complete': complete}
+
+    def _candidates(self, params: Dict[str, Any]) -> List[WantedPerson]:
+        """
+        Narrow the records down with the inverted index.
+
+        Returns every record when the query has no indexed filter. The
+        result may still hold records that do not match (e.g. right after an
+        update), so it must go through _filter().
+        """
+        records = self._records
+        uids = self._index.match({
+            key: _as_list(params.get(key)) for key in INDEXED_PARAMS
+        })
+
+        if uids is None:
+            return list(records.values())
+        return [records[uid] for uid in uids if uid in records]
+
+    @staticmethod
+    def _filter(items: List[WantedPerson], params: Dict[str, Any]) -> List[WantedPerson]:
+        """Apply the API's filter parameters to a list of records."""
+        title = str(params.get('title') or '').strip().lower()
+        if title:
+            words = title.split()
+            items = [item for item in items
+                     if all(word in (item.title or '').lower() for word in words)]
+
+        field_office = str(params.get('field_offices') or '').strip().lower()
+        if field_office:
+            items = [item for item in items
+                     if field_office in [office.lower() for office in item.field_offices]]
+
+        for key in ('status', 'person_classification', 'poster_classification'):
+            value = str(params.get(key) or '').strip().lower()
+            if value:
+                items = [item for item in items if (getattr(item, key) or '').lower() == value]
+
+        keywords = [keyword.lower() for keyword in _as_list(params.get('subjects'))]
+        if keywords:
+            items = [item for item in items
+                     if any(keyword in subject.lower()
+                            for subject in item.subjects for keyword in keywords)]
+
+        return items
+
+
+def _as_list(value: Any) -> List[str]:
+    """Normalize a filter value (None, a string or a list) to a list of non-empty strings."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = [value]
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+def _persons(response: Dict[str, Any]) -> List[WantedPerson]:
+    """The items of a list response as WantedPerson records (items without uid are skipped)."""
+    return [WantedPerson.from_api(item) for item in response.get('items') or [] if item.get('uid')]
+
+
+def _sort_key(item: WantedPerson, sort_on: str) -> str:
+    """Sort key for a record; list fields such as subjects sort on their first entry."""
+    value = getattr(item, sort_on)
+    if isinstance(value, tuple):
+        value = value[0] if value else ""
+    return str(value or "").lower()
+
+
+_catalog: Optional[WantedCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> WantedCatalog:
+    """
+    Get the process-wide catalog, creating it on first use.
+
+    The location and refresh intervals come from environment variables
+    (see config.env.template), with sensible defaults.
+
+    Returns:
+        WantedCatalog: Shared catalog instance
+    """
+    global _catalog
+
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = WantedCatalog(
+                    path=os.getenv("FBI_CATALOG_PATH", "fbi_catalog.json"),
+                    refresh_interval=float(os.getenv("FBI_CATALOG_REFRESH_SECONDS", "900")),
+                    full_sync_interval=float(os.getenv("FBI_CATALOG_FULL_SYNC_SECONDS", "86400")),
+                    sync_workers=int(os.getenv("FBI_CATALOG_SYNC_WORKERS", "4")),
+                )
+    return _catalog
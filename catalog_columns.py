@@ -0,0 +1,281 @@
+"""
+LXP - Advanced AI development Workshop: columnar snapshot of the FBI catalog
+
+Analytics questions ("how many active cases per field office?", "rewards over
+$50,000 published since 2020?") touch every record but only a few fields.
+The snapshot stores those fields as NumPy arrays, one entry per record:
+
+- grouping fields (field offices, status, classifications, subjects, sex) as
+  boolean membership matrices, one column per distinct value
+- publication dates as datetime64 days
+- reward amounts, heights and weights as floats parsed from the API's text
+  (NaN when unknown)
+
+A filter is then a boolean mask built from whole columns, and a group-by a
+column sum over the masked matrix, with no Python loop over the records.
+Like the inverted index, a snapshot is never modified: the catalog builds a
+new one once its records change.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from models import WantedPerson
+
+# Fields records can be grouped by, with the WantedPerson attribute they come from
+GROUP_FIELDS = {
+    'field_office': 'field_offices',
+    'status': 'status',
+    'person_classification': 'person_classification',
+    'poster_classification': 'poster_classification',
+    'subject': 'subjects',
+    'sex': 'sex',
+}
+
+# Groups that are not a stored column but derived from the publication dates
+DERIVED_GROUPS = ('year',)
+
+AMOUNT_PATTERN = re.compile(r"\$\s*(\d[\d,]*(?:\.\d+)?)(?:\s*(million|billion))?", re.IGNORECASE)
+NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+MULTIPLIERS = {'million': 1e6, 'billion': 1e9}
+
+
+def parse_reward(text: Optional[str]) -> float:
+    """
+    Largest dollar amount of a reward text, e.g. 250000.0 for "up to $250,000".
+
+    Args:
+        text: The record's reward_text
+
+    Returns:
+        The amount in dollars, or NaN if the text has none
+    """
+    amounts = [float(number.replace(',', '')) * MULTIPLIERS.get((unit or '').lower(), 1)
+               for number, unit in AMOUNT_PATTERN.findall(text or '')]
+    return max(amounts) if amounts else float('nan')
+
+
+def parse_weight(text: Optional[str]) -> tuple:
+    """(min, max) weight in pounds of a text such as "150 to 170 pounds" (NaN if unknown)."""
+    if not text or 'pound' not in text.lower():
+        return float('nan'), float('nan')
+    numbers = [float(number) for number in NUMBER_PATTERN.findall(text)]
+    if not numbers:
+        return float('nan'), float('nan')
+    return min(numbers), max(numbers)
+
+
+def parse_date(text: Any) -> np.datetime64:
+    """Day of an ISO date or timestamp ("2024-06-13T09:03:00"), NaT if it is not one."""
+    try:
+        return np.datetime64(str(text)[:10], 'D')
+    except ValueError:
+        return np.datetime64('NaT', 'D')
+
+
+def _membership(values_per_record: Sequence[Sequence[str]]) -> tuple:
+    """Boolean matrix (records x distinct values) and its column labels."""
+    labels = sorted({value for values in values_per_record for value in values})
+    column = {label: i for i, label in enumerate(labels)}
+    rows = [row for row, values in enumerate(values_per_record) for _ in values]
+    columns = [column[value] for values in values_per_record for value in values]
+    matrix = np.zeros((len(values_per_record), len(labels)), dtype=bool)
+    matrix[rows, columns] = True
+    return matrix, labels
+
+
+class CatalogColumns:
+    """
+    Column arrays over a fixed list of records.
+
+    Filters take the same parameters as the catalog's query() (field_offices,
+    status, person_classification, poster_classification, subjects), plus
+    min_reward, published_since and published_before.
+    """
+
+    def __init__(self, uids: List[str], members: Dict[str, np.ndarray], labels: Dict[str, List[str]],
+                 publication: np.ndarray, reward: np.ndarray, height: np.ndarray, weight: np.ndarray):
+        self.uids = uids
+        self.members = members
+        self.labels = labels
+        self.publication = publication
+        self.reward = reward
+        self.height = height
+        self.weight = weight
+
+        # Matching is case-insensitive, as in the inverted index
+        self._keys = {field: [label.strip().lower() for label in field_labels]
+                      for field, field_labels in labels.items()}
+        # Records without a status are open cases, like status "na"
+        self._active = self._column('status', 'na') | ~self.members['status'].any(axis=1)
+
+    @classmethod
+    def build(cls, records: Sequence[WantedPerson]) -> "CatalogColumns":
+        """
+        Build the snapshot of a list of records.
+
+        Args:
+            records: Catalog records
+
+        Returns:
+            CatalogColumns: The new snapshot
+        """
+        members, labels = {}, {}
+        for field in GROUP_FIELDS.values():
+            values = []
+            for record in records:
+                value = getattr(record, field)
+                if isinstance(value, str):
+                    value = (value,)
+                values.append(tuple(item for item in value or () if item))
+            members[field], labels[field] = _membership(values)
+
+        weights = [parse_weight(record.weight) for record in records]
+        return cls(
+            uids=[record.uid for record in records],
+            members=members,
+            labels=labels,
+            publication=np.array([parse_date(record.publication) for record in records], dtype='datetime64[D]'),
+            reward=np.array([parse_reward(record.reward_text) for record in records], dtype=float),
+            height=np.array([[record.height_min, record.height_max] for record in records],
+                            dtype=float).reshape(-1, 2),
+            weight=np.array(weights, dtype=float).reshape(-1, 2),
+        )
+
+    def __len__(self) -> int:
+        return len(self.uids)
+
+    def _column(self, field: str, value: str) -> np.ndarray:
+        """Records whose field equals a value (case-insensitive)."""
+        value = value.strip().lower()
+        columns = [i for i, key in enumerate(self._keys[field]) if key == value]
+        return self.members[field][:, columns].any(axis=1)
+
+    def mask(self, params: Dict[str, Any]) -> np.ndarray:
+        """
+        Boolean mask of the records matching every given filter.
+
+        Args:
+            params: Filters; the categorical ones take a value or a list of
+                values (any of them matches), `subjects` takes keywords
+                matched inside the subject texts
+
+        Returns:
+            np.ndarray: One boolean per record
+        """
+        mask = np.ones(len(self), dtype=bool)
+
+        for field in ('field_offices', 'status', 'person_classification', 'poster_classification'):
+            values = params.get(field)
+            if not values:
+                continue
+            if isinstance(values, str):
+                values = [values]
+            matches = np.zeros(len(self), dtype=bool)
+            for value in values:
+                matches |= self._active if field == 'status' and value.lower() == 'na' else self._column(field, value)
+            mask &= matches
+
+        keywords = params.get('subjects') or []
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        for keyword in keywords:
+            columns = [i for i, key in enumerate(self._keys['subjects']) if keyword.lower() in key]
+            mask &= self.members['subjects'][:, columns].any(axis=1)
+
+        if params.get('min_reward') is not None:
+            mask &= self.reward >= float(params['min_reward'])  # NaN compares False
+        if params.get('published_since'):
+            mask &= self.publication >= parse_date(params['published_since'])
+        if params.get('published_before'):
+            mask &= self.publication < parse_date(params['published_before'])
+
+        return mask
+
+    def summary(self, mask: np.ndarray) -> Dict[str, Any]:
+        """
+        Statistics of the masked records.
+
+        Args:
+            mask: Records to describe (see mask())
+
+        Returns:
+            Dict with count, active, with_reward, total_reward, max_reward,
+            median_reward, first/last publication, average height (inches)
+            and weight (pounds); statistics without data are None
+        """
+        rewards = self.reward[mask]
+        rewards = rewards[~np.isnan(rewards)]
+        dates = self.publication[mask]
+        dates = dates[~np.isnat(dates)]
+        heights = self.height[mask].mean(axis=1)
+        heights = heights[~np.isnan(heights)]
+        weights = self.weight[mask].mean(axis=1)
+        weights = weights[~np.isnan(weights)]
+
+        return {
+            'count': int(mask.sum()),
+            'active': int((mask & self._active).sum()),
+            'with_reward': int(rewards.size),
+            'total_reward': float(rewards.sum()) if rewards.size else None,
+            'max_reward': float(rewards.max()) if rewards.size else None,
+            'median_reward': float(np.median(rewards)) if rewards.size else None,
+            'first_publication': str(dates.min()) if dates.size else None,
+            'last_publication': str(dates.max()) if dates.size else None,
+            'average_height': float(heights.mean()) if heights.size else None,
+            'average_weight': float(weights.mean()) if weights.size else None,
+        }
+
+    def group_by(self, group: str, mask: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Count the masked records per value of a field.
+
+        Args:
+            group: One of GROUP_FIELDS or DERIVED_GROUPS; records with several
+                values (field offices, subjects) count in each of their groups
+            mask: Records to count (see mask())
+
+        Returns:
+            List of dicts with value, count, active, with_reward, total_reward
+            and max_reward, largest groups first (years in order); empty
+            groups are left out
+        """
+        if group == 'year':
+            years = self.publication[mask].astype('datetime64[Y]')
+            known = ~np.isnat(years)
+            values, codes = np.unique(years[known], return_inverse=True)
+            matrix = codes[:, None] == np.arange(len(values))
+            labels = [str(value) for value in values]
+            rows = np.flatnonzero(mask)[known]
+        else:
+            field = GROUP_FIELDS[group]
+            rows = np.flatnonzero(mask)
+            matrix = self.members[field][rows]
+            labels = self.labels[field]
+
+        rewards = self.reward[rows]
+        has_reward = ~np.isnan(rewards)
+        rewarded = matrix & has_reward[:, None]
+        amounts = np.where(rewarded, np.nan_to_num(rewards)[:, None], 0.0)
+
+        counts = matrix.sum(axis=0)
+        active = matrix[self._active[rows]].sum(axis=0)
+        with_reward = rewarded.sum(axis=0)
+        total_reward = amounts.sum(axis=0)
+        max_reward = amounts.max(axis=0, initial=0.0)
+
+        order = np.arange(len(labels)) if group == 'year' else np.argsort(-counts, kind='stable')
+        return [
+            {
+                'value': labels[i],
+                'count': int(counts[i]),
+                'active': int(active[i]),
+                'with_reward': int(with_reward[i]),
+                'total_reward': float(total_reward[i]),
+                'max_reward': float(max_reward[i]) if with_reward[i] else None,
+            }
+            for i in order if counts[i]
+        ]
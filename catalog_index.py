@@ -0,0 +1,167 @@
+"""
+LXP - Advanced AI development Workshop: inverted index over the FBI catalog
+
+For each indexed field the index maps a term (a field office, a status, a
+classification or a word of a subject) to the set of uids having it. A filter
+such as "captured cases from the Miami office" becomes an intersection of two
+sets instead of a scan over every record.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from models import WantedPerson
+
+# Fields with postings; `subjects` is split into words, the others are used whole
+INDEXED_FIELDS = ('field_offices', 'status', 'person_classification', 'poster_classification', 'subjects')
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list:
+    """Split text into lowercase alphanumeric words."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def record_terms(record: WantedPerson) -> Iterator[Tuple[str, str]]:
+    """Yield the (field, term) pairs a record is indexed under."""
+    for field in INDEXED_FIELDS:
+        values = getattr(record, field) or ()
+        if isinstance(values, str):
+            values = [values]
+
+        for value in values:
+            if field == 'subjects':
+                for word in tokenize(value):
+                    yield field, word
+            elif value:
+                yield field, value.strip().lower()
+
+
+class CatalogIndex:
+    """
+    Postings lists for the catalog's categorical fields.
+
+    An index is never modified once built: updated() returns a new index that
+    shares every postings set it did not need to change. Readers can keep
+    using the index they hold while the catalog swaps in a new one.
+    """
+
+    def __init__(self, postings: Optional[Dict[str, Dict[str, Set[str]]]] = None):
+        self._postings = postings or {field: {} for field in INDEXED_FIELDS}
+
+    @classmethod
+    def build(cls, records: Iterable[WantedPerson]) -> "CatalogIndex":
+        """
+        Build an index over a collection of records.
+
+        Args:
+            records: Catalog records
+
+        Returns:
+            CatalogIndex: The new index
+        """
+        postings = {field: {} for field in INDEXED_FIELDS}
+        for record in records:
+            for field, term in record_terms(record):
+                postings[field].setdefault(term, set()).add(record.uid)
+        return cls(postings)
+
+    def updated(self,
+                old_records: Iterable[WantedPerson],
+                new_records: Iterable[WantedPerson]) -> "CatalogIndex":
+        """
+        Return a copy of the index with some records replaced.
+
+        Args:
+            old_records: Previous versions of the records (removed from postings)
+            new_records: Current versions of the records (added to postings)
+
+        Returns:
+            CatalogIndex: The updated index; this one is left untouched
+        """
+        postings = {field: dict(terms) for field, terms in self._postings.items()}
+        copied = set()
+
+        def writable(field, term):
+            # Copy a postings set the first time it is modified
+            if (field, term) not in copied:
+                postings[field][term] = set(postings[field].get(term, ()))
+                copied.add((field, term))
+            return postings[field][term]
+
+        for record in old_records:
+            for field, term in record_terms(record):
+                writable(field, term).discard(record.uid)
+                if not postings[field][term]:
+                    del postings[field][term]
+                    copied.discard((field, term))
+
+        for record in new_records:
+            for field, term in record_terms(record):
+                writable(field, term).add(record.uid)
+
+        return CatalogIndex(postings)
+
+    def vocabulary(self, field: str) -> Set[str]:
+        """Get every term indexed for a field."""
+        return set(self._postings[field])
+
+    def lookup(self, field: str, term: str) -> Set[str]:
+        """Get the uids whose field has exactly this term."""
+        return self._postings[field].get(term.strip().lower(), set())
+
+    def lookup_containing(self, field: str, fragment: str) -> Set[str]:
+        """
+        Get the uids whose field has a term containing `fragment`.
+
+        Multi-word fragments match records having every word, which makes
+        e.g. "seeking information - terrorism" work on subject words.
+        """
+        result = None
+        for word in tokenize(fragment) or [fragment.strip().lower()]:
+            uids = set()
+            for term, postings in self._postings[field].items():
+                if word in term:
+                    uids |= postings
+            result = uids if result is None else result & uids
+        return result or set()
+
+    def match(self, filters: Dict[str, Iterable[str]]) -> Optional[Set[str]]:
+        """
+        Answer a conjunctive query.
+
+        Alternatives given for one field are OR-ed; fields are AND-ed. For
+        `subjects` the alternatives are word fragments (see lookup_containing),
+        for the other fields they are exact terms. The intersection starts
+        with the smallest postings set.
+
+        Args:
+            filters: Field name -> accepted values
+
+        Returns:
+            The matching uids, or None when no indexed field was filtered on
+        """
+        candidates = []
+        for field, values in filters.items():
+            if field not in self._postings or not values:
+                continue
+
+            uids = set()
+            for value in values:
+                if field == 'subjects':
+                    uids |= self.lookup_containing(field, value)
+                else:
+                    uids |= self.lookup(field, value)
+            candidates.append(uids)
+
+        if not candidates:
+            return None
+
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for uids in candidates[1:]:
+            result &= uids
+            if not result:
+                break
+        return result
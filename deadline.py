@@ -0,0 +1,192 @@
+"""
+LXP - Advanced AI development Workshop: per-turn time budget
+
+A turn can take several agent iterations, each with a Gemini call and tool
+calls that may reach the FBI API, and every one of them used to have its own
+timeout without knowing how long the turn had already taken. Here the turn
+gets one deadline (TURN_BUDGET_SECONDS, set by ChatBackend.process_message)
+and everything the turn runs reads it:
+
+- DeadlineAgentExecutor starts no new iteration once it has passed, and
+  DeadlineChatAgent then answers with what the finished tool calls found
+- every LLM call of the agent, and the memory's summarizer call, gets the
+  time left as its timeout (DeadlineBinding)
+- FBI API requests, retry waits and shared requests are cut to the time left
+  (see fbi_client.py), including the concurrent page downloads of a catalog
+  sync, whose workers run in a copy of the turn's context
+
+The deadline lives in a context variable, so it follows the turn into asyncio
+tasks, asyncio.to_thread and LangChain's worker threads (which copy the
+context), while plain background threads, such as the catalog's refresh, are
+not part of any turn and never see it.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from langchain.agents import AgentExecutor, ConversationalChatAgent
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.runnables import RunnableBinding
+
+# Set in the return values of an answer given before the agent finished
+STOPPED_KEY = "stopped"
+
+# Monotonic time at which the current turn must be answered (None: no limit)
+_deadline: ContextVar[Optional[float]] = ContextVar("turn_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised instead of starting work that cannot finish before the deadline."""
+
+
+@contextmanager
+def turn_deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Give the code in the block `seconds` to finish.
+
+    A deadline set inside another one can only shorten it.
+
+    Args:
+        seconds: Time budget (None or 0: no limit)
+    """
+    deadline = time.monotonic() + seconds if seconds else None
+    current = _deadline.get()
+    if current is not None and (deadline is None or current < deadline):
+        deadline = current
+
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline (negative once passed, None without deadline)."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    """Whether the current deadline has passed."""
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def timeout(default: float) -> float:
+    """
+    Timeout for a blocking call: `default`, cut to the time left.
+
+    Args:
+        default: The call's usual timeout in seconds
+
+    Returns:
+        The timeout to use
+
+    Raises:
+        DeadlineExceeded: If there is no time left
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded("The time budget of this turn is spent")
+    return min(default, left)
+
+
+class DeadlineBinding(RunnableBinding):
+    """
+    Binding of a chat model that passes the time left in the turn as the
+    `timeout` of each call (Gemini cancels the request once it is reached).
+
+    Use it instead of llm.bind(...): DeadlineBinding(bound=llm, kwargs={...}).
+    """
+
+    def _with_timeout(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        left = remaining()
+        if left is None:
+            return kwargs
+        default = kwargs.get('timeout') or self.kwargs.get('timeout') or getattr(self.bound, 'timeout', None)
+        return {**kwargs, 'timeout': timeout(default or left)}
+
+    def invoke(self, input, config=None, **kwargs):
+        return super().invoke(input, config, **self._with_timeout(kwargs))
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        return await super().ainvoke(input, config, **self._with_timeout(kwargs))
+
+    def batch(self, inputs, config=None, *, return_exceptions=False, **kwargs):
+        return super().batch(inputs, config, return_exceptions=return_exceptions, **self._with_timeout(kwargs))
+
+    async def abatch(self, inputs, config=None, *, return_exceptions=False, **kwargs):
+        return await super().abatch(inputs, config, return_exceptions=return_exceptions, **self._with_timeout(kwargs))
+
+    def stream(self, input, config=None, **kwargs):
+        return super().stream(input, config, **self._with_timeout(kwargs))
+
+    def astream(self, input, config=None, **kwargs):
+        return super().astream(input, config, **self._with_timeout(kwargs))
+
+
+class DeadlineChatAgent(ConversationalChatAgent):
+    """
+    ConversationalChatAgent answering with its partial results when the turn runs out of time.
+
+    Every answer given without finishing (deadline or iteration limit) has
+    `stopped` set in its return values, so it is never cached as a full answer.
+    """
+
+    def return_stopped_response(self,
+                                early_stopping_method: str,
+                                intermediate_steps: List[Tuple[AgentAction, str]],
+                                **kwargs: Any) -> AgentFinish:
+        if not expired():
+            finish = super().return_stopped_response(early_stopping_method, intermediate_steps, **kwargs)
+            return AgentFinish({**finish.return_values, STOPPED_KEY: True}, finish.log)
+        return AgentFinish({"output": partial_answer(intermediate_steps), STOPPED_KEY: True},
+                           "Stopped by the turn deadline")
+
+
+class DeadlineAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor stopping at the turn deadline.
+
+    No iteration starts after the deadline, and an iteration interrupted by
+    it (an LLM call that timed out, for instance) ends the turn instead of
+    failing it: in both cases the agent's return_stopped_response() gives
+    the answer.
+    """
+
+    def _should_continue(self, iterations: int, time_elapsed: float) -> bool:
+        return not expired() and super()._should_continue(iterations, time_elapsed)
+
+    def _take_next_step(self, name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager=None):
+        try:
+            return super()._take_next_step(name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager)
+        except Exception:
+            if not expired():
+                raise
+            return self._action_agent.return_stopped_response(self.early_stopping_method, intermediate_steps, **inputs)
+
+    async def _atake_next_step(self, name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager=None):
+        try:
+            return await super()._atake_next_step(name_to_tool_map, color_mapping, inputs, intermediate_steps,
+                                                  run_manager)
+        except Exception:
+            if not expired():
+                raise
+            return self._action_agent.return_stopped_response(self.early_stopping_method, intermediate_steps, **inputs)
+
+
+def partial_answer(intermediate_steps: List[Tuple[AgentAction, str]]) -> str:
+    """
+    Best answer without the LLM: the output of the last tool call that
+    returned something, presented as incomplete.
+    """
+    for _, observation in reversed(intermediate_steps):
+        if isinstance(observation, str) and observation.strip() and not observation.startswith("Error"):
+            return ("⏱️ I ran out of time before finishing my answer. Here is what I found so far:\n\n"
+                    + observation)
+    return "⏱️ Sorry, I could not answer in time. Please try again, or ask a more specific question."
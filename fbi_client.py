@@ -0,0 +1,449 @@
+"""
+LXP - Advanced AI development Workshop: shared FBI API client
+
+Every request to api.fbi.gov goes through the FBIClient defined here. It keeps
+a pooled `requests.Session`, so consecutive calls reuse the same keep-alive
+TCP+TLS connection instead of paying a new handshake each time, and it is the
+one place where timeouts and headers are configured. Decoded responses are
+kept in a TTL + LRU cache (see http_cache.py), so repeated queries are served
+without downloading the same page again, and identical requests issued
+concurrently by several sessions share a single upstream call.
+
+When the API misbehaves, failed requests (network errors, 429 and 5xx) are
+retried with jittered exponential backoff, and a circuit breaker stops
+calling it altogether after repeated failures or slow responses, so callers
+fail in microseconds instead of each waiting for a timeout.
+
+Requests made during a chat turn never outlive the turn's deadline (see
+deadline.py): timeouts, retry waits and waits for a shared request are cut to
+the time the turn has left.
+"""
+
+import logging
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future, wait
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import deadline
+from deadline import DeadlineExceeded
+from http_cache import ResponseCache, make_cache_key
+from metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+FBI_API_BASE_URL = "https://api.fbi.gov"
+LIST_PATH = "/wanted/v1/list"
+PERSON_PATH = "/@wanted-person/{uid}"
+
+# FBI unique IDs: 32 lowercase hexadecimal digits
+UID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+# How long responses stay cached, per endpoint. List pages change a few times
+# a day; a person's record changes far less often.
+CACHE_TTLS = {
+    LIST_PATH: 300,
+    "/@wanted-person/": 3600,
+}
+
+
+# Status codes worth retrying: rate limiting and server-side errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling the API while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a failing service for a while.
+
+    - Closed: calls go through; failures and slow calls are counted
+    - Open: after `failure_threshold` consecutive bad calls, every call is
+      refused for `reset_timeout` seconds
+    - Half-open: then a single trial call is let through; its outcome closes
+      or re-opens the circuit
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, slow_call_seconds: float = 5.0):
+        """
+        Args:
+            failure_threshold: Consecutive failures (or slow calls) opening the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+            slow_call_seconds: Successful calls slower than this count as failures
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_call_seconds = slow_call_seconds
+
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Check that a call may go through.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (or a trial call is running)
+        """
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half-open"
+            if self.state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return
+            retry_in = max(self.reset_timeout - (time.monotonic() - self._opened_at), 0)
+        raise CircuitOpenError(f"FBI API circuit open after repeated failures, retrying in {retry_in:.0f}s")
+
+    def record_success(self, elapsed: float):
+        """Record a completed call and how long it took, in seconds."""
+        if elapsed > self.slow_call_seconds:
+            self.record_failure()
+            return
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_running = False
+
+    def release(self):
+        """Record a call abandoned for reasons unrelated to the service (e.g. the turn's deadline)."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        """Record a failed call."""
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning("FBI API circuit opened after %d failures", self.failures)
+                    get_metrics().increment("http.circuit_opened")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Delay before retry number `attempt` (0 for the first retry): exponential
+    with full jitter, so clients that failed together do not retry together.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+# Result handed to the callers waiting for a leader that ran out of time:
+# they try again, with their own deadline
+_RETRY = object()
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls into one.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive with the same key while it is still running wait for the leader and
+    receive the same result, or the same exception.
+
+    The one exception not shared is DeadlineExceeded: it comes from the
+    leader's turn deadline, not from the API, so the waiting callers, whose
+    turns may have more time left, try again and one of them becomes the new
+    leader. Each waiting caller only waits as long as its own deadline allows.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.shared = 0  # Calls answered by another caller's request
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run `fn` unless a call with the same key is already in flight.
+
+        Args:
+            key: Identifies equivalent calls
+            fn: Function performing the call
+
+        Returns:
+            The result of `fn`, possibly computed for another caller
+        """
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._calls[key] = future
+                else:
+                    self.shared += 1
+
+            if leader:
+                return self._lead(key, future, fn)
+
+            # Not future.result(timeout=...): its TimeoutError could not be told
+            # apart from a TimeoutError raised by the leader's call
+            done, _ = wait([future], timeout=_wait_timeout())
+            if not done:
+                raise DeadlineExceeded("Turn deadline reached while waiting for a shared FBI API request")
+
+            result = future.result()
+            if result is not _RETRY:
+                return result
+
+    def _lead(self, key: str, future: Future, fn: Callable[[], Any]) -> Any:
+        """Run `fn` as the leader for `key` and hand its outcome to the waiting callers."""
+        try:
+            result = fn()
+        except DeadlineExceeded:
+            self._finish(key, future, _RETRY)
+            raise
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+
+        self._finish(key, future, result)
+        return result
+
+    def _finish(self, key: str, future: Future, result: Any = None, error: Optional[BaseException] = None):
+        """Forget the in-flight call, then release its waiting callers."""
+        # Removed first, so that callers told to retry start a new call
+        with self._lock:
+            del self._calls[key]
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+class FBIClient:
+    """
+    Thin wrapper around a pooled HTTP session for the FBI Wanted API.
+
+    Why a session?
+    - Connections are kept alive and reused across tool calls
+    - Responses are negotiated as gzip, which shrinks JSON pages a lot
+    - Headers and timeouts are set once instead of in every tool
+
+    On top of the session, decoded responses are cached per canonical query,
+    concurrent identical requests are coalesced into one, failed requests are
+    retried and a circuit breaker guards the API.
+    """
+
+    def __init__(self,
+                 base_url: str = FBI_API_BASE_URL,
+                 pool_size: int = 10,
+                 timeout: float = 10.0,
+                 cache: Optional[ResponseCache] = None,
+                 max_retries: int = 2,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 8.0,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Create a client with its own connection pool.
+
+        Args:
+            base_url: Root URL of the FBI API
+            pool_size: Maximum number of keep-alive connections kept open
+            timeout: Default timeout in seconds for every request
+            cache: Response cache (defaults to a new 16 MB cache)
+            max_retries: Retries of a failed request (network error, 429, 5xx)
+            backoff_base: First retry waits up to this many seconds, then x2 per retry
+            backoff_max: Upper bound of a retry delay, in seconds
+            breaker: Circuit breaker (defaults to CircuitBreaker())
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache = cache if cache is not None else ResponseCache(ttls=CACHE_TTLS)
+        self.inflight = SingleFlight()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "User-Agent": "fbi-information-assistant/1.0",
+        })
+
+    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Send a GET request and decode the JSON body.
+
+        Cached responses are returned without any network access. On a miss,
+        concurrent callers with the same query wait for one shared request.
+        Responses are shared between callers, so they must not be modified.
+
+        Args:
+            path: API path, relative to the base URL
+            params: Query string parameters
+
+        Returns:
+            The decoded JSON response
+
+        Raises:
+            requests.RequestException: On network errors or non-2xx responses
+            DeadlineExceeded: If the current turn's deadline is reached first
+        """
+        key = make_cache_key(path, params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        return self.inflight.do(key, lambda: self._fetch(path, params, key))
+
+    def _fetch(self, path: str, params: Optional[Dict[str, Any]], key: str) -> Any:
+        """
+        Download a response, retrying transient failures, and cache it before
+        in-flight waiters are released.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                data, size = self._request(path, params)
+                break
+            except requests.RequestException as e:
+                if attempt == self.max_retries or not _retryable(e):
+                    raise
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                left = deadline.remaining()
+                if left is not None and delay >= left:
+                    raise DeadlineExceeded("No time left in the turn to retry an FBI API request") from e
+                get_metrics().increment("http.retries")
+                time.sleep(delay)
+
+        self.cache.put(key, path, data, size)
+        return data
+
+    def _request(self, path: str, params: Optional[Dict[str, Any]]) -> Tuple[Any, int]:
+        """Send one request through the circuit breaker; return the decoded body and its size."""
+        timeout = deadline.timeout(self.timeout)
+        self.breaker.allow()
+
+        metrics = get_metrics()
+        started = time.monotonic()
+        try:
+            with metrics.span("http.list" if path == LIST_PATH else "http.person"):
+                response = self.session.get(f"{self.base_url}{path}", params=params, timeout=timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            # A timeout shortened by the turn's deadline says nothing about the API
+            if isinstance(e, requests.Timeout) and timeout < self.timeout:
+                self.breaker.release()
+                raise DeadlineExceeded("Turn deadline reached during an FBI API request") from e
+            # A 404 is an answer, not a sign of an unhealthy API
+            if _status(e) is not None and _status(e) < 500 and _status(e) != 429:
+                self.breaker.record_success(time.monotonic() - started)
+            else:
+                self.breaker.record_failure()
+            raise
+        self.breaker.record_success(time.monotonic() - started)
+
+        with metrics.span("http.decode"):
+            return response.json(), len(response.content)
+
+    def list_persons(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Query the /list endpoint.
+
+        Args:
+            params: List parameters (page, pageSize, sort_on, filters, ...)
+
+        Returns:
+            Dict with `total`, `page` and `items`
+        """
+        return self.get_json(LIST_PATH, params)
+
+    def get_person(self, uid: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a single person by unique ID.
+
+        Args:
+            uid: The FBI unique ID of the person
+
+        Returns:
+            The person record, or None if the FBI does not know this ID (or
+            `uid` is not an FBI ID, in which case no request is sent)
+        """
+        if not UID_PATTERN.fullmatch(uid):
+            return None
+        try:
+            return self.get_json(PERSON_PATH.format(uid=uid))
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+
+
+def _wait_timeout() -> Optional[float]:
+    """How long a request may wait for another caller's: the time left in the turn, if any."""
+    left = deadline.remaining()
+    return None if left is None else max(left, 0)
+
+
+def _status(error: requests.RequestException) -> Optional[int]:
+    """HTTP status of a failed request (None for network errors)."""
+    return error.response.status_code if error.response is not None else None
+
+
+def _retryable(error: requests.RequestException) -> bool:
+    """Whether a failed request may succeed if sent again."""
+    if isinstance(error, CircuitOpenError):
+        return False
+    status = _status(error)
+    return status is None or status in RETRY_STATUSES
+
+
+_client: Optional[FBIClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> FBIClient:
+    """
+    Get the process-wide FBI API client, creating it on first use.
+
+    The pool size, timeout, retries and circuit breaker settings come from
+    environment variables (see config.env.template), so each deployment can
+    tune them per process.
+
+    Returns:
+        FBIClient: Shared client instance
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = FBIClient(
+                    base_url=os.getenv("FBI_API_BASE_URL", FBI_API_BASE_URL),
+                    pool_size=int(os.getenv("FBI_HTTP_POOL_SIZE", "10")),
+                    timeout=float(os.getenv("FBI_HTTP_TIMEOUT_SECONDS", "10")),
+                    cache=ResponseCache(
+                        max_bytes=int(os.getenv("FBI_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+                        ttls=CACHE_TTLS,
+                    ),
+                    max_retries=int(os.getenv("FBI_HTTP_MAX_RETRIES", "2")),
+                    backoff_base=float(os.getenv("FBI_HTTP_BACKOFF_BASE_SECONDS", "0.5")),
+                    backoff_max=float(os.getenv("FBI_HTTP_BACKOFF_MAX_SECONDS", "8")),
+                    breaker=CircuitBreaker(
+                        failure_threshold=int(os.getenv("FBI_CIRCUIT_FAILURE_THRESHOLD", "5")),
+                        reset_timeout=float(os.getenv("FBI_CIRCUIT_RESET_SECONDS", "30")),
+                        slow_call_seconds=float(os.getenv("FBI_CIRCUIT_SLOW_CALL_SECONDS", "5")),
+                    ),
+                )
+    return _client
@@ -2,16 +2,19 @@
 LXP - Advanced AI development Workshop: FBI Information Assistant frontend
 """
 
+import os
 import streamlit as st
-from langchain.memory import ConversationBufferMemory
+from memory import SummaryWindowMemory
 from langchain_community.callbacks import StreamlitCallbackHandler
 from langchain_community.chat_message_histories import StreamlitChatMessageHistory
+from streamlit.runtime.scriptrunner import add_script_run_ctx
 import time
 import random
 
 # Import our backend logic
 from backend import get_backend_instance
-from prompts import INITIAL_MESSAGE, CHAT_INPUT_PLACEHOLDER
+from metrics import get_metrics
+from prompts import INITIAL_MESSAGE, CHAT_INPUT_PLACEHOLDER, LANGUAGE_PREFIXES
 
 def setup_page():
     """
@@ -119,6 +122,7 @@ def setup_sidebar(msgs):
     # Reset button
     if st.sidebar.button("🔄 Reset Chat", help="Start a new conversation", key="reset_chat_button"):
         msgs.clear()
+        st.session_state.pop("memory", None)  # Drop the summary too
         msgs.add_ai_message(INITIAL_MESSAGE)
         st.session_state.steps = {}
         st.rerun()
@@ -139,18 +143,101 @@ def setup_sidebar(msgs):
                 st.session_state.language = 'en'
                 st.rerun()
 
-def setup_chat_memory():
+def show_fast_path_stats(backend):
+    """
+    Show how many messages were answered without the LLM (see router.py
+    and answer_cache.py).
+    """
+    if backend.answer_cache is not None:
+        stats = backend.answer_cache.stats()
+        st.sidebar.caption(
+            f"💾 Answer cache: {stats['hit_rate']:.0%} hit rate "
+            f"({stats['exact_hits']} exact, {stats['near_hits']} near, {stats['entries']} cached)"
+        )
+    
+    if backend.router is not None:
+        stats = backend.router.stats()
+        st.sidebar.caption(
+            f"⚡ Fast path: {stats['hit_rate']:.0%} of messages answered without the LLM "
+            f"({stats['hits']}/{stats['hits'] + stats['misses']})"
+        )
+
+
+def show_metrics_panel():
+    """
+    Show the latency histograms recorded in this process (see metrics.py):
+    where the time of the agent turns, LLM calls, tools and API requests goes.
+    """
+    snapshot = get_metrics().snapshot()
+    if not snapshot['histograms']:
+        return
+    
+    with st.sidebar.expander("⏱️ Performance"):
+        st.dataframe(
+            [
+                {
+                    'span': name,
+                    'count': summary['count'],
+                    'p50 ms': round(summary['p50'], 1),
+                    'p95 ms': round(summary['p95'], 1),
+                    'max ms': round(summary['max'], 1),
+                }
+                for name, summary in snapshot['histograms'].items()
+                if name != 'agent.iterations_per_turn'
+            ],
+            hide_index=True,
+        )
+        
+        counters = snapshot['counters']
+        iterations = snapshot['histograms'].get('agent.iterations_per_turn')
+        if iterations:
+            st.caption(f"🔁 {iterations['mean']:.1f} agent iterations per turn on average")
+        if counters.get('llm.calls'):
+            st.caption(
+                f"🔤 {counters['llm.calls']:.0f} LLM calls, "
+                f"{counters.get('llm.input_tokens', 0):.0f} input / "
+                f"{counters.get('llm.output_tokens', 0):.0f} output tokens"
+            )
+        
+        if counters.get('tracing.dropped'):
+            st.caption(f"⚠️ {counters['tracing.dropped']:.0f} tracing events dropped (Langfuse too slow)")
+        
+        if st.button("Reset metrics"):
+            get_metrics().reset()
+            st.rerun()
+
+
+@st.cache_resource(show_spinner=False)
+def load_backend():
+    """
+    Create the backend once per process and share it across reruns and sessions.
+    
+    Without this, every rerun (each keystroke or click) would reload the
+    environment and rebuild the LLM client and the Langfuse handler.
+    """
+    return get_backend_instance()
+
+
+def setup_chat_memory(backend):
     """
     Set up conversation memory and history.
+    
+    The memory lives in the session state: besides the messages it holds the
+    running summary of the older turns, which must survive reruns.
     """
     msgs = StreamlitChatMessageHistory()
-    memory = ConversationBufferMemory(
-        chat_memory=msgs, 
-        return_messages=True, 
-        memory_key="chat_history", 
-        output_key="output"
-    )
-    return msgs, memory
+    if "memory" not in st.session_state:
+        st.session_state.memory = SummaryWindowMemory(
+            llm=backend.llm,  # The chat model also writes the summaries
+            chat_memory=msgs,
+            return_messages=True,
+            memory_key="chat_history",
+            output_key="output",
+            keep_last_turns=int(os.getenv("CHAT_MEMORY_KEEP_TURNS", "3")),
+            fold_after_turns=int(os.getenv("CHAT_MEMORY_FOLD_AFTER_TURNS", "0")),
+            max_token_limit=int(os.getenv("CHAT_MEMORY_MAX_TOKENS", "2000")),
+        )
+    return msgs, st.session_state.memory
 
 
 def initialize_chat_if_needed(msgs):
@@ -170,6 +257,7 @@ def add_reset_button(msgs):
     
     if st.sidebar.button("🔄 Reset Chat", help="Start a new conversation"):
         msgs.clear()
+        st.session_state.pop("memory", None)  # Drop the summary too
         msgs.add_ai_message(INITIAL_MESSAGE)
         st.session_state.steps = {}
         st.rerun()
@@ -209,9 +297,13 @@ def display_intermediate_steps(message_index):
             "search_fbi_by_status": "📊",
             "search_fbi_by_classification": "🏷️",
             "get_fbi_person_details": "📄",
+            "get_fbi_person_section": "📑",
             "get_fbi_terrorism_list": "🔴",
             "get_fbi_by_poster_classification": "📌",
-            "get_fbi_advanced_search": "🎯"
+            "get_fbi_advanced_search": "🎯",
+            "search_fbi_by_criteria": "🧩",
+            "aggregate_fbi_cases": "📈",
+            "search_fbi_by_description": "📝"
         }
         
         tool_name = step[0].tool
@@ -228,24 +320,28 @@ def handle_user_input(msgs, memory, backend):
     Handle user input and generate AI response.
     """
     if prompt := st.chat_input(placeholder=CHAT_INPUT_PLACEHOLDER):
-        # Add language prefix if French is selected
-        if st.session_state.language == 'fr':
-            prompt = "Réponds en français : " + prompt
-        else:
-            prompt = "Answer in English : " + prompt
+        # Add the language instruction (French or English)
+        prompt = LANGUAGE_PREFIXES[st.session_state.language] + prompt
         
         # Display user message
         st.chat_message("human", avatar="👤").write(prompt)
         
-        # Process through AI
+        # Process through AI, displaying the answer as it is written
         with st.chat_message("ai", avatar="🚨"):
-            with st.spinner("🔍 Searching FBI database..."):
-                st_cb = StreamlitCallbackHandler(st.container(), expand_new_thoughts=False)
-                executor = backend.create_agent_executor(memory)
-                response = backend.process_message(prompt, executor, st_cb)
-            
-            # Display response
-            st.write(response["output"])
+            st_cb = StreamlitCallbackHandler(st.container(), expand_new_thoughts=False)
+            stream = backend.stream_message(
+                prompt,
+                streamlit_callback=st_cb,
+                memory=memory,
+                thread_initializer=add_script_run_ctx,  # Lets the worker thread update the UI
+            )
+            answer = st.empty()
+            with answer.container():
+                st.write_stream(stream)
+            response = stream.response
+            if stream.needs_rewrite:
+                # Show the answer as stored in the history, not the interrupted stream
+                answer.markdown(response["output"])
             
             # Store tool usage steps
             st.session_state.steps[str(len(msgs.messages) - 1)] = response["intermediate_steps"]
@@ -261,12 +357,14 @@ def main():
     # Setup page
     setup_page()
     
-    # Initialize backend and memory
-    backend = get_backend_instance()
-    msgs, memory = setup_chat_memory()
+    # Get the shared backend and this session's memory
+    backend = load_backend()
+    msgs, memory = setup_chat_memory(backend)
     
     # Setup sidebar with msgs
     setup_sidebar(msgs)
+    show_fast_path_stats(backend)
+    show_metrics_panel()
     
     # Initialize chat
     initialize_chat_if_needed(msgs)
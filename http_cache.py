@@ -0,0 +1,165 @@
+"""
+LXP - Advanced AI development Workshop: FBI API response cache
+
+An in-process cache for decoded FBI API responses. Entries expire after a
+per-endpoint TTL and the least recently used ones are evicted once the cache
+holds more than a fixed number of bytes. Keys are built from canonicalized
+query parameters, so the same query written slightly differently (other key
+order, other case, explicit defaults) is still a hit.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Parameters that the API treats as absent when they hold these values
+DEFAULT_PARAMS = {
+    'page': '1',
+}
+
+
+def make_cache_key(path: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build a canonical cache key for an API request.
+
+    Parameter names and values are lowercased and stripped, empty values and
+    explicit defaults are dropped, and the remaining pairs are sorted.
+
+    Args:
+        path: API path of the request
+        params: Query string parameters
+
+    Returns:
+        str: A key that is equal for equivalent requests
+    """
+    canonical = []
+    for name, value in (params or {}).items():
+        name = str(name).strip().lower()
+        if value is None:
+            continue
+        value = str(value).strip().lower()
+        if value == "" or DEFAULT_PARAMS.get(name) == value:
+            continue
+        canonical.append((name, value))
+
+    canonical.sort()
+    query = "&".join(f"{name}={value}" for name, value in canonical)
+    return f"{path}?{query}"
+
+
+class ResponseCache:
+    """
+    Thread-safe TTL + LRU cache bounded by the size of the cached responses.
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self,
+                 max_bytes: int = 16 * 1024 * 1024,
+                 default_ttl: float = 300,
+                 ttls: Optional[Dict[str, float]] = None):
+        """
+        Create an empty cache.
+
+        Args:
+            max_bytes: Upper bound on the summed size of cached responses
+            default_ttl: Seconds an entry stays valid when its path has no TTL
+            ttls: Per-endpoint TTLs in seconds, keyed by API path prefix
+        """
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+
+        # key -> (expires_at, size, value), least recently used first
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def ttl_for(self, path: str) -> float:
+        """Get the TTL of an endpoint (the longest matching path prefix wins)."""
+        matches = [prefix for prefix in self.ttls if path.startswith(prefix)]
+        if not matches:
+            return self.default_ttl
+        return self.ttls[max(matches, key=len)]
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_cache_key()
+
+        Returns:
+            The cached value, or None on a miss or an expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: str, path: str, value: Any, size: int):
+        """
+        Store a response, evicting least recently used entries if needed.
+
+        Args:
+            key: Cache key from make_cache_key()
+            path: API path, used to pick the TTL
+            value: Decoded response to cache
+            size: Size of the response in bytes
+        """
+        ttl = self.ttl_for(path)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict with hits, misses, hit_rate, evictions, entries and bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
+
+    def _remove(self, key: str):
+        """Remove an entry; the caller must hold the lock."""
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,157 @@
+"""
+LXP - Advanced AI development Workshop: token-bounded conversation memory
+
+ConversationBufferMemory sends the whole conversation to Gemini on every agent
+step, so long sessions get slower and more expensive with every message.
+SummaryWindowMemory keeps the prompt size flat instead:
+
+1. The last few turns are passed to the agent word for word
+2. Older turns are folded into a running summary, written by the LLM
+3. The summary is updated incrementally: each fold only sends the summary
+   and the turns being folded, never the whole conversation
+4. Folds happen in batches: the window grows up to a high watermark and is
+   then folded back down in one summarizer call, so most turns make none
+
+The message history itself is left untouched, so the UI still shows every
+message; the memory only remembers how many of them are already summarized.
+"""
+
+import logging
+from typing import Any, Dict, List
+
+from langchain.memory.chat_memory import BaseChatMemory
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.messages import BaseMessage, SystemMessage, get_buffer_string
+
+from deadline import DeadlineBinding
+from prompts import SUMMARY_PROMPT
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(messages: List[BaseMessage]) -> int:
+    """
+    Rough token count of messages (about 4 characters per token).
+
+    Good enough for budgeting, and free: Gemini's own token counter is a
+    network call.
+    """
+    return sum(len(message.content) for message in messages) // 4
+
+
+class SummaryWindowMemory(BaseChatMemory):
+    """
+    Conversation memory with a token budget and a rolling summary.
+
+    Turns (a user message and the answer) are kept verbatim until the window
+    holds more than `fold_after_turns` turns (2 × `keep_last_turns` by
+    default) or more than `max_token_limit` tokens. The oldest turns are then
+    folded into a summary of at most `summary_max_words` words, leaving
+    `keep_last_turns` turns and at most half the token limit, so the
+    summarizer runs once every few turns rather than after each one.
+    """
+
+    llm: BaseLanguageModel              # Writes the summaries
+    memory_key: str = "chat_history"
+    keep_last_turns: int = 3
+    fold_after_turns: int = 0           # 0: twice keep_last_turns
+    max_token_limit: int = 2000
+    summary_max_words: int = 200
+
+    summary: str = ""
+    summarized_count: int = 0           # Messages of chat_memory already in the summary
+
+    @property
+    def memory_variables(self) -> List[str]:
+        return [self.memory_key]
+
+    @property
+    def recent_messages(self) -> List[BaseMessage]:
+        """Messages not folded into the summary yet."""
+        messages = self.chat_memory.messages
+        if self.summarized_count > len(messages):
+            # The history was cleared behind our back: the summary is stale
+            self.summary = ""
+            self.summarized_count = 0
+        return messages[self.summarized_count:]
+
+    def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the history for the prompt: the summary, then the recent messages.
+
+        Args:
+            inputs: Chain inputs (unused)
+
+        Returns:
+            Dict with the history under `memory_key`
+        """
+        messages = list(self.recent_messages)
+        if self.summary:
+            messages.insert(0, SystemMessage(content=f"Summary of the earlier conversation:\n{self.summary}"))
+
+        if self.return_messages:
+            return {self.memory_key: messages}
+        return {self.memory_key: get_buffer_string(messages)}
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]):
+        """Save a turn, then fold the oldest turns if the window is too large."""
+        super().save_context(inputs, outputs)
+        self.prune()
+
+    def prune(self):
+        """
+        Once the window passes its high watermark, fold the oldest recent
+        messages into the summary until it holds at most `keep_last_turns`
+        turns and half the token budget.
+
+        The latest turn is always kept. If the summarizer fails, the messages
+        stay in the window and folding is retried after the next turn.
+        """
+        recent = self.recent_messages
+        turns = sum(1 for message in recent if message.type == "human")
+        if (turns <= (self.fold_after_turns or 2 * self.keep_last_turns)
+                and estimate_tokens(recent) <= self.max_token_limit):
+            return  # Below the watermark: no summarizer call this turn
+
+        keep = min(len(recent) - len(recent) % 2, 2 * self.keep_last_turns)
+        while keep > 2 and estimate_tokens(recent[-keep:]) > self.max_token_limit // 2:
+            keep -= 2
+
+        folded = recent[:len(recent) - keep]
+        if not any(message.type == "human" for message in folded):
+            # Nothing worth a summarizer call yet (at most the welcome message)
+            return
+
+        try:
+            self.summary = self.summarize(folded)
+        except Exception:
+            logger.exception("Could not summarize the conversation; keeping %d messages verbatim", len(folded))
+            return
+        self.summarized_count += len(folded)
+
+    def summarize(self, messages: List[BaseMessage]) -> str:
+        """
+        Extend the current summary with some messages.
+
+        The call is limited to the time left in the current turn, if any
+        (see deadline.py), like the agent's own LLM calls.
+
+        Args:
+            messages: Messages to fold into the summary, oldest first
+
+        Returns:
+            str: The new summary
+        """
+        prompt = SUMMARY_PROMPT.format(
+            summary=self.summary or "(empty)",
+            new_lines=get_buffer_string(messages),
+            max_words=self.summary_max_words,
+        )
+        summary = DeadlineBinding(bound=self.llm, kwargs={}).invoke(prompt)
+        return getattr(summary, "content", summary).strip()
+
+    def clear(self):
+        """Forget the summary and the history."""
+        super().clear()
+        self.summary = ""
+        self.summarized_count = 0
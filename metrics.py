@@ -0,0 +1,370 @@
+"""
+LXP - Advanced AI development Workshop: in-process latency metrics
+
+Langfuse shows what happened in a conversation, but not, locally and at a
+glance, where the time of a slow turn went. This module records spans into
+in-process histograms:
+
+- agent.turn / agent.iteration: a whole turn, and each think-act step of it
+- llm.call: each Gemini call (plus token counters)
+- tool.<name>: each tool call
+- catalog.<method>: the data access part of a tool
+- format.<tool>: the budgeted rendering of a tool's output
+- http.<endpoint> / http.decode: each FBI API request and its JSON decoding
+
+The histograms are shown in the sidebar, and can also be scraped in the
+Prometheus text format when METRICS_PORT is set. The endpoint listens on
+127.0.0.1 unless METRICS_HOST says otherwise (e.g. 0.0.0.0 for a remote
+scraper): metric labels can contain parts of user queries.
+"""
+
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds, in milliseconds (roughly x2 steps)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 60000)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with count, sum, min and max.
+
+    Percentiles are estimated by interpolating within the bucket that holds
+    them, so memory use stays constant however many values are recorded.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last one: above the top bucket
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value: float):
+        """Record one value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, p: float) -> float:
+        """
+        Estimate a percentile.
+
+        Args:
+            p: Percentile between 0 and 100
+
+        Returns:
+            float: Estimated value (0.0 if nothing was recorded)
+        """
+        if not self.count:
+            return 0.0
+
+        rank = p / 100 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(max(estimate, self.min), self.max)
+            seen += bucket_count
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Count, mean, p50, p95, p99 and max."""
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe set of named histograms and counters.
+    """
+
+    def __init__(self):
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, buckets=LATENCY_BUCKETS_MS):
+        """Record a value (a latency in milliseconds, unless `buckets` says otherwise)."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1):
+        """Add to a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    @contextmanager
+    def span(self, name: str):
+        """Time the enclosed block into the `name` histogram (in milliseconds)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a summary of every metric.
+
+        Returns:
+            Dict with `histograms` (name -> summary, see Histogram.summary())
+            and `counters` (name -> value)
+        """
+        with self._lock:
+            return {
+                'histograms': {name: h.summary() for name, h in sorted(self._histograms.items())},
+                'counters': dict(sorted(self._counters.items())),
+            }
+
+    def reset(self):
+        """Forget every recorded value."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, histogram in sorted(self._histograms.items()):
+                metric = _metric_name(name)
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{metric}_sum {histogram.total}")
+                lines.append(f"{metric}_count {histogram.count}")
+            for name, value in sorted(self._counters.items()):
+                metric = _metric_name(name)
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _metric_name(name: str) -> str:
+    """Turn "tool.get_fbi_most_wanted" into a valid Prometheus metric name."""
+    return "fbi_assistant_" + "".join(c if c.isalnum() else "_" for c in name)
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain callback handler recording agent, LLM and tool spans.
+
+    One instance can serve every conversation: state is keyed by run ID.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._starts: Dict[UUID, float] = {}
+        self._tool_names: Dict[UUID, str] = {}
+        # Agent runs in progress: run ID -> (turn start, last iteration boundary, iterations)
+        self._turns: Dict[UUID, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID):
+        with self._lock:
+            self._starts[run_id] = time.perf_counter()
+
+    def _elapsed_ms(self, run_id: UUID) -> Optional[float]:
+        with self._lock:
+            start = self._starts.pop(run_id, None)
+        return None if start is None else (time.perf_counter() - start) * 1000
+
+    # Agent turn and iterations -------------------------------------------
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs):
+        if parent_run_id is None:
+            now = time.perf_counter()
+            with self._lock:
+                self._turns[run_id] = [now, now, 0]
+
+    def on_agent_action(self, action, *, run_id: UUID, **kwargs):
+        self._iteration(run_id)
+
+    def on_agent_finish(self, finish, *, run_id: UUID, **kwargs):
+        self._iteration(run_id)
+
+    def _iteration(self, run_id: UUID):
+        """An iteration ends at each agent decision (a tool choice or the answer)."""
+        now = time.perf_counter()
+        with self._lock:
+            turn = self._turns.get(run_id)
+            if turn is None:
+                return
+            elapsed = (now - turn[1]) * 1000
+            turn[1] = now
+            turn[2] += 1
+        self.registry.observe("agent.iteration", elapsed)
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs):
+        self._end_turn(run_id)
+
+    def on_chain_error(self, error, *, run_id: UUID, **kwargs):
+        self._end_turn(run_id)
+
+    def _end_turn(self, run_id: UUID):
+        with self._lock:
+            turn = self._turns.pop(run_id, None)
+        if turn is not None:
+            self.registry.observe("agent.turn", (time.perf_counter() - turn[0]) * 1000)
+            self.registry.observe("agent.iterations_per_turn", turn[2], buckets=range(1, 16))
+
+    # LLM calls ---------------------------------------------------------
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._start(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        self._start(run_id)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        elapsed = self._elapsed_ms(run_id)
+        if elapsed is not None:
+            self.registry.observe("llm.call", elapsed)
+
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                self.registry.increment("llm.input_tokens", usage.get("input_tokens", 0))
+                self.registry.increment("llm.output_tokens", usage.get("output_tokens", 0))
+        self.registry.increment("llm.calls")
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        self._elapsed_ms(run_id)
+        self.registry.increment("llm.errors")
+
+    # Tool calls --------------------------------------------------------
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs):
+        self._start(run_id)
+        with self._lock:
+            self._tool_names[run_id] = (serialized or {}).get("name", "unknown")
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs):
+        self._end_tool(run_id)
+
+    def on_tool_error(self, error, *, run_id: UUID, **kwargs):
+        self._end_tool(run_id)
+        self.registry.increment("tool.errors")
+
+    def _end_tool(self, run_id: UUID):
+        with self._lock:
+            name = self._tool_names.pop(run_id, "unknown")
+        elapsed = self._elapsed_ms(run_id)
+        if elapsed is not None:
+            self.registry.observe(f"tool.{name}", elapsed)
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serves GET /metrics in the Prometheus text format."""
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = get_metrics().prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes are not worth a log line each
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve /metrics on a background thread.
+
+    Args:
+        port: TCP port to listen on
+        host: Interface to listen on (local only by default)
+
+    Returns:
+        ThreadingHTTPServer: The running server
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-server").start()
+    logger.info("Serving metrics on %s:%d", host, port)
+    return server
+
+
+_metrics: Optional[MetricsRegistry] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Get the process-wide metrics registry, creating it on first use.
+
+    If METRICS_PORT is set, the /metrics endpoint is started at the same time,
+    on METRICS_HOST (default 127.0.0.1).
+
+    Returns:
+        MetricsRegistry: Shared registry
+    """
+    global _metrics
+
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = MetricsRegistry()
+                port = os.getenv("METRICS_PORT")
+                if port:
+                    try:
+                        start_metrics_server(int(port), os.getenv("METRICS_HOST", "127.0.0.1"))
+                    except OSError as e:
+                        logger.warning("Could not serve metrics on port %s: %s", port, e)
+    return _metrics
+
+
+def span(name: str):
+    """Time a block into the shared registry: `with span("catalog.query"): ...`."""
+    return get_metrics().span(name)
+
+
+def timed(name: str):
+    """
+    Decorator timing every call of a function into the shared registry.
+
+    The registry is looked up at call time, so decorating at import time does
+    not create it (nor start the /metrics endpoint).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_metrics().span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
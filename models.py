@@ -0,0 +1,153 @@
+"""
+LXP - Advanced AI development Workshop: compact wanted person records
+
+The FBI API describes each person with a JSON object of about 60 fields,
+many of which the assistant never shows (image URLs, file lists, legacy
+fields), and some of which are long HTML narratives. Kept as dictionaries, a
+fully cached catalog costs several kilobytes per person. WantedPerson keeps
+only the fields the tools display:
+
+- `__slots__`: no per-record dictionary, one fixed attribute layout
+- values repeated across records (field offices, statuses, classifications,
+  subjects, physical traits...) are interned, so records share one string
+- lists become tuples, shared between records when they are equal
+- long narrative fields are stored zlib-compressed and decoded when read,
+  which only happens when a record is shown in full or indexed for search
+- images and files are reduced to their count, the only thing tools show
+
+Records are never modified once built: the catalog replaces a changed
+record with a new one, so readers can hold records without locks.
+"""
+
+import sys
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+# Plain text fields, kept as they are
+PLAIN_FIELDS = ('uid', 'title', 'url', 'publication', 'modified', 'reward_text', 'warning_message',
+                'weight', 'place_of_birth', 'age_range', 'ncic')
+
+# Text fields with few distinct values, interned
+INTERNED_FIELDS = ('status', 'person_classification', 'poster_classification', 'sex', 'race', 'hair',
+                   'eyes', 'complexion', 'build', 'nationality')
+
+# List fields, stored as tuples; in the first group, entries are interned and
+# equal tuples are shared between records
+SHARED_LIST_FIELDS = ('subjects', 'field_offices', 'occupations', 'languages', 'possible_countries',
+                      'possible_states')
+LIST_FIELDS = SHARED_LIST_FIELDS + ('aliases', 'dates_of_birth_used')
+
+NUMBER_FIELDS = ('height_min', 'height_max')
+
+# Long free-text fields (HTML), compressed
+NARRATIVE_FIELDS = ('description', 'caution', 'details', 'remarks', 'additional_information', 'scars_and_marks')
+
+# Shorter narratives are kept as text: compression would not pay off
+COMPRESS_MIN_CHARS = 200
+
+# Fields the API has in two versions; the raw one is the one shown
+RAW_FIELDS = {'race': 'race_raw', 'hair': 'hair_raw', 'eyes': 'eyes_raw'}
+
+_shared_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _intern(value: Any) -> Optional[str]:
+    """Intern a short text value (None and empty values become None)."""
+    return sys.intern(value) if isinstance(value, str) and value else None
+
+
+def _shared_tuple(values: Any) -> Tuple[str, ...]:
+    """Tuple of interned strings, the same object for every equal list."""
+    items = tuple(sys.intern(value) for value in values or () if isinstance(value, str))
+    return _shared_tuples.setdefault(items, items)
+
+
+def _compress(text: Any) -> Any:
+    """Narrative field as stored: None, short text, or compressed bytes."""
+    if not isinstance(text, str) or not text:
+        return None
+    if len(text) < COMPRESS_MIN_CHARS:
+        return text
+    return zlib.compress(text.encode("utf-8"))
+
+
+def _narrative(field: str) -> property:
+    """Property decoding a narrative field on access."""
+    slot = "_" + field
+
+    def read(self) -> Optional[str]:
+        value = getattr(self, slot)
+        if isinstance(value, bytes):
+            return zlib.decompress(value).decode("utf-8")
+        return value
+
+    return property(read, doc=f"The record's {field.replace('_', ' ')} (HTML), or None")
+
+
+class WantedPerson:
+    """
+    One person of the FBI wanted list, reduced to the fields the tools use.
+
+    Attributes have the names of the API fields. Missing text fields are
+    None, missing lists are empty tuples; `race`, `hair` and `eyes` hold the
+    API's raw values (`race_raw`...) when it has them.
+    """
+
+    __slots__ = (PLAIN_FIELDS + INTERNED_FIELDS + LIST_FIELDS + NUMBER_FIELDS
+                 + tuple("_" + field for field in NARRATIVE_FIELDS) + ('image_count', 'file_count'))
+
+    @classmethod
+    def from_api(cls, item: Dict[str, Any]) -> "WantedPerson":
+        """
+        Build a record from an FBI API item (or from to_dict() output).
+
+        Args:
+            item: Person as returned by the /list or /@wanted-person endpoints
+
+        Returns:
+            WantedPerson: The compact record
+        """
+        person = cls.__new__(cls)
+
+        for field in PLAIN_FIELDS:
+            value = item.get(field)
+            setattr(person, field, value if isinstance(value, str) and value else None)
+        for field in INTERNED_FIELDS:
+            setattr(person, field, _intern(item.get(RAW_FIELDS.get(field, field)) or item.get(field)))
+        for field in SHARED_LIST_FIELDS:
+            setattr(person, field, _shared_tuple(item.get(field)))
+        for field in ('aliases', 'dates_of_birth_used'):
+            setattr(person, field, tuple(value for value in item.get(field) or () if isinstance(value, str)))
+        for field in NUMBER_FIELDS:
+            value = item.get(field)
+            setattr(person, field, value if isinstance(value, (int, float)) else None)
+        for field in NARRATIVE_FIELDS:
+            setattr(person, "_" + field, _compress(item.get(field)))
+
+        person.image_count = len(item.get('images') or ()) or item.get('image_count', 0)
+        person.file_count = len(item.get('files') or ()) or item.get('file_count', 0)
+        return person
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        The record as a JSON-serializable dict, readable by from_api().
+
+        Returns:
+            Dict of every non-empty field, lists as lists
+        """
+        data = {}
+        for field in PLAIN_FIELDS + INTERNED_FIELDS + NUMBER_FIELDS + NARRATIVE_FIELDS + ('image_count', 'file_count'):
+            value = getattr(self, field)
+            if value:
+                data[field] = value
+        for field in LIST_FIELDS:
+            if getattr(self, field):
+                data[field] = list(getattr(self, field))
+        return data
+
+    def __repr__(self) -> str:
+        return f"WantedPerson(uid={self.uid!r}, title={self.title!r})"
+
+
+for _field in NARRATIVE_FIELDS:
+    setattr(WantedPerson, _field, _narrative(_field))
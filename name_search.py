@@ -0,0 +1,233 @@
+"""
+LXP - Advanced AI development Workshop: fuzzy name search over the FBI catalog
+
+Finds wanted persons by name even when the query is misspelled, uses a
+different word order or only matches one of the person's aliases.
+
+How it works:
+1. Candidates are generated from two indexes built over `title` and `aliases`:
+   character trigrams (typos) and Soundex codes of each word (sound-alikes)
+2. Each candidate name is scored word by word with an edit-distance
+   similarity, with a bonus when the words sound alike
+3. Results are ranked by score, best alias or title per person
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from models import WantedPerson
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Soundex digit for each consonant group; vowels and h/w/y have none
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+# Candidates sharing fewer trigrams than this fraction of the query's are skipped
+MIN_TRIGRAM_OVERLAP = 0.3
+
+# Only the names sharing the most trigrams with the query are scored
+MAX_CANDIDATES = 200
+
+
+def normalize_name(name: str) -> List[str]:
+    """Lowercase a name, strip accents and split it into words."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return WORD_PATTERN.findall(ascii_name.lower())
+
+
+@lru_cache(maxsize=8192)
+def soundex(word: str) -> str:
+    """
+    American Soundex code of a word (e.g. "Robert" and "Rupert" -> "R163").
+
+    Args:
+        word: A single lowercase word
+
+    Returns:
+        str: Four-character phonetic key, or "" for words without letters
+    """
+    letters = [c for c in word if c.isalpha()]
+    if not letters:
+        return ""
+
+    code = letters[0].upper()
+    previous = SOUNDEX_CODES.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+        # h and w do not separate letters with the same code; vowels do
+        if letter not in "hw":
+            previous = digit
+
+    return (code + "000")[:4]
+
+
+def trigrams(word: str) -> Set[str]:
+    """Character trigrams of a word, padded so short words still have some."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two strings (two-row dynamic programming)."""
+    if len(a) < len(b):
+        a, b = b, a
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        previous = current
+
+    return previous[-1]
+
+
+@lru_cache(maxsize=65536)
+def word_similarity(query_word: str, name_word: str) -> float:
+    """
+    Similarity between two words, from 0.0 to 1.0.
+
+    Based on edit distance, with a floor of 0.8 for words that sound alike
+    and a high score for a query word that is a prefix ("dan" vs "daniel").
+    """
+    if query_word == name_word:
+        return 1.0
+
+    score = 1.0 - edit_distance(query_word, name_word) / max(len(query_word), len(name_word))
+    if len(query_word) >= 3 and name_word.startswith(query_word):
+        score = max(score, 0.9)
+    if soundex(query_word) and soundex(query_word) == soundex(name_word):
+        score = max(score, 0.8)
+
+    return score
+
+
+def name_similarity(query_words: List[str], name_words: List[str]) -> float:
+    """
+    Similarity between a query and a name, from 0.0 to 1.0.
+
+    Each query word is matched to its most similar name word, so word order
+    does not matter and extra middle names in the record cost nothing.
+    """
+    if not query_words or not name_words:
+        return 0.0
+
+    total = sum(max(word_similarity(query_word, name_word) for name_word in name_words)
+                for query_word in query_words)
+    return total / len(query_words)
+
+
+class NameSearchIndex:
+    """
+    Trigram and phonetic index over the names and aliases of catalog records.
+
+    Build it with NameSearchIndex.build(records); it is rebuilt by the catalog
+    whenever the set of records changes.
+    """
+
+    def __init__(self):
+        # Every indexed name: (uid, words, label), label being the original text
+        self._names: List[Tuple[str, List[str], str]] = []
+        self._by_trigram: Dict[str, Set[int]] = defaultdict(set)
+        self._by_soundex: Dict[str, Set[int]] = defaultdict(set)
+
+    @classmethod
+    def build(cls, records: Iterable[WantedPerson]) -> "NameSearchIndex":
+        """
+        Index the title and aliases of every record.
+
+        Args:
+            records: Catalog records
+
+        Returns:
+            NameSearchIndex: The new index
+        """
+        index = cls()
+        for record in records:
+            for name in (record.title or '',) + record.aliases:
+                index._add(record.uid, name)
+        return index
+
+    def _add(self, uid: str, name: str):
+        """Add one name (a title or an alias) of a person."""
+        words = normalize_name(name)
+        if not words:
+            return
+
+        name_id = len(self._names)
+        self._names.append((uid, words, name))
+        for word in words:
+            for trigram in trigrams(word):
+                self._by_trigram[trigram].add(name_id)
+            code = soundex(word)
+            if code:
+                self._by_soundex[code].add(name_id)
+
+    def _candidates(self, query_words: List[str]) -> List[int]:
+        """
+        Names worth scoring: those sharing enough trigrams or a phonetic key
+        with the query, keeping the MAX_CANDIDATES with the largest overlap.
+        """
+        counts: Dict[int, int] = defaultdict(int)
+        query_trigrams = set()
+        for word in query_words:
+            query_trigrams |= trigrams(word)
+        for trigram in query_trigrams:
+            for name_id in self._by_trigram.get(trigram, ()):
+                counts[name_id] += 1
+
+        threshold = MIN_TRIGRAM_OVERLAP * len(query_trigrams)
+        candidates = {name_id for name_id, count in counts.items() if count >= threshold}
+
+        # A word that sounds the same weighs as much as a few shared trigrams
+        for word in query_words:
+            code = soundex(word)
+            for name_id in self._by_soundex.get(code, ()) if code else ():
+                counts[name_id] += 3
+                candidates.add(name_id)
+
+        return sorted(candidates, key=counts.__getitem__, reverse=True)[:MAX_CANDIDATES]
+
+    def search(self, query: str, limit: int = 5, min_score: float = 0.6) -> List[Dict[str, Any]]:
+        """
+        Find the persons whose name or alias best matches a query.
+
+        Args:
+            query: Name as typed by the user, possibly misspelled
+            limit: Maximum number of persons to return
+            min_score: Matches scoring lower than this are dropped
+
+        Returns:
+            List of dicts with `uid`, `score` (0.0 to 1.0) and `matched_name`
+            (the title or alias that matched), best first
+        """
+        query_words = normalize_name(query)
+        if not query_words:
+            return []
+
+        best: Dict[str, Tuple[float, str]] = {}
+        for name_id in self._candidates(query_words):
+            uid, words, label = self._names[name_id]
+            score = name_similarity(query_words, words)
+            if score >= min_score and score > best.get(uid, (0.0, ""))[0]:
+                best[uid] = (score, label)
+
+        ranked = sorted(best.items(), key=lambda entry: entry[1][0], reverse=True)
+        return [
+            {'uid': uid, 'score': round(score, 3), 'matched_name': label}
+            for uid, (score, label) in ranked[:limit]
+        ]
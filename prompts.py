@@ -6,6 +6,8 @@ SYSTEM_PROMPT = """
 Assistant is designed to help users explore and retrieve data about individuals wanted by the FBI,
 using the public FBI Wanted API. It can filter search results based on criteria such as FBI field office,
 name, status, and classification, and return structured information about individuals of interest.
+It can also compute statistics over the whole list, such as the number of active cases per field office
+or the rewards offered for cases published since a given year.
 
 The Assistant understands how to use API parameters like title, field_offices, status, person_classification,
 page, pageSize, sort_on, and sort_order. It generates relevant queries and returns informative results
@@ -32,5 +34,25 @@ Here is the user's input (remember to respond with a markdown code snippet of a
 
 {{{{input}}}}"""
 
+SUMMARY_PROMPT = """
+Progressively summarize a conversation between a user and an assistant that searches the FBI Wanted list.
+Extend the current summary with the new lines and return the new summary only. Keep the names, unique IDs,
+field offices and other search criteria the user may refer to later; drop long lists of results.
+Keep the summary under {max_words} words.
+
+CURRENT SUMMARY:
+{summary}
+
+NEW LINES:
+{new_lines}
+
+NEW SUMMARY:"""
+
+# Instruction put in front of each user message, per interface language
+LANGUAGE_PREFIXES = {
+    'en': "Answer in English : ",
+    'fr': "Réponds en français : ",
+}
+
 INITIAL_MESSAGE = """Looking for someone on the FBI's Wanted list? Ask me!"""
 CHAT_INPUT_PLACEHOLDER = "Try: 'Show me the most wanted fugitives from the Miami field office.'"
\ No newline at end of file
@@ -0,0 +1,206 @@
+"""
+LXP - Advanced AI development Workshop: fast-path intent router
+
+Some questions map to exactly one tool with obvious arguments: "show me the
+most wanted list", "details for person ID d79f...", "captured fugitives from
+the Miami office". Going through the agent costs two Gemini round-trips for
+them (one to pick the tool, one to write the answer). The router recognizes
+these questions with regular expressions, calls the tool directly and returns
+its output as the answer.
+
+It only answers when it is sure: the whole message must match a pattern and
+the arguments must exist in the catalog (a known field office, a close name
+match...). Anything else, including every non-English message, goes to the
+agent as before.
+"""
+
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from langchain_core.agents import AgentAction
+
+import tools
+from catalog import get_catalog
+from prompts import LANGUAGE_PREFIXES
+from tool_output import user_facing
+
+# Name matches scoring lower than this are left to the agent
+MIN_NAME_SCORE = 0.9
+
+UID_PATTERN = r"(?P<uid>[0-9a-f]{32})"
+
+SHOW = r"(?:(?:please )?(?:show|list|get|give|display|tell|find)(?: me)?(?: all)?(?: the)? )?"
+PERSONS = r"(?:wanted )?(?:persons?|people|fugitives|cases|suspects|individuals)"
+END = r"[.!? ]*$"
+
+ToolInput = Union[str, Dict[str, str]]
+
+
+def split_language(message: str) -> Tuple[Optional[str], str]:
+    """
+    Separate the language instruction added by the frontend from a message.
+
+    Args:
+        message: User message, e.g. "Answer in English : most wanted list"
+
+    Returns:
+        (language code or None if there is no instruction, rest of the message)
+    """
+    for language, prefix in LANGUAGE_PREFIXES.items():
+        if message.lower().startswith(prefix.lower()):
+            return language, message[len(prefix):].strip()
+    return None, message.strip()
+
+
+def _office_argument(match: re.Match) -> Optional[str]:
+    """Field office of a match, if the catalog knows it."""
+    office = match.group('office').replace(' ', '')
+    return office if office in get_catalog().vocabulary('field_offices') else None
+
+
+def _name_argument(match: re.Match) -> Optional[str]:
+    """Name of a match, if it clearly designates a person of the catalog."""
+    name = match.group('name').strip()
+    matches = get_catalog().search_names(name, limit=1)
+    if matches and matches[0]['score'] >= MIN_NAME_SCORE:
+        return name
+    return None
+
+
+def _aggregate_argument(match: re.Match) -> Dict[str, str]:
+    """Statistics tool arguments for "how many active cases per field office" questions."""
+    group = {'office': 'field_office'}.get(match.group('group'), match.group('group').replace(' ', '_'))
+    status = {'open': 'active'}.get(match.group('status'), match.group('status') or '')
+    return {'group_by': group, 'status': status}
+
+
+# (pattern, tool, argument builder); the builder returns the tool input (a
+# string, or a dict of arguments for structured tools), or None to give up
+ROUTES: List[Tuple[re.Pattern, Any, Callable[[re.Match], Optional[ToolInput]]]] = [
+    (re.compile(rf"^{SHOW}(?:fbi'?s? )?(?:ten )?most wanted(?: list| {PERSONS})?{END}"),
+     tools.get_fbi_most_wanted, lambda match: ""),
+    (re.compile(rf"^who(?: is|'s| are)? on the (?:fbi'?s? )?most wanted(?: list)?{END}"),
+     tools.get_fbi_most_wanted, lambda match: ""),
+    (re.compile(rf"^{SHOW}(?:fbi'?s? )?(?:most wanted )?(?:terrorism|terrorists?)(?: list)?{END}"),
+     tools.get_fbi_terrorism_list, lambda match: ""),
+    (re.compile(rf"^{SHOW}(?:full )?(?:details|info|information|record|profile)"
+                rf"(?: for| on| about| of)?(?: the)?(?: person)?(?: with)?(?: id| uid)?:? {UID_PATTERN}{END}"),
+     tools.get_fbi_person_details_tool, lambda match: match.group('uid')),
+    (re.compile(rf"^(?:(?:person )?(?:id|uid):? )?{UID_PATTERN}{END}"),
+     tools.get_fbi_person_details_tool, lambda match: match.group('uid')),
+    (re.compile(rf"^{SHOW}{PERSONS} (?:from|in|of) the (?P<office>[a-z ]+?) (?:field )?office{END}"),
+     tools.search_fbi_by_field_office_tool, lambda match: (office := _office_argument(match)) and f"{office}, 10"),
+    (re.compile(rf"^{SHOW}captured {PERSONS}{END}"),
+     tools.search_fbi_by_status_tool, lambda match: "captured, 10"),
+    (re.compile(rf"^how many (?:(?P<status>active|open|captured) )?{PERSONS}(?: are there)?"
+                rf" (?:per|by|in each|for each) (?:fbi )?(?P<group>field office|office|status|year|subject|sex)"
+                rf"(?: of publication)?{END}"),
+     tools.aggregate_fbi_cases, _aggregate_argument),
+    (re.compile(rf"^(?:search(?: for)?|find|look up|lookup)(?: the)?(?: person| fugitive)?(?: named)? (?P<name>[a-z][a-z .'-]+?){END}"),
+     tools.search_fbi_person_by_name, _name_argument),
+]
+
+
+class IntentRouter:
+    """
+    Answers simple, unambiguous questions by calling one tool directly.
+
+    Keeps hit and miss counters so the share of messages that skip the LLM
+    can be displayed (see stats()).
+    """
+
+    def __init__(self, routes=ROUTES):
+        self.routes = routes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def match(self, message: str) -> Optional[Tuple[Any, ToolInput]]:
+        """
+        Find the tool and tool input that answer a message.
+
+        Args:
+            message: User message, possibly starting with a language instruction
+
+        Returns:
+            (tool, tool_input), or None if the agent should handle the message
+        """
+        language, text = split_language(message)
+        if language not in (None, 'en'):
+            return None  # Tool outputs are in English; the agent translates
+        text = " ".join(text.lower().split())
+
+        for pattern, tool, argument in self.routes:
+            match = pattern.match(text)
+            if match:
+                tool_input = argument(match)
+                if tool_input is not None:
+                    return tool, tool_input
+        return None
+
+    def route(self, message: str, callbacks=None) -> Optional[Dict[str, Any]]:
+        """
+        Answer a message without the LLM, if possible.
+
+        Args:
+            message: User message
+            callbacks: Callback handlers for the tool run (e.g. Langfuse)
+
+        Returns:
+            Dict with `output` and `intermediate_steps`, shaped like an agent
+            response, or None if the message must go to the agent
+        """
+        matched = self.match(message)
+        if matched is None:
+            return self._count(None)
+
+        tool, tool_input = matched
+        with user_facing():  # The observation is the answer: no hints for the agent
+            observation = tool.invoke(tool_input, {"callbacks": callbacks})
+        return self._count(self._response(tool, tool_input, observation))
+
+    async def aroute(self, message: str, callbacks=None) -> Optional[Dict[str, Any]]:
+        """Async version of route()."""
+        matched = self.match(message)
+        if matched is None:
+            return self._count(None)
+
+        tool, tool_input = matched
+        with user_facing():
+            observation = await tool.ainvoke(tool_input, {"callbacks": callbacks})
+        return self._count(self._response(tool, tool_input, observation))
+
+    @staticmethod
+    def _response(tool, tool_input: ToolInput, observation: str) -> Optional[Dict[str, Any]]:
+        """Build the agent-shaped response, or None if the tool failed."""
+        if observation.startswith("Error"):
+            return None  # Let the agent deal with it
+
+        action = AgentAction(tool=tool.name, tool_input=tool_input, log="Answered directly by the intent router")
+        return {"output": observation, "intermediate_steps": [(action, observation)]}
+
+    def _count(self, response: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Update the hit/miss counters."""
+        with self._lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the router counters.
+
+        Returns:
+            Dict with hits, misses and hit_rate (share of messages answered
+            without the LLM)
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
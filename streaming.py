@@ -0,0 +1,181 @@
+"""
+LXP - Advanced AI development Workshop: streaming the final answer
+
+The agent's LLM replies with a JSON blob such as
+
+    {"action": "Final Answer", "action_input": "The FBI lists ..."}
+
+FinalAnswerStreamHandler watches the tokens of every LLM call of the agent
+and, once it sees that the reply is a final answer, decodes the
+`action_input` string as it arrives and forwards the text. Replies choosing a
+tool are never shown.
+
+AnswerStream runs a turn in a worker thread and yields that text, so the UI
+can display the answer while Gemini is still writing it.
+"""
+
+import queue
+import re
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from deadline import STOPPED_KEY
+
+# Start of the answer text inside a final-answer JSON blob
+FINAL_ANSWER_START = re.compile(r'"action"\s*:\s*"Final Answer"\s*,\s*"action_input"\s*:\s*"')
+
+ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+_DONE = object()
+
+
+class FinalAnswerStreamHandler(BaseCallbackHandler):
+    """
+    Callback handler forwarding the final answer's text, token by token.
+
+    Args:
+        emit: Called with each decoded piece of the answer
+    """
+
+    def __init__(self, emit: Callable[[str], None]):
+        # Not named on_text: that is a callback hook AgentExecutor calls on every step
+        self._emit = emit
+        self.streamed = False  # Whether any answer text was forwarded
+        self._reset()
+
+    def _reset(self):
+        self._buffer = ""
+        self._position = None  # Index of the next undecoded answer character
+        self._finished = False
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts, **kwargs: Any):
+        self._reset()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages, **kwargs: Any):
+        self._reset()
+
+    def on_llm_new_token(self, token: str, **kwargs: Any):
+        if self._finished:
+            return
+        self._buffer += token
+
+        if self._position is None:
+            match = FINAL_ANSWER_START.search(self._buffer)
+            if match is None:
+                return
+            self._position = match.end()
+
+        text = self._decode()
+        if text:
+            self.streamed = True
+            self._emit(text)
+
+    def _decode(self) -> str:
+        """Decode the JSON string characters received since the last call."""
+        buffer, i, text = self._buffer, self._position, []
+
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self._finished = True
+                break
+            if char != '\\':
+                text.append(char)
+                i += 1
+                continue
+
+            # Escape sequence: wait until it is complete
+            if i + 1 >= len(buffer):
+                break
+            if buffer[i + 1] == 'u':
+                if i + 6 > len(buffer):
+                    break
+                code = int(buffer[i + 2:i + 6], 16)
+                if 0xD800 <= code < 0xDC00:
+                    # High surrogate (emoji...): combine it with the low one that follows
+                    following = buffer[i + 6:i + 8]
+                    if '\\u'.startswith(following) and i + 12 > len(buffer):
+                        break
+                    low = int(buffer[i + 8:i + 12], 16) if following == '\\u' else 0
+                    if 0xDC00 <= low < 0xE000:
+                        text.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                        i += 12
+                        continue
+                if 0xD800 <= code < 0xE000:
+                    code = 0xFFFD  # Lone surrogate: not valid UTF-8
+                text.append(chr(code))
+                i += 6
+            else:
+                text.append(ESCAPES.get(buffer[i + 1], buffer[i + 1]))
+                i += 2
+
+        self._position = i
+        return "".join(text)
+
+
+class AnswerStream:
+    """
+    Iterator over the text of an answer, produced while the turn runs.
+
+    Iterate over it (e.g. with `st.write_stream`) to get the answer text;
+    afterwards `response` holds the full response, including the
+    intermediate steps. If the answer could not be streamed (cached answers,
+    fast-path answers, unusual replies), the whole output is yielded at the
+    end instead. When what was streamed is not the final output (turn
+    stopped by its deadline, reply the parser rejected), `needs_rewrite`
+    tells the UI to show `response["output"]` in its place.
+    """
+
+    def __init__(self,
+                 run: Callable[[BaseCallbackHandler], Dict[str, Any]],
+                 thread_initializer: Optional[Callable[[threading.Thread], Any]] = None):
+        """
+        Args:
+            run: Runs the turn with an extra callback handler and returns the response
+            thread_initializer: Called with the worker thread before it starts
+                (e.g. Streamlit's add_script_run_ctx, so UI callbacks work there)
+        """
+        self.response: Optional[Dict[str, Any]] = None
+        self._queue: "queue.Queue" = queue.Queue()
+        self._handler = FinalAnswerStreamHandler(emit=self._queue.put)
+        self._run = run
+        self._error: Optional[BaseException] = None
+        self._streamed: List[str] = []
+
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        if thread_initializer is not None:
+            thread_initializer(self._thread)
+
+    def _work(self):
+        try:
+            self.response = self._run(self._handler)
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._queue.put(_DONE)
+
+    def __iter__(self) -> Iterator[str]:
+        self._thread.start()
+
+        while True:
+            text = self._queue.get()
+            if text is _DONE:
+                break
+            self._streamed.append(text)
+            yield text
+
+        if self._error is not None:
+            raise self._error
+        if not self._handler.streamed:
+            yield self.response["output"]
+
+    @property
+    def needs_rewrite(self) -> bool:
+        """Whether the streamed text differs from the final output (only meaningful after the iteration)."""
+        if self.response is None or not self._handler.streamed:
+            return False
+        if self.response.get(STOPPED_KEY):
+            return True
+        return "".join(self._streamed).strip() != self.response["output"].strip()
@@ -0,0 +1,51 @@
+"""Tests for the cache of agent answers (answer_cache.py)."""
+
+import pytest
+
+from answer_cache import AnswerCache
+
+
+def response(text):
+    return {"output": text, "intermediate_steps": []}
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("rewards over 50000", "rewards over 500000"),
+    ("search for maria lopez", "search for mario lopez"),
+    ("search for ali", "search for al"),
+])
+def test_different_questions_do_not_share_answers(cached, asked):
+    cache = AnswerCache()
+    cache.store(cached, 1, response("cached answer"))
+
+    assert cache.lookup(asked, 1) is None
+
+
+def test_rewording_is_a_near_hit():
+    cache = AnswerCache()
+    cache.store("show me the fugitives from the miami office", 1, response("miami answer"))
+
+    assert cache.lookup("fugitive from miami office please", 1)["output"] == "miami answer"
+    assert cache.stats()["near_hits"] == 1
+
+
+def test_new_catalog_version_drops_answers():
+    cache = AnswerCache()
+    cache.store("terrorism list", 1, response("terrorism answer"))
+
+    assert cache.lookup("terrorism list", 2) is None
+
+
+def test_stopped_answers_are_not_cached():
+    cache = AnswerCache()
+    cache.store("terrorism list", 1, {**response("⏱️ I ran out of time"), "stopped": True})
+
+    assert cache.lookup("terrorism list", 1) is None
+
+
+def test_answers_after_a_tool_error_are_not_cached():
+    cache = AnswerCache()
+    steps = [(None, "Error searching by status 'captured': connection refused")]
+    cache.store("captured fugitives", 1, {"output": "Sorry, the FBI API is down", "intermediate_steps": steps})
+
+    assert cache.lookup("captured fugitives", 1) is None
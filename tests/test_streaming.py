@@ -0,0 +1,40 @@
+"""Tests for streaming the final answer (streaming.py)."""
+
+import pytest
+
+from streaming import AnswerStream, FinalAnswerStreamHandler
+
+
+def stream(reply, chunk_size):
+    pieces = []
+    handler = FinalAnswerStreamHandler(emit=pieces.append)
+    for start in range(0, len(reply), chunk_size):
+        handler.on_llm_new_token(reply[start:start + chunk_size])
+    return "".join(pieces)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 100])
+def test_escaped_emoji_is_one_character(chunk_size):
+    reply = '{"action": "Final Answer", "action_input": "Found him \\ud83d\\ude00 \\u00e9t\\u00e9"}'
+
+    text = stream(reply, chunk_size)
+
+    assert text == "Found him 😀 été"
+    text.encode("utf-8")
+
+
+def test_lone_surrogate_is_replaced():
+    reply = '{"action": "Final Answer", "action_input": "broken \\ud83d end"}'
+
+    assert stream(reply, 4) == "broken � end"
+
+
+def test_stopped_turn_replaces_the_streamed_text():
+    def run(handler):
+        handler.on_llm_new_token('{"action": "Final Answer", "action_input": "The FBI lists')
+        return {"output": "⏱️ I ran out of time", "intermediate_steps": [], "stopped": True}
+
+    stream = AnswerStream(run)
+
+    assert "".join(stream) == "The FBI lists"
+    assert stream.needs_rewrite
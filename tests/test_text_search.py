@@ -0,0 +1,35 @@
+"""Tests for the full-text search over case narratives (text_search.py)."""
+
+from text_search import BM25Index, analyze, snippet, stem
+
+
+def test_stem_matches_word_forms():
+    assert stem("escaped") == stem("escapes") == stem("escape") == stem("escaping")
+
+
+def test_stem_keeps_short_words():
+    assert stem("eyes") == "eyes"
+    assert stem("used") == "used"
+
+
+def test_search_finds_base_form_of_a_word():
+    index = BM25Index()
+    index.add("a", "He escaped from a prison in Alabama.")
+    index.add("b", "Wanted for wire fraud in Miami.")
+
+    hits = index.search("escape", k=5)
+
+    assert [hit['uid'] for hit in hits] == ["a"]
+    assert analyze("escapes") == analyze("escape")
+
+
+def test_snippet_is_built_around_the_rarest_matching_term():
+    text = "Wanted for fraud. " + "x " * 100 + "He escaped from a prison in Alabama."
+    index = BM25Index()
+    index.add("a", text)
+    index.add("b", "Wanted for fraud in Miami.")
+
+    hit = index.search("fraud escape", k=1)[0]
+
+    assert hit['terms'][0] == stem("escape")
+    assert "escaped from a prison" in snippet(text, hit['terms'])
@@ -0,0 +1,202 @@
+"""
+LXP - Advanced AI development Workshop: full-text search over FBI case narratives
+
+A BM25 index over the free-text fields of each record (description, caution,
+details, remarks, scars and marks). It answers questions such as "the man with
+a tattoo on his forearm who escaped in Alabama" locally, on CPU, without any
+external search service.
+
+The index only keeps term statistics, not the texts (the records keep them,
+compressed): snippets are built from the record for the few hits returned.
+"""
+
+import html
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List
+
+from models import WantedPerson
+
+# Narrative fields searched, in the order their text is concatenated
+TEXT_FIELDS = ('description', 'caution', 'details', 'remarks', 'scars_and_marks')
+
+HTML_TAG_PATTERN = re.compile(r'<[^<]+?>')
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words too common to help ranking
+STOPWORDS = frozenset("""
+a an and are as at be been but by for from had has have he her hers him his i in
+into is it its me my of on or she that the their them they this to was were who
+whom with guy man woman person someone somebody
+""".split())
+
+SNIPPET_RADIUS = 80
+
+
+def clean_text(text: str) -> str:
+    """Strip HTML tags and entities and collapse whitespace."""
+    return " ".join(html.unescape(HTML_TAG_PATTERN.sub(' ', text)).split())
+
+
+def record_text(record: WantedPerson) -> str:
+    """The searchable text of a record: its narrative fields, HTML-stripped."""
+    texts = (getattr(record, field) for field in TEXT_FIELDS)
+    return " ".join(clean_text(text) for text in texts if text)
+
+
+def stem(word: str) -> str:
+    """
+    Very light suffix stripping so "escaped", "escapes" and "escape" match.
+
+    After the suffix, a final "e" is dropped too: "escape" and the "escap"
+    left by "escaped" become the same term.
+    """
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            word = word[:-len(suffix)]
+            break
+    if len(word) > 4 and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+
+def analyze(text: str) -> List[str]:
+    """Turn text into index terms: lowercase words, minus stopwords, stemmed."""
+    return [stem(word) for word in WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Incrementally updatable BM25 index, one document per wanted person.
+
+    Documents can be added, replaced or removed at any time; document
+    frequencies and the average document length are kept up to date, so no
+    rebuild is ever needed. All methods are thread-safe.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Create an empty index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Strength of the document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+
+        self._postings: Dict[str, Dict[str, int]] = {}  # term -> {uid: term frequency}
+        self._doc_terms: Dict[str, Counter] = {}        # uid -> term frequencies
+        self._doc_lengths: Dict[str, int] = {}          # uid -> number of terms
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, uid: str) -> bool:
+        return uid in self._doc_terms
+
+    def add(self, uid: str, text: str):
+        """
+        Index a document, replacing any previous version with the same uid.
+
+        Args:
+            uid: Unique ID of the person
+            text: Searchable text (see record_text())
+        """
+        terms = Counter(analyze(text))
+
+        with self._lock:
+            self.remove(uid)
+            if not terms:
+                return
+
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, {})[uid] = frequency
+            self._doc_terms[uid] = terms
+            self._doc_lengths[uid] = sum(terms.values())
+            self._total_length += self._doc_lengths[uid]
+
+    def remove(self, uid: str):
+        """Remove a document from the index (no-op if it is not indexed)."""
+        with self._lock:
+            terms = self._doc_terms.pop(uid, None)
+            if terms is None:
+                return
+
+            for term in terms:
+                postings = self._postings[term]
+                del postings[uid]
+                if not postings:
+                    del self._postings[term]
+            self._total_length -= self._doc_lengths.pop(uid)
+
+    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Rank documents by BM25 relevance to a free-text query.
+
+        Args:
+            query: Free-text question or keywords
+            k: Number of results to return
+
+        Returns:
+            List of dicts with `uid`, `score` and `terms` (the query terms the
+            document contains, rarest first, for snippet()), best first
+        """
+        query_terms = set(analyze(query))
+
+        with self._lock:
+            document_count = len(self._doc_terms)
+            if not document_count or not query_terms:
+                return []
+            average_length = self._total_length / document_count
+
+            scores: Dict[str, float] = {}
+            idfs = {}
+            for term in query_terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+
+                idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                idfs[term] = idf
+                for uid, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[uid] / average_length)
+                    scores[uid] = scores.get(uid, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+            ranked = sorted(scores.items(), key=lambda entry: entry[1], reverse=True)[:k]
+            by_rarity = sorted(idfs, key=idfs.get, reverse=True)
+            return [
+                {'uid': uid, 'score': round(score, 3),
+                 'terms': [term for term in by_rarity if term in self._doc_terms[uid]]}
+                for uid, score in ranked
+            ]
+
+
+def snippet(text: str, terms: List[str]) -> str:
+    """
+    Excerpt of a text around the first of `terms` it contains.
+
+    Args:
+        text: The document's text (see record_text())
+        terms: Index terms, most important first (a search hit's `terms`)
+
+    Returns:
+        str: About 2 × SNIPPET_RADIUS characters, with "..." where cut
+    """
+    positions = {}
+    for match in WORD_PATTERN.finditer(text.lower()):
+        positions.setdefault(stem(match.group()), match.start())
+    position = next((positions[term] for term in terms if term in positions), 0)
+
+    start = max(position - SNIPPET_RADIUS, 0)
+    end = min(position + SNIPPET_RADIUS, len(text))
+    excerpt = text[start:end]
+    if start > 0:
+        excerpt = "..." + excerpt
+    if end < len(text):
+        excerpt += "..."
+    return excerpt
@@ -0,0 +1,180 @@
+"""
+LXP - Advanced AI development Workshop: size budget for tool outputs
+
+Everything a tool returns is appended to the agent scratchpad and sent back
+to Gemini on every later step of the same turn, so one verbose tool call makes
+all the following LLM calls slower. Tools therefore build their output as a
+list of sections, each with a priority, and render it within a per-tool
+character budget:
+
+1. Identification, status and totals are always kept
+2. Long narrative fields (description, caution, details, remarks...) go first
+3. Then whole results, starting with the last one
+
+When something is left out, a final line says what and tells the agent how to
+fetch it by uid, so no information is lost, only deferred. That line is
+meant for the agent: outputs shown to the user as they are (see router.py)
+are rendered within user_facing(), which leaves it out.
+"""
+
+import os
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from metrics import get_metrics
+
+# Section priorities: higher numbers are dropped first
+KEEP = 0        # Headers, identification, status, totals
+SUMMARY = 1     # One result in a list, or a key block of a record
+DETAIL = 2      # Secondary blocks (personal info, resources...)
+NARRATIVE = 3   # Free-text fields, usually the longest part
+
+# Narrative sections shorter than this are dropped rather than cut
+MIN_EXCERPT_CHARS = 80
+
+DEFAULT_BUDGET = 3000
+
+# Per-tool budgets in characters (about 4 characters per token)
+TOOL_BUDGETS = {
+    'get_fbi_person_details': 4000,
+    'get_fbi_person_section': 6000,
+}
+
+# Whether outputs rendered now go straight to the user instead of the agent
+_user_facing: ContextVar[bool] = ContextVar("tool_output_user_facing", default=False)
+
+
+@contextmanager
+def user_facing() -> Iterator[None]:
+    """Render the tool outputs of the block for the user: without the note addressed to the agent."""
+    token = _user_facing.set(True)
+    try:
+        yield
+    finally:
+        _user_facing.reset(token)
+
+
+def budget_for(tool_name: str) -> int:
+    """
+    Get the output budget of a tool, in characters.
+
+    TOOL_OUTPUT_MAX_CHARS sets the default budget and TOOL_OUTPUT_BUDGETS
+    overrides it per tool, e.g. "get_fbi_person_details=6000,search_fbi_by_status=2000".
+    """
+    budgets: Dict[str, int] = dict(TOOL_BUDGETS)
+    for entry in os.getenv("TOOL_OUTPUT_BUDGETS", "").split(","):
+        name, _, value = entry.partition("=")
+        if name.strip() and value.strip():
+            budgets[name.strip()] = int(value)
+
+    return budgets.get(tool_name, int(os.getenv("TOOL_OUTPUT_MAX_CHARS", str(DEFAULT_BUDGET))))
+
+
+class _Section:
+    __slots__ = ('text', 'priority', 'label', 'group')
+
+    def __init__(self, text: str, priority: int, label: Optional[str], group):
+        self.text = text
+        self.priority = priority
+        self.label = label
+        self.group = group
+
+
+class ToolOutput:
+    """
+    Output of a tool, built section by section and rendered within a budget.
+
+    Sections sharing a `group` (e.g. the lines of one result in a list) are
+    dropped together. `label` names a section in the "omitted" note.
+    """
+
+    def __init__(self, tool_name: str, budget: Optional[int] = None):
+        """
+        Start an empty output.
+
+        Args:
+            tool_name: Name of the tool, used to look up its budget
+            budget: Explicit budget in characters (overrides budget_for())
+        """
+        self.tool_name = tool_name
+        self.budget = budget if budget is not None else budget_for(tool_name)
+        self._sections: List[_Section] = []
+
+    def add(self, text: str, priority: int = KEEP, label: Optional[str] = None, group=None):
+        """
+        Append a section.
+
+        Args:
+            text: Text of the section, including its trailing newlines
+            priority: KEEP, SUMMARY, DETAIL or NARRATIVE
+            label: Name shown in the "omitted" note if the section is dropped
+            group: Sections with the same group are dropped together
+        """
+        if text:
+            self._sections.append(_Section(text, priority, label, group))
+
+    def render(self, hint: str = "") -> str:
+        """
+        Join the sections, leaving out the least important ones if needed.
+
+        Narrative sections are cut to an excerpt when that is enough to fit;
+        otherwise sections are dropped, highest priority number first and,
+        within a priority, last first.
+
+        Args:
+            hint: How to get what was left out (e.g. "Use get_fbi_person_details
+                with an ID for the full record"), appended to the note
+
+        Returns:
+            str: The output, at most `budget` characters plus the note
+            (no note within user_facing())
+        """
+        with get_metrics().span(f"format.{self.tool_name}"):
+            return self._render(hint)
+
+    def _render(self, hint: str) -> str:
+        """Body of render()."""
+        sections = [_Section(s.text, s.priority, s.label, s.group) for s in self._sections]
+        size = sum(len(section.text) for section in sections)
+        omitted = Counter()
+
+        for priority in (NARRATIVE, DETAIL, SUMMARY):
+            for section in reversed([s for s in sections if s.priority == priority]):
+                if size <= self.budget:
+                    break
+                if section not in sections:
+                    continue  # Already dropped with its group
+
+                excess = size - self.budget
+                if priority == NARRATIVE and len(section.text) - excess >= MIN_EXCERPT_CHARS:
+                    # Cutting this section is enough: keep an excerpt of it
+                    kept = section.text[:len(section.text) - excess - 4].rstrip()
+                    section.text = kept + "...\n"
+                    size = sum(len(s.text) for s in sections)
+                    omitted[f"end of {section.label}" if section.label else "text"] += 1
+                    break
+
+                dropped = [s for s in sections
+                           if s is section or (section.group is not None and s.group == section.group)]
+                for s in dropped:
+                    sections.remove(s)
+                    size -= len(s.text)
+                    if s.label:
+                        omitted[s.label] += 1
+
+        text = "".join(section.text for section in sections)
+        if size > self.budget:
+            # Even the essential sections do not fit: hard cut
+            text = text[:self.budget].rstrip() + "...\n"
+            omitted["end of output"] += 1
+
+        if not omitted or _user_facing.get():
+            return text
+
+        names = ", ".join(label if count == 1 else f"{label} ×{count}" for label, count in omitted.items())
+        note = f"\n✂️ Trimmed to save space (omitted: {names})."
+        if hint:
+            note += f" {hint}"
+        return text.rstrip("\n") + "\n" + note
@@ -3,12 +3,27 @@ LXP - Advanced AI development Workshop: FBI API Chatbot tools
 
 WARNING: LangChain ConversationalAgent only accepts single input parameters for tool calling.
 Use create_string_input_tool() to wrap multi-parameter functions.
+
+Every tool also has an async implementation (see the end of this file), used
+when the agent runs with `ainvoke`.
 """
 
-import requests
+import functools
+
+import numpy as np
 from langchain_core.tools import tool
+from catalog import get_catalog
+from catalog_columns import DERIVED_GROUPS, GROUP_FIELDS, parse_date
+from text_search import TEXT_FIELDS, clean_text
+from tool_output import ToolOutput, SUMMARY, DETAIL, NARRATIVE
 from utils import create_string_input_tool
 
+# Appended to trimmed outputs (see tool_output.py)
+LIST_HINT = "Use get_fbi_person_details with an ID for the full record."
+
+# Long free-text fields of a record, which get_fbi_person_section returns in full
+SECTION_FIELDS = TEXT_FIELDS + ('additional_information',)
+
 @tool
 def get_fbi_most_wanted() -> str:
     """Get the list of FBI's most wanted persons with comprehensive details.
@@ -17,8 +32,8 @@ def get_fbi_most_wanted() -> str:
         A formatted string with detailed information about the most wanted persons
     """
     try:
-        # Get the most wanted list from FBI API
-        url = "https://api.fbi.gov/wanted/v1/list"
+        # Get the most wanted list; queries are answered by the local
+        # mirror of the FBI list (see catalog.py) instead of the live API
         params = {
             'pageSize': 10,  # Limit to 10 results for readability
             'page': 1,
@@ -26,58 +41,59 @@ def get_fbi_most_wanted() -> str:
             'sort_order': 'desc'
         }
         
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = get_catalog().query(params)
         
         if not data.get('items'):
             return "No wanted persons found in the FBI database."
         
-        result = "🚨 FBI MOST WANTED LIST 🚨\n\n"
+        output = ToolOutput("get_fbi_most_wanted")
+        output.add("🚨 FBI MOST WANTED LIST 🚨\n\n")
         
         for i, person in enumerate(data['items'][:8], 1):  # Show top 8
-            name = person.get('title', 'Unknown')
-            subjects = person.get('subjects', ['Unknown'])
-            reward = person.get('reward_text', 'No reward specified')
-            status = person.get('status', 'na')
-            field_offices = person.get('field_offices', [])
-            publication = person.get('publication', 'Unknown date')[:10]  # Just date part
+            name = person.title or 'Unknown'
+            subjects = person.subjects or ['Unknown']
+            reward = person.reward_text or 'No reward specified'
+            status = person.status or 'na'
+            field_offices = person.field_offices
+            publication = (person.publication or 'Unknown date')[:10]  # Just date part
             
             # Status indicator
             status_icon = "🔴" if status == "na" else "🟢"
             status_text = "ACTIVE" if status == "na" else "CAPTURED"
             
-            result += f"{i}. **{name}** {status_icon} {status_text}\n"
-            result += f"   📂 Subjects: {', '.join(subjects)}\n"
-            result += f"   💰 Reward: {reward}\n"
-            result += f"   📅 Published: {publication}\n"
+            entry = f"{i}. **{name}** {status_icon} {status_text}\n"
+            entry += f"   📂 Subjects: {', '.join(subjects)}\n"
+            entry += f"   💰 Reward: {reward}\n"
+            entry += f"   📅 Published: {publication}\n"
             
             if field_offices:
-                result += f"   🏢 Field Office: {', '.join(field_offices).title()}\n"
+                entry += f"   🏢 Field Office: {', '.join(field_offices).title()}\n"
             
             # Add warning if present
-            if person.get('warning_message'):
-                result += f"   ⚠️ WARNING: {person['warning_message']}\n"
+            if person.warning_message:
+                entry += f"   ⚠️ WARNING: {person.warning_message}\n"
+            output.add(entry, SUMMARY, "result", group=i)
             
             # Add description if available
-            if person.get('description'):
-                desc = person['description'][:150] + "..." if len(person['description']) > 150 else person['description']
-                result += f"   📋 Description: {desc}\n"
+            description = person.description
+            if description:
+                desc = description[:150] + "..." if len(description) > 150 else description
+                output.add(f"   📋 Description: {desc}\n", NARRATIVE, "description")
             
             # Add caution if available
-            if person.get('caution'):
-                caution_text = person['caution']
+            caution = person.caution
+            if caution:
                 # Remove HTML tags for cleaner display
                 import re
-                caution_clean = re.sub('<[^<]+?>', '', caution_text)[:200] + "..."
-                result += f"   ⚠️ Details: {caution_clean}\n"
+                caution_clean = re.sub('<[^<]+?>', '', caution)[:200] + "..."
+                output.add(f"   ⚠️ Details: {caution_clean}\n", NARRATIVE, "caution")
             
-            result += f"   🆔 ID: {person.get('uid', 'No ID')}\n\n"
+            output.add(f"   🆔 ID: {person.uid or 'No ID'}\n\n", SUMMARY, group=i)
         
-        result += f"📊 Total persons in database: {data.get('total', 'Unknown')}\n"
-        result += f"📄 Showing page {data.get('page', 1)} of results"
+        output.add(f"📊 Total persons in database: {data.get('total', 'Unknown')}\n"
+                   f"📄 Showing page {data.get('page', 1)} of results")
         
-        return result
+        return output.render(LIST_HINT)
         
     except Exception as e:
         return f"Error retrieving FBI most wanted list: {str(e)}"
@@ -86,6 +102,8 @@ def get_fbi_most_wanted() -> str:
 def search_fbi_person_by_name(name: str) -> str:
     """Search for a specific person in the FBI wanted database by name with comprehensive details.
     
+    Tolerates misspellings and matches aliases; results are ranked by match score.
+    
     Args:
         name: The name of the person to search for
         
@@ -93,111 +111,120 @@ def search_fbi_person_by_name(name: str) -> str:
         A formatted string with detailed information about the person if found
     """
     try:
-        url = "https://api.fbi.gov/wanted/v1/list"
-        params = {
-            'title': name,
-            'pageSize': 5
-        }
+        # Fuzzy search over names and aliases (see name_search.py), so typos
+        # and alias-only matches are found in a single call
+        matches = get_catalog().search_names(name, limit=5)
         
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if not data.get('items'):
+        if not matches:
             return f"No person named '{name}' found in the FBI wanted database."
         
-        result = f"🔍 SEARCH RESULTS FOR '{name.upper()}'\n\n"
-        
-        for i, person in enumerate(data['items'], 1):
-            title = person.get('title', 'Unknown')
-            uid = person.get('uid', 'Unknown')
-            subjects = person.get('subjects', ['Unknown'])
-            reward = person.get('reward_text', 'No reward specified')
-            publication_date = person.get('publication', 'Unknown date')[:10]
-            status = person.get('status', 'na')
-            field_offices = person.get('field_offices', [])
+        output = ToolOutput("search_fbi_person_by_name")
+        output.add(f"🔍 SEARCH RESULTS FOR '{name.upper()}'\n\n")
+        
+        for i, match in enumerate(matches, 1):
+            person = match['record']
+            title = person.title or 'Unknown'
+            uid = person.uid or 'Unknown'
+            subjects = person.subjects or ['Unknown']
+            reward = person.reward_text or 'No reward specified'
+            publication_date = (person.publication or 'Unknown date')[:10]
+            status = person.status or 'na'
+            field_offices = person.field_offices
             
             # Personal details
-            sex = person.get('sex', 'Unknown')
-            race = person.get('race_raw', person.get('race', 'Unknown'))
-            hair = person.get('hair_raw', person.get('hair', 'Unknown'))
-            eyes = person.get('eyes_raw', person.get('eyes', 'Unknown'))
-            height = f"{person.get('height_min', 0)//12}'{person.get('height_min', 0)%12}\"" if person.get('height_min') else 'Unknown'
-            weight = person.get('weight', 'Unknown')
+            sex = person.sex or 'Unknown'
+            race = person.race or 'Unknown'
+            hair = person.hair or 'Unknown'
+            eyes = person.eyes or 'Unknown'
+            height = f"{person.height_min//12}'{person.height_min%12}\"" if person.height_min else 'Unknown'
+            weight = person.weight or 'Unknown'
             
             # Birth info
-            birth_dates = person.get('dates_of_birth_used', [])
-            birth_place = person.get('place_of_birth', 'Unknown')
-            nationality = person.get('nationality', 'Unknown')
-            aliases = person.get('aliases', [])
+            birth_dates = person.dates_of_birth_used
+            birth_place = person.place_of_birth or 'Unknown'
+            nationality = person.nationality or 'Unknown'
+            aliases = person.aliases
             
             # Status indicator
             status_icon = "🔴" if status == "na" else "🟢"
             status_text = "ACTIVE" if status == "na" else "CAPTURED"
             
-            result += f"**{i}. {title}** {status_icon} {status_text}\n"
-            result += f"🆔 ID: {uid}\n"
-            result += f"📂 Subjects: {', '.join(subjects)}\n"
-            result += f"💰 Reward: {reward}\n"
-            result += f"📅 Publication: {publication_date}\n"
+            entry = f"**{i}. {title}** {status_icon} {status_text}\n"
+            entry += f"🎯 Match: {match['score']:.0%}"
+            if match['matched_name'] != title:
+                entry += f" (alias '{match['matched_name']}')"
+            entry += "\n"
+            entry += f"🆔 ID: {uid}\n"
+            entry += f"📂 Subjects: {', '.join(subjects)}\n"
+            entry += f"💰 Reward: {reward}\n"
+            entry += f"📅 Publication: {publication_date}\n"
             
             if field_offices:
-                result += f"🏢 Field Office: {', '.join(field_offices).title()}\n"
+                entry += f"🏢 Field Office: {', '.join(field_offices).title()}\n"
+            
+            # Warning
+            if person.warning_message:
+                entry += f"\n⚠️ **WARNING:** {person.warning_message}\n"
+            output.add(entry, SUMMARY, "result", group=i)
             
             # Physical description
-            result += f"\n👤 **PHYSICAL DESCRIPTION:**\n"
-            result += f"   Sex: {sex} | Race: {race}\n"
-            result += f"   Height: {height} | Weight: {weight}\n"
-            result += f"   Hair: {hair} | Eyes: {eyes}\n"
+            physical = f"\n👤 **PHYSICAL DESCRIPTION:**\n"
+            physical += f"   Sex: {sex} | Race: {race}\n"
+            physical += f"   Height: {height} | Weight: {weight}\n"
+            physical += f"   Hair: {hair} | Eyes: {eyes}\n"
+            output.add(physical, DETAIL, "physical description")
             
             # Personal information
+            personal = ""
             if birth_dates or birth_place != 'Unknown' or nationality != 'Unknown':
-                result += f"\n📋 **PERSONAL INFO:**\n"
+                personal += f"\n📋 **PERSONAL INFO:**\n"
                 if birth_dates:
-                    result += f"   Birth Date(s): {', '.join(birth_dates)}\n"
+                    personal += f"   Birth Date(s): {', '.join(birth_dates)}\n"
                 if birth_place != 'Unknown':
-                    result += f"   Birth Place: {birth_place}\n"
+                    personal += f"   Birth Place: {birth_place}\n"
                 if nationality != 'Unknown':
-                    result += f"   Nationality: {nationality}\n"
+                    personal += f"   Nationality: {nationality}\n"
             
             # Aliases
             if aliases:
-                result += f"   Aliases: {', '.join(aliases)}\n"
-            
-            # Warning
-            if person.get('warning_message'):
-                result += f"\n⚠️ **WARNING:** {person['warning_message']}\n"
+                personal += f"   Aliases: {', '.join(aliases)}\n"
+            output.add(personal, DETAIL, "personal info")
             
             # Description
-            if person.get('description'):
-                desc = person['description'][:300] + "..." if len(person['description']) > 300 else person['description']
-                result += f"\n📄 **DESCRIPTION:** {desc}\n"
+            description = person.description
+            if description:
+                desc = description[:300] + "..." if len(description) > 300 else description
+                output.add(f"\n📄 **DESCRIPTION:** {desc}\n", NARRATIVE, "description")
             
             # Caution details
-            if person.get('caution'):
+            caution = person.caution
+            if caution:
                 import re
-                caution_clean = re.sub('<[^<]+?>', '', person['caution'])[:400] + "..."
-                result += f"\n🚨 **CAUTION:** {caution_clean}\n"
+                caution_clean = re.sub('<[^<]+?>', '', caution)[:400] + "..."
+                output.add(f"\n🚨 **CAUTION:** {caution_clean}\n", NARRATIVE, "caution")
             
             # Additional details
-            if person.get('details'):
+            details = person.details
+            if details:
                 import re
-                details_clean = re.sub('<[^<]+?>', '', person['details'])[:300] + "..."
-                result += f"\n📝 **DETAILS:** {details_clean}\n"
+                details_clean = re.sub('<[^<]+?>', '', details)[:300] + "..."
+                output.add(f"\n📝 **DETAILS:** {details_clean}\n", NARRATIVE, "details")
             
             # Scars and marks
-            if person.get('scars_and_marks'):
-                result += f"\n🔍 **SCARS & MARKS:** {person['scars_and_marks']}\n"
+            scars_and_marks = person.scars_and_marks
+            if scars_and_marks:
+                output.add(f"\n🔍 **SCARS & MARKS:** {scars_and_marks}\n", NARRATIVE, "scars and marks")
             
             # Remarks
-            if person.get('remarks'):
+            remarks = person.remarks
+            if remarks:
                 import re
-                remarks_clean = re.sub('<[^<]+?>', '', person['remarks'])[:200] + "..."
-                result += f"\n💭 **REMARKS:** {remarks_clean}\n"
+                remarks_clean = re.sub('<[^<]+?>', '', remarks)[:200] + "..."
+                output.add(f"\n💭 **REMARKS:** {remarks_clean}\n", NARRATIVE, "remarks")
             
-            result += "\n" + "="*60 + "\n"
+            output.add("\n" + "="*60 + "\n", SUMMARY, group=i)
         
-        return result
+        return output.render(LIST_HINT)
         
     except Exception as e:
         return f"Error searching for person '{name}': {str(e)}"
@@ -213,39 +240,39 @@ def search_fbi_by_field_office(field_office: str, page_size: str = "10") -> str:
         A formatted string with search results from the specified field office
     """
     try:
-        url = "https://api.fbi.gov/wanted/v1/list"
         params = {
             'field_offices': field_office.lower(),
             'pageSize': min(int(page_size), 50)  # API limit
         }
         
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = get_catalog().query(params)
         
         if not data.get('items'):
             return f"No wanted persons found for field office: {field_office}"
         
-        result = f"🏢 FBI FIELD OFFICE: {field_office.upper()}\n\n"
+        output = ToolOutput("search_fbi_by_field_office")
+        output.add(f"🏢 FBI FIELD OFFICE: {field_office.upper()}\n\n")
         
         for i, person in enumerate(data['items'], 1):
-            name = person.get('title', 'Unknown')
-            subjects = person.get('subjects', ['Unknown'])
-            reward = person.get('reward_text', 'No reward specified')
+            name = person.title or 'Unknown'
+            subjects = person.subjects or ['Unknown']
+            reward = person.reward_text or 'No reward specified'
             
-            result += f"{i}. **{name}**\n"
-            result += f"   Subjects: {', '.join(subjects)}\n"
-            result += f"   Reward: {reward}\n"
+            entry = f"{i}. **{name}** (ID: {person.uid or 'No ID'})\n"
+            entry += f"   Subjects: {', '.join(subjects)}\n"
+            entry += f"   Reward: {reward}\n"
+            output.add(entry, SUMMARY, "result", group=i)
             
-            if person.get('description'):
-                desc = person['description'][:150] + "..." if len(person['description']) > 150 else person['description']
-                result += f"   Description: {desc}\n"
+            description = person.description
+            if description:
+                desc = description[:150] + "..." if len(description) > 150 else description
+                output.add(f"   Description: {desc}\n", NARRATIVE, "description")
             
-            result += "\n"
+            output.add("\n", SUMMARY, group=i)
         
-        result += f"Total results: {data.get('total', 'Unknown')} from {field_office} field office"
+        output.add(f"Total results: {data.get('total', 'Unknown')} from {field_office} field office")
         
-        return result
+        return output.render(LIST_HINT)
         
     except Exception as e:
         return f"Error searching field office '{field_office}': {str(e)}"
@@ -261,42 +288,42 @@ def search_fbi_by_status(status: str, page_size: str = "10") -> str:
         A formatted string with search results matching the specified status
     """
     try:
-        url = "https://api.fbi.gov/wanted/v1/list"
         params = {
             'status': status.lower(),
             'pageSize': min(int(page_size), 50)
         }
         
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = get_catalog().query(params)
         
         if not data.get('items'):
             return f"No wanted persons found with status: {status}"
         
-        result = f"📊 STATUS SEARCH: {status.upper()}\n\n"
+        output = ToolOutput("search_fbi_by_status")
+        output.add(f"📊 STATUS SEARCH: {status.upper()}\n\n")
         
         for i, person in enumerate(data['items'], 1):
-            name = person.get('title', 'Unknown')
-            subjects = person.get('subjects', ['Unknown'])
-            reward = person.get('reward_text', 'No reward specified')
-            publication = person.get('publication', 'Unknown date')
+            name = person.title or 'Unknown'
+            subjects = person.subjects or ['Unknown']
+            reward = person.reward_text or 'No reward specified'
+            publication = person.publication or 'Unknown date'
             
-            result += f"{i}. **{name}**\n"
-            result += f"   Subjects: {', '.join(subjects)}\n"
-            result += f"   Status: {status}\n"
-            result += f"   Reward: {reward}\n"
-            result += f"   Publication: {publication}\n"
+            entry = f"{i}. **{name}** (ID: {person.uid or 'No ID'})\n"
+            entry += f"   Subjects: {', '.join(subjects)}\n"
+            entry += f"   Status: {status}\n"
+            entry += f"   Reward: {reward}\n"
+            entry += f"   Publication: {publication}\n"
+            output.add(entry, SUMMARY, "result", group=i)
             
-            if person.get('description'):
-                desc = person['description'][:120] + "..." if len(person['description']) > 120 else person['description']
-                result += f"   Description: {desc}\n"
+            description = person.description
+            if description:
+                desc = description[:120] + "..." if len(description) > 120 else description
+                output.add(f"   Description: {desc}\n", NARRATIVE, "description")
             
-            result += "\n"
+            output.add("\n", SUMMARY, group=i)
         
-        result += f"Total results: {data.get('total', 'Unknown')} with status '{status}'"
+        output.add(f"Total results: {data.get('total', 'Unknown')} with status '{status}'")
         
-        return result
+        return output.render(LIST_HINT)
         
     except Exception as e:
         return f"Error searching by status '{status}': {str(e)}"
@@ -312,15 +339,12 @@ def search_fbi_by_classification(classification: str, page_size: str = "10") ->
         A formatted string with search results matching the specified classification
     """
     try:
-        url = "https://api.fbi.gov/wanted/v1/list"
         params = {
             'person_classification': classification.lower(),
             'pageSize': min(int(page_size), 50)
         }
         
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = get_catalog().query(params)
         
         if not data.get('items'):
             return f"No persons found with classification: {classification}"
@@ -333,27 +357,30 @@ def search_fbi_by_classification(classification: str, page_size: str = "10") ->
         }
         
         desc = classification_descriptions.get(classification.lower(), classification)
-        result = f"🏷️ CLASSIFICATION: {desc.upper()}\n\n"
+        output = ToolOutput("search_fbi_by_classification")
+        output.add(f"🏷️ CLASSIFICATION: {desc.upper()}\n\n")
         
         for i, person in enumerate(data['items'], 1):
-            name = person.get('title', 'Unknown')
-            subjects = person.get('subjects', ['Unknown'])
-            reward = person.get('reward_text', 'No reward specified')
+            name = person.title or 'Unknown'
+            subjects = person.subjects or ['Unknown']
+            reward = person.reward_text or 'No reward specified'
             
-            result += f"{i}. **{name}**\n"
-            result += f"   Classification: {desc}\n"
-            result += f"   Subjects: {', '.join(subjects)}\n"
-            result += f"   Reward: {reward}\n"
+            entry = f"{i}. **{name}** (ID: {person.uid or 'No ID'})\n"
+            entry += f"   Classification: {desc}\n"
+            entry += f"   Subjects: {', '.join(subjects)}\n"
+            entry += f"   Reward: {reward}\n"
+            output.add(entry, SUMMARY, "result", group=i)
             
-            if person.get('description'):
-                desc_text = person['description'][:150] + "..." if len(person['description']) > 150 else person['description']
-                result += f"   Description: {desc_text}\n"
+            description = person.description
+            if description:
+                desc_text = description[:150] + "..." if len(description) > 150 else description
+                output.add(f"   Description: {desc_text}\n", NARRATIVE, "description")
             
-            result += "\n"
+            output.add("\n", SUMMARY, group=i)
         
-        result += f"Total results: {data.get('total', 'Unknown')} in classification '{classification}'"
+        output.add(f"Total results: {data.get('total', 'Unknown')} in classification '{classification}'")
         
-        return result
+        return output.render(LIST_HINT)
         
     except Exception as e:
         return f"Error searching by classification '{classification}': {str(e)}"
@@ -368,55 +395,45 @@ def get_fbi_person_details(person_id: str) -> str:
         A formatted string with comprehensive detailed information about the person
     """
     try:
-        # First try to get the person from the list since individual endpoint might not exist
-        url = "https://api.fbi.gov/wanted/v1/list"
-        params = {'pageSize': 50}  # Get more results to find the person
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        # Find the person by ID
-        person = None
-        for item in data.get('items', []):
-            if item.get('uid') == person_id:
-                person = item
-                break
+        # The local catalog is keyed by ID, so this is a single lookup
+        person = get_catalog().get(person_id.strip())
         
         if not person:
             return f"No person found with ID '{person_id}'"
         
-        result = "📋 COMPREHENSIVE PERSON INFORMATION\n"
-        result += "="*50 + "\n\n"
+        output = ToolOutput("get_fbi_person_details")
         
         # Basic identification
-        result += "🆔 **IDENTIFICATION**\n"
-        result += f"Name: {person.get('title', 'Unknown')}\n"
-        result += f"ID: {person.get('uid', 'Unknown')}\n"
+        identification = "📋 COMPREHENSIVE PERSON INFORMATION\n"
+        identification += "="*50 + "\n\n"
+        identification += "🆔 **IDENTIFICATION**\n"
+        identification += f"Name: {person.title or 'Unknown'}\n"
+        identification += f"ID: {person.uid or 'Unknown'}\n"
         
-        aliases = person.get('aliases', [])
+        aliases = person.aliases
         if aliases:
-            result += f"Aliases: {', '.join(aliases)}\n"
+            identification += f"Aliases: {', '.join(aliases)}\n"
         
         # Status and classification
-        status = person.get('status', 'na')
+        status = person.status or 'na'
         status_icon = "🔴" if status == "na" else "🟢"
         status_text = "ACTIVE" if status == "na" else "CAPTURED"
-        result += f"Status: {status_icon} {status_text}\n"
+        identification += f"Status: {status_icon} {status_text}\n"
         
-        poster_class = person.get('poster_classification', 'Unknown')
-        person_class = person.get('person_classification', 'Unknown')
-        result += f"Classification: {poster_class} / {person_class}\n\n"
+        poster_class = person.poster_classification or 'Unknown'
+        person_class = person.person_classification or 'Unknown'
+        identification += f"Classification: {poster_class} / {person_class}\n\n"
+        output.add(identification)
         
         # Physical description
-        result += "👤 **PHYSICAL DESCRIPTION**\n"
-        sex = person.get('sex', 'Unknown')
-        race = person.get('race_raw', person.get('race', 'Unknown'))
-        result += f"Sex: {sex} | Race: {race}\n"
+        physical = "👤 **PHYSICAL DESCRIPTION**\n"
+        sex = person.sex or 'Unknown'
+        race = person.race or 'Unknown'
+        physical += f"Sex: {sex} | Race: {race}\n"
         
         # Height conversion
-        height_min = person.get('height_min')
-        height_max = person.get('height_max')
+        height_min = person.height_min
+        height_max = person.height_max
         if height_min:
             if height_max and height_max != height_min:
                 height_str = f"{height_min//12}'{height_min%12}\" to {height_max//12}'{height_max%12}\""
@@ -425,131 +442,177 @@ def get_fbi_person_details(person_id: str) -> str:
         else:
             height_str = "Unknown"
         
-        weight = person.get('weight', 'Unknown')
-        result += f"Height: {height_str} | Weight: {weight}\n"
+        weight = person.weight or 'Unknown'
+        physical += f"Height: {height_str} | Weight: {weight}\n"
         
-        hair = person.get('hair_raw', person.get('hair', 'Unknown'))
-        eyes = person.get('eyes_raw', person.get('eyes', 'Unknown'))
-        result += f"Hair: {hair} | Eyes: {eyes}\n"
+        hair = person.hair or 'Unknown'
+        eyes = person.eyes or 'Unknown'
+        physical += f"Hair: {hair} | Eyes: {eyes}\n"
         
-        complexion = person.get('complexion')
-        build = person.get('build')
+        complexion = person.complexion
+        build = person.build
         if complexion or build:
-            result += f"Complexion: {complexion or 'Not specified'} | Build: {build or 'Not specified'}\n"
+            physical += f"Complexion: {complexion or 'Not specified'} | Build: {build or 'Not specified'}\n"
+        output.add(physical, SUMMARY, "physical description")
         
         # Personal information
-        result += "\n📋 **PERSONAL INFORMATION**\n"
-        birth_dates = person.get('dates_of_birth_used', [])
+        personal = "\n📋 **PERSONAL INFORMATION**\n"
+        birth_dates = person.dates_of_birth_used
         if birth_dates:
-            result += f"Date(s) of Birth: {', '.join(birth_dates)}\n"
+            personal += f"Date(s) of Birth: {', '.join(birth_dates)}\n"
         
-        birth_place = person.get('place_of_birth')
+        birth_place = person.place_of_birth
         if birth_place:
-            result += f"Place of Birth: {birth_place}\n"
+            personal += f"Place of Birth: {birth_place}\n"
         
-        nationality = person.get('nationality')
+        nationality = person.nationality
         if nationality:
-            result += f"Nationality: {nationality}\n"
+            personal += f"Nationality: {nationality}\n"
         
-        age_range = person.get('age_range')
+        age_range = person.age_range
         if age_range:
-            result += f"Age Range: {age_range}\n"
+            personal += f"Age Range: {age_range}\n"
         
         # Occupations
-        occupations = person.get('occupations', [])
+        occupations = person.occupations
         if occupations:
-            result += f"Occupations: {', '.join(occupations)}\n"
+            personal += f"Occupations: {', '.join(occupations)}\n"
         
         # Languages
-        languages = person.get('languages', [])
+        languages = person.languages
         if languages:
-            result += f"Languages: {', '.join(languages)}\n"
+            personal += f"Languages: {', '.join(languages)}\n"
+        output.add(personal, DETAIL, "personal information")
         
         # Distinguishing marks
-        scars_marks = person.get('scars_and_marks')
+        scars_marks = person.scars_and_marks
         if scars_marks:
-            result += f"\n🔍 **SCARS AND MARKS**\n{scars_marks}\n"
+            output.add(f"\n🔍 **SCARS AND MARKS**\n{scars_marks}\n", NARRATIVE, "scars_and_marks")
         
         # Criminal information
-        result += "\n🚨 **CRIMINAL INFORMATION**\n"
-        subjects = person.get('subjects', ['Unknown'])
-        result += f"Subjects: {', '.join(subjects)}\n"
+        subjects = person.subjects or ['Unknown']
+        output.add("\n🚨 **CRIMINAL INFORMATION**\n"
+                   f"Subjects: {', '.join(subjects)}\n", SUMMARY, "criminal information", group="criminal")
         
-        description = person.get('description')
+        description = person.description
         if description:
-            result += f"Charges: {description}\n"
+            output.add(f"Charges: {description}\n", NARRATIVE, "description")
         
         # Reward information
-        reward = person.get('reward_text')
+        reward = person.reward_text
         if reward:
-            result += f"Reward: {reward}\n"
+            output.add(f"Reward: {reward}\n", SUMMARY, group="criminal")
         
         # Warning message
-        warning = person.get('warning_message')
+        warning = person.warning_message
         if warning:
-            result += f"\n⚠️ **WARNING**\n{warning}\n"
+            output.add(f"\n⚠️ **WARNING**\n{warning}\n")
         
         # Case details
-        if person.get('caution'):
+        caution = person.caution
+        if caution:
             import re
-            caution_clean = re.sub('<[^<]+?>', '', person['caution'])
-            result += f"\n🚨 **CASE DETAILS**\n{caution_clean}\n"
+            caution_clean = re.sub('<[^<]+?>', '', caution)
+            output.add(f"\n🚨 **CASE DETAILS**\n{caution_clean}\n", NARRATIVE, "caution")
         
         # Additional details
-        if person.get('details'):
+        details = person.details
+        if details:
             import re
-            details_clean = re.sub('<[^<]+?>', '', person['details'])
-            result += f"\n📝 **ADDITIONAL DETAILS**\n{details_clean}\n"
+            details_clean = re.sub('<[^<]+?>', '', details)
+            output.add(f"\n📝 **ADDITIONAL DETAILS**\n{details_clean}\n", NARRATIVE, "details")
         
         # Investigative information
-        result += "\n🔍 **INVESTIGATIVE INFO**\n"
-        field_offices = person.get('field_offices', [])
+        investigative = "\n🔍 **INVESTIGATIVE INFO**\n"
+        field_offices = person.field_offices
         if field_offices:
-            result += f"Field Office(s): {', '.join(field_offices).title()}\n"
+            investigative += f"Field Office(s): {', '.join(field_offices).title()}\n"
         
-        publication = person.get('publication')
+        publication = person.publication
         if publication:
-            result += f"Publication Date: {publication[:10]}\n"
+            investigative += f"Publication Date: {publication[:10]}\n"
         
-        ncic = person.get('ncic')
+        ncic = person.ncic
         if ncic:
-            result += f"NCIC Number: {ncic}\n"
+            investigative += f"NCIC Number: {ncic}\n"
         
         # Location information
-        possible_countries = person.get('possible_countries', [])
-        possible_states = person.get('possible_states', [])
+        possible_countries = person.possible_countries
+        possible_states = person.possible_states
         if possible_countries:
-            result += f"Possible Countries: {', '.join(possible_countries)}\n"
+            investigative += f"Possible Countries: {', '.join(possible_countries)}\n"
         if possible_states:
-            result += f"Possible States: {', '.join(possible_states)}\n"
+            investigative += f"Possible States: {', '.join(possible_states)}\n"
+        output.add(investigative, SUMMARY, "investigative info")
         
         # Remarks
-        if person.get('remarks'):
+        remarks = person.remarks
+        if remarks:
             import re
-            remarks_clean = re.sub('<[^<]+?>', '', person['remarks'])
-            result += f"\n💭 **REMARKS**\n{remarks_clean}\n"
+            remarks_clean = re.sub('<[^<]+?>', '', remarks)
+            output.add(f"\n💭 **REMARKS**\n{remarks_clean}\n", NARRATIVE, "remarks")
         
         # Additional information
-        if person.get('additional_information'):
+        additional_information = person.additional_information
+        if additional_information:
             import re
-            add_info_clean = re.sub('<[^<]+?>', '', person['additional_information'])
-            result += f"\n📄 **ADDITIONAL INFORMATION**\n{add_info_clean}\n"
+            add_info_clean = re.sub('<[^<]+?>', '', additional_information)
+            output.add(f"\n📄 **ADDITIONAL INFORMATION**\n{add_info_clean}\n", NARRATIVE, "additional_information")
         
         # File and image availability
-        images = person.get('images', [])
-        files = person.get('files', [])
-        if images or files:
-            result += "\n📎 **AVAILABLE RESOURCES**\n"
-            if images:
-                result += f"Images Available: {len(images)} image(s)\n"
-            if files:
-                result += f"Files Available: {len(files)} file(s)\n"
-        
-        return result
+        if person.image_count or person.file_count:
+            resources = "\n📎 **AVAILABLE RESOURCES**\n"
+            if person.image_count:
+                resources += f"Images Available: {person.image_count} image(s)\n"
+            if person.file_count:
+                resources += f"Files Available: {person.file_count} file(s)\n"
+            output.add(resources, DETAIL, "resources")
+        
+        return output.render(
+            f"Get an omitted section in full with get_fbi_person_section: "
+            f"'{person.uid}, <section>' (sections: {', '.join(SECTION_FIELDS)})."
+        )
         
     except Exception as e:
         return f"Error retrieving details for person ID '{person_id}': {str(e)}"
 
+def get_fbi_person_section(person_id: str, section: str) -> str:
+    """Get the full text of one long section of a person's record.
+    
+    Use it when get_fbi_person_details trimmed a section to save space.
+    
+    Args:
+        person_id: The unique ID of the person
+        section: One of description, caution, details, remarks,
+            additional_information, scars_and_marks
+        
+    Returns:
+        The full text of the section
+    """
+    try:
+        field = section.strip().lower().replace(' ', '_')
+        if field not in SECTION_FIELDS:
+            return f"Unknown section '{section}'. Sections: {', '.join(SECTION_FIELDS)}"
+        
+        person = get_catalog().get(person_id.strip())
+        
+        if not person:
+            return f"No person found with ID '{person_id}'"
+        
+        text = getattr(person, field)
+        if not text:
+            return f"{person.title or 'This person'} has no {field} section."
+        
+        output = ToolOutput("get_fbi_person_section")
+        output.add(f"📄 **{field.replace('_', ' ').upper()}** - {person.title or 'Unknown'} (ID: {person.uid})\n\n")
+        output.add(clean_text(text) + "\n", NARRATIVE, field)
+        
+        poster_url = person.url
+        return output.render(f"Full poster: {poster_url}" if poster_url else "")
+        
+    except Exception as e:
+        return f"Error retrieving section '{section}' for person ID '{person_id}': {str(e)}"
+
 @tool
 def get_fbi_terrorism_list() -> str:
     """Get the list of FBI's most wanted terrorists and terrorism-related persons.
@@ -558,82 +621,69 @@ def get_fbi_terrorism_list() -> str:
         A formatted string with information about terrorism-related wanted persons
     """
     try:
-        url = "https://api.fbi.gov/wanted/v1/list"
-        params = {
-            'pageSize': 20  # Get more results to filter terrorism cases
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if not data.get('items'):
-            return "No persons found in the FBI database."
-        
-        # Filter for terrorism-related cases
+        # Filter for terrorism-related cases across the whole catalog,
+        # stopping early once there is enough to display
         terrorism_keywords = ['terrorism', 'terrorist', 'seeking information - terrorism', 'counterterrorism']
-        terrorism_cases = []
         
-        for person in data['items']:
-            subjects = person.get('subjects', [])
-            for subject in subjects:
-                if any(keyword.lower() in subject.lower() for keyword in terrorism_keywords):
-                    terrorism_cases.append(person)
-                    break
+        data = get_catalog().find({'subjects': terrorism_keywords}, limit=8)
+        terrorism_cases = data['items']
         
         if not terrorism_cases:
-            return "No terrorism-related wanted persons found in current results."
+            return "No terrorism-related wanted persons found in the FBI database."
         
-        result = "🔴 FBI TERRORISM-RELATED CASES 🔴\n"
-        result += "="*50 + "\n\n"
+        output = ToolOutput("get_fbi_terrorism_list")
+        output.add("🔴 FBI TERRORISM-RELATED CASES 🔴\n" + "="*50 + "\n\n")
         
         for i, person in enumerate(terrorism_cases[:8], 1):
-            name = person.get('title', 'Unknown')
-            subjects = person.get('subjects', ['Unknown'])
-            reward = person.get('reward_text', 'No reward specified')
-            status = person.get('status', 'na')
-            nationality = person.get('nationality', 'Unknown')
-            field_offices = person.get('field_offices', [])
+            name = person.title or 'Unknown'
+            subjects = person.subjects or ['Unknown']
+            reward = person.reward_text or 'No reward specified'
+            status = person.status or 'na'
+            nationality = person.nationality or 'Unknown'
+            field_offices = person.field_offices
             
             # Status indicator
             status_icon = "🔴" if status == "na" else "🟢"
             status_text = "ACTIVE" if status == "na" else "CAPTURED"
             
-            result += f"{i}. **{name}** {status_icon} {status_text}\n"
-            result += f"   🏴 Nationality: {nationality}\n"
-            result += f"   📂 Subjects: {', '.join(subjects)}\n"
-            result += f"   💰 Reward: {reward}\n"
+            entry = f"{i}. **{name}** {status_icon} {status_text}\n"
+            entry += f"   🏴 Nationality: {nationality}\n"
+            entry += f"   📂 Subjects: {', '.join(subjects)}\n"
+            entry += f"   💰 Reward: {reward}\n"
             
             if field_offices:
-                result += f"   🏢 Field Office: {', '.join(field_offices).title()}\n"
+                entry += f"   🏢 Field Office: {', '.join(field_offices).title()}\n"
             
             # Add warning if present
-            if person.get('warning_message'):
-                result += f"   ⚠️ WARNING: {person['warning_message']}\n"
+            if person.warning_message:
+                entry += f"   ⚠️ WARNING: {person.warning_message}\n"
+            output.add(entry, SUMMARY, "result", group=i)
             
             # Add occupation if available and relevant
-            occupations = person.get('occupations', [])
+            occupations = person.occupations
             if occupations:
-                result += f"   💼 Occupation: {', '.join(occupations)}\n"
+                output.add(f"   💼 Occupation: {', '.join(occupations)}\n", DETAIL, "occupation")
             
             # Brief caution info
-            if person.get('caution'):
+            caution = person.caution
+            if caution:
                 import re
-                caution_clean = re.sub('<[^<]+?>', '', person['caution'])[:200] + "..."
-                result += f"   🚨 Details: {caution_clean}\n"
+                caution_clean = re.sub('<[^<]+?>', '', caution)[:200] + "..."
+                output.add(f"   🚨 Details: {caution_clean}\n", NARRATIVE, "caution")
             
             # Brief details
-            elif person.get('details'):
+            elif person.details:
                 import re
-                details_clean = re.sub('<[^<]+?>', '', person['details'])[:150] + "..."
-                result += f"   📋 Details: {details_clean}\n"
+                details_clean = re.sub('<[^<]+?>', '', person.details)[:150] + "..."
+                output.add(f"   📋 Details: {details_clean}\n", NARRATIVE, "details")
             
-            result += f"   🆔 ID: {person.get('uid', 'No ID')}\n\n"
+            output.add(f"   🆔 ID: {person.uid or 'No ID'}\n\n", SUMMARY, group=i)
         
-        result += f"📊 Found {len(terrorism_cases)} terrorism-related case(s)\n"
-        result += "⚠️ These cases involve national security matters"
+        found = data['total'] if data['complete'] else f"{data['total']}+"
+        output.add(f"📊 Found {found} terrorism-related case(s)\n"
+                   "⚠️ These cases involve national security matters")
         
-        return result
+        return output.render(LIST_HINT)
         
     except Exception as e:
         return f"Error retrieving FBI terrorism-related cases: {str(e)}"
@@ -649,22 +699,10 @@ def get_fbi_by_poster_classification(classification: str = "default") -> str:
         A formatted string with search results matching the specified poster classification
     """
     try:
-        url = "https://api.fbi.gov/wanted/v1/list"
-        params = {
-            'pageSize': 20,
-            'sort_on': 'publication',
-            'sort_order': 'desc'
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if not data.get('items'):
-            return "No persons found in the FBI database."
-        
-        # Filter by poster classification
-        filtered_items = [item for item in data['items'] if item.get('poster_classification', '').lower() == classification.lower()]
+        # Filter by poster classification across the whole catalog,
+        # stopping early once there is enough to display
+        data = get_catalog().find({'poster_classification': classification.lower()}, limit=10)
+        filtered_items = data['items']
         
         if not filtered_items:
             return f"No persons found with poster classification: {classification}"
@@ -677,57 +715,305 @@ def get_fbi_by_poster_classification(classification: str = "default") -> str:
         }
         
         desc = classification_descriptions.get(classification.lower(), classification)
-        result = f"📋 {desc.upper()}\n"
-        result += "="*50 + "\n\n"
+        output = ToolOutput("get_fbi_by_poster_classification")
+        output.add(f"📋 {desc.upper()}\n" + "="*50 + "\n\n")
         
         for i, person in enumerate(filtered_items[:10], 1):
-            name = person.get('title', 'Unknown')
-            subjects = person.get('subjects', ['Unknown'])
-            status = person.get('status', 'na')
-            reward = person.get('reward_text', 'No reward specified')
-            publication = person.get('publication', 'Unknown date')[:10]
-            field_offices = person.get('field_offices', [])
+            name = person.title or 'Unknown'
+            subjects = person.subjects or ['Unknown']
+            status = person.status or 'na'
+            reward = person.reward_text or 'No reward specified'
+            publication = (person.publication or 'Unknown date')[:10]
+            field_offices = person.field_offices
             
             # Status indicator
             status_icon = "🔴" if status == "na" else "🟢"
             status_text = "ACTIVE" if status == "na" else "CAPTURED"
             
-            result += f"{i}. **{name}** {status_icon} {status_text}\n"
-            result += f"   📂 Subjects: {', '.join(subjects)}\n"
-            result += f"   💰 Reward: {reward}\n"
-            result += f"   📅 Published: {publication}\n"
+            entry = f"{i}. **{name}** {status_icon} {status_text}\n"
+            entry += f"   📂 Subjects: {', '.join(subjects)}\n"
+            entry += f"   💰 Reward: {reward}\n"
+            entry += f"   📅 Published: {publication}\n"
             
             if field_offices:
-                result += f"   🏢 Field Office: {', '.join(field_offices).title()}\n"
+                entry += f"   🏢 Field Office: {', '.join(field_offices).title()}\n"
             
             # Add warning if present
-            if person.get('warning_message'):
-                result += f"   ⚠️ WARNING: {person['warning_message']}\n"
+            if person.warning_message:
+                entry += f"   ⚠️ WARNING: {person.warning_message}\n"
             
             # Add age range for missing persons
-            if person.get('age_range'):
-                result += f"   👤 Age: {person['age_range']}\n"
+            if person.age_range:
+                entry += f"   👤 Age: {person.age_range}\n"
+            output.add(entry, SUMMARY, "result", group=i)
             
             # Brief description
-            if person.get('description'):
-                desc_text = person['description'][:120] + "..." if len(person['description']) > 120 else person['description']
-                result += f"   📋 Description: {desc_text}\n"
+            description = person.description
+            if description:
+                desc_text = description[:120] + "..." if len(description) > 120 else description
+                output.add(f"   📋 Description: {desc_text}\n", NARRATIVE, "description")
             
-            result += f"   🆔 ID: {person.get('uid', 'No ID')}\n\n"
+            output.add(f"   🆔 ID: {person.uid or 'No ID'}\n\n", SUMMARY, group=i)
         
-        result += f"📊 Found {len(filtered_items)} person(s) with classification '{classification}'\n"
-        result += f"📄 Total in database: {data.get('total', 'Unknown')}"
+        found = data['total'] if data['complete'] else f"{data['total']}+"
+        output.add(f"📊 Found {found} person(s) with classification '{classification}'\n"
+                   f"📄 Total in database: {len(get_catalog())}")
         
-        return result
+        return output.render(LIST_HINT)
         
     except Exception as e:
         return f"Error searching by poster classification '{classification}': {str(e)}"
 
+def _criteria_params(field_office: str, status: str, category: str) -> dict:
+    """Catalog filters for a field office, a status and a category (empty ones are left out)."""
+    catalog = get_catalog()
+    params = {}
+    
+    if field_office.strip():
+        params['field_offices'] = field_office.strip().lower().replace(' ', '')
+    
+    if status.strip():
+        status_value = status.strip().lower()
+        params['status'] = 'na' if status_value == 'active' else status_value
+    
+    # A category can be a classification value or a word of the case subjects
+    category_value = category.strip().lower()
+    if category_value:
+        if category_value in catalog.vocabulary('person_classification'):
+            params['person_classification'] = category_value
+        elif category_value in catalog.vocabulary('poster_classification'):
+            params['poster_classification'] = category_value
+        else:
+            params['subjects'] = [category_value]
+    
+    return params
+
+def search_fbi_by_criteria(field_office: str, status: str, category: str) -> str:
+    """Search FBI wanted persons matching several criteria at once.
+    
+    Any criterion can be left empty. Answered by intersecting the catalog's
+    inverted index, so compound questions need a single tool call.
+    
+    Args:
+        field_office: FBI field office name (e.g., "miami", "newyork")
+        status: "captured", or "active"/"na" for open cases
+        category: Person or poster classification (e.g., "main", "missing"),
+            or a subject keyword (e.g., "vicap", "kidnapping", "cyber")
+        
+    Returns:
+        A formatted string with the persons matching every given criterion
+    """
+    try:
+        catalog = get_catalog()
+        params = _criteria_params(field_office, status, category)
+        
+        if not params:
+            return "Please give at least one criterion: field office, status or category."
+        
+        data = catalog.find(params, limit=15)
+        
+        criteria = ", ".join(value for value in (field_office.strip(), status.strip(), category.strip()) if value)
+        if not data['items']:
+            return f"No wanted persons found matching: {criteria}"
+        
+        output = ToolOutput("search_fbi_by_criteria")
+        output.add(f"🎯 FBI CASES MATCHING: {criteria.upper()}\n\n")
+        
+        for i, person in enumerate(data['items'], 1):
+            name = person.title or 'Unknown'
+            subjects = person.subjects or ['Unknown']
+            reward = person.reward_text or 'No reward specified'
+            person_status = person.status or 'na'
+            field_offices = person.field_offices
+            
+            # Status indicator
+            status_icon = "🔴" if person_status == "na" else "🟢"
+            status_text = "ACTIVE" if person_status == "na" else "CAPTURED"
+            
+            entry = f"{i}. **{name}** {status_icon} {status_text}\n"
+            entry += f"   📂 Subjects: {', '.join(subjects)}\n"
+            entry += f"   💰 Reward: {reward}\n"
+            
+            if field_offices:
+                entry += f"   🏢 Field Office: {', '.join(field_offices).title()}\n"
+            
+            entry += f"   🆔 ID: {person.uid or 'No ID'}\n\n"
+            output.add(entry, SUMMARY, "result")
+        
+        found = data['total'] if data['complete'] else f"{data['total']}+"
+        output.add(f"📊 Found {found} matching person(s)")
+        
+        return output.render(LIST_HINT)
+        
+    except Exception as e:
+        return f"Error searching by criteria: {str(e)}"
+
+@tool
+def search_fbi_by_description(query: str) -> str:
+    """Full-text search of FBI case descriptions, cautions, details, remarks and scars/marks.
+    
+    Use it for free-text questions about what a person did or looks like, e.g.
+    "tattoo on his forearm escaped in Alabama".
+    
+    Args:
+        query: Free-text description or keywords
+        
+    Returns:
+        A formatted string with the most relevant persons and a text excerpt for each
+    """
+    try:
+        hits = get_catalog().search_text(query, k=5)
+        
+        if not hits:
+            return f"No case description matches '{query}'."
+        
+        output = ToolOutput("search_fbi_by_description")
+        output.add(f"📝 CASES MATCHING '{query.upper()}'\n\n")
+        
+        for i, hit in enumerate(hits, 1):
+            person = hit['record']
+            status = person.status or 'na'
+            
+            # Status indicator
+            status_icon = "🔴" if status == "na" else "🟢"
+            status_text = "ACTIVE" if status == "na" else "CAPTURED"
+            
+            entry = f"{i}. **{person.title or 'Unknown'}** {status_icon} {status_text}\n"
+            entry += f"   🎯 Relevance: {hit['score']:.2f}\n"
+            output.add(entry, SUMMARY, "result", group=i)
+            output.add(f"   📋 Excerpt: {hit['snippet']}\n", NARRATIVE, "excerpt")
+            output.add(f"   🆔 ID: {person.uid or 'No ID'}\n\n", SUMMARY, group=i)
+        
+        output.add("📄 Use the ID with get_fbi_person_details for the full record")
+        
+        return output.render()
+        
+    except Exception as e:
+        return f"Error searching case descriptions for '{query}': {str(e)}"
+
+def _format_amount(amount) -> str:
+    """Dollar amount for display, e.g. "$250,000" ("-" if unknown)."""
+    return f"${amount:,.0f}" if amount is not None else "-"
+
+def _parse_amount(text: str) -> float:
+    """Dollar amount typed by the user: "50000", "$50,000", "50k" or "1m"."""
+    value = text.strip().lower().replace('$', '').replace(',', '').replace(' ', '')
+    multiplier = 1
+    for suffix, factor in (('million', 1e6), ('m', 1e6), ('k', 1e3)):
+        if value.endswith(suffix):
+            value, multiplier = value[:-len(suffix)], factor
+            break
+    return float(value) * multiplier
+
+@tool
+def aggregate_fbi_cases(group_by: str = "", field_office: str = "", status: str = "", category: str = "",
+                        min_reward: str = "", published_since: str = "") -> str:
+    """Count and summarize FBI wanted cases over the whole list, optionally per group.
+    
+    Use it for statistics questions such as "how many active cases per field
+    office" or "rewards over $50,000 published since 2020". Every criterion
+    can be left empty.
+    
+    Args:
+        group_by: "field_office", "status", "person_classification",
+            "poster_classification", "subject", "sex", "year", or empty for totals only
+        field_office: FBI field office name (e.g., "miami", "newyork")
+        status: "captured", or "active"/"na" for open cases
+        category: Person or poster classification (e.g., "main", "missing"),
+            or a subject keyword (e.g., "vicap", "kidnapping", "cyber")
+        min_reward: Minimum reward in dollars (e.g., "50000" or "50k")
+        published_since: Year or date (e.g., "2020" or "2020-06-01")
+        
+    Returns:
+        A formatted string with the totals (cases, active cases, rewards,
+        publication dates, average height and weight) and one line per group
+    """
+    try:
+        group = group_by.strip().lower().replace(' ', '_')
+        if group in ('', 'none', 'all', 'total'):
+            group = None
+        elif group in ('office', 'field_offices', 'offices'):
+            group = 'field_office'
+        elif group in ('classification', 'subjects'):
+            group = {'classification': 'person_classification', 'subjects': 'subject'}[group]
+        if group and group not in GROUP_FIELDS and group not in DERIVED_GROUPS:
+            options = ", ".join(tuple(GROUP_FIELDS) + DERIVED_GROUPS)
+            return f"Error: cannot group by '{group_by}'. Use one of: {options}, or leave it empty"
+        
+        params = _criteria_params(field_office, status, category)
+        if min_reward.strip():
+            params['min_reward'] = _parse_amount(min_reward)
+        if published_since.strip():
+            since = published_since.strip()
+            params['published_since'] = f"{since}-01-01" if since.isdigit() and len(since) == 4 else since
+            if np.isnat(parse_date(params['published_since'])):
+                return f"Error: '{published_since}' is not a year or a date (YYYY-MM-DD)"
+        
+        result = get_catalog().aggregate(params, group)
+        summary = result['summary']
+        
+        criteria = [value.strip() for value in (field_office, status, category) if value.strip()]
+        if min_reward.strip():
+            criteria.append(f"reward ≥ {_format_amount(params['min_reward'])}")
+        if published_since.strip():
+            criteria.append(f"published since {published_since.strip()}")
+        title = ", ".join(criteria).upper() or "ALL CASES"
+        
+        if not summary['count']:
+            return f"No wanted persons found matching: {title.lower()}"
+        
+        output = ToolOutput("aggregate_fbi_cases")
+        output.add(f"📈 FBI CASE STATISTICS: {title}\n\n")
+        
+        totals = f"📊 Cases: {summary['count']} ({summary['active']} active, "
+        totals += f"{summary['count'] - summary['active']} closed)\n"
+        totals += f"💰 With a reward: {summary['with_reward']}"
+        if summary['with_reward']:
+            totals += (f" | Total: {_format_amount(summary['total_reward'])}"
+                       f" | Median: {_format_amount(summary['median_reward'])}"
+                       f" | Largest: {_format_amount(summary['max_reward'])}")
+        totals += "\n"
+        if summary['first_publication']:
+            totals += f"📅 Published: {summary['first_publication']} to {summary['last_publication']}\n"
+        if summary['average_height'] is not None:
+            feet, inches = divmod(round(summary['average_height']), 12)
+            totals += f"📏 Average height: {feet}'{inches}\""
+            if summary['average_weight'] is not None:
+                totals += f" | Average weight: {summary['average_weight']:.0f} pounds"
+            totals += "\n"
+        output.add(totals + "\n")
+        
+        if group:
+            output.add(f"📂 BY {group.replace('_', ' ').upper()}:\n")
+            for i, row in enumerate(result['groups'], 1):
+                value = row['value']
+                if group == 'status' and value == 'na':
+                    value = "active (na)"
+                elif group == 'field_office':
+                    value = value.title()
+                
+                line = f"{i}. **{value}**: {row['count']} case(s), {row['active']} active"
+                if row['with_reward']:
+                    line += (f", {row['with_reward']} with a reward"
+                             f" (total {_format_amount(row['total_reward'])},"
+                             f" largest {_format_amount(row['max_reward'])})")
+                output.add(line + "\n", SUMMARY, "group")
+            
+            if group in ('field_office', 'subject'):
+                output.add("\nℹ️ Cases listed under several groups are counted in each of them\n")
+        
+        return output.render()
+        
+    except Exception as e:
+        return f"Error computing case statistics: {str(e)}"
+
 # Create the string input tool versions for LangChain
 search_fbi_by_field_office_tool = create_string_input_tool(search_fbi_by_field_office, "search_fbi_by_field_office")
 search_fbi_by_status_tool = create_string_input_tool(search_fbi_by_status, "search_fbi_by_status")
 search_fbi_by_classification_tool = create_string_input_tool(search_fbi_by_classification, "search_fbi_by_classification")
 get_fbi_person_details_tool = create_string_input_tool(get_fbi_person_details, "get_fbi_person_details")
+get_fbi_person_section_tool = create_string_input_tool(get_fbi_person_section, "get_fbi_person_section")
+search_fbi_by_criteria_tool = create_string_input_tool(search_fbi_by_criteria, "search_fbi_by_criteria")
 
 @tool
 def get_fbi_advanced_search(title: str = "", sort_criteria: str = "publication") -> str:
@@ -741,7 +1027,6 @@ def get_fbi_advanced_search(title: str = "", sort_criteria: str = "publication")
         A formatted string with advanced search results
     """
     try:
-        url = "https://api.fbi.gov/wanted/v1/list"
         params = {
             'pageSize': 15,
             'sort_on': sort_criteria.lower(),
@@ -752,44 +1037,143 @@ def get_fbi_advanced_search(title: str = "", sort_criteria: str = "publication")
         if title.strip():
             params['title'] = title.strip()
         
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = get_catalog().query(params)
         
         if not data.get('items'):
             search_term = f" for '{title}'" if title else ""
             return f"No wanted persons found{search_term} with current search criteria."
         
         search_info = f" matching '{title}'" if title else ""
-        result = f"🔍 ADVANCED SEARCH RESULTS{search_info.upper()}\n"
-        result += f"Sorted by: {sort_criteria}\n\n"
+        output = ToolOutput("get_fbi_advanced_search")
+        output.add(f"🔍 ADVANCED SEARCH RESULTS{search_info.upper()}\n"
+                   f"Sorted by: {sort_criteria}\n\n")
         
         for i, person in enumerate(data['items'], 1):
-            name = person.get('title', 'Unknown')
-            subjects = person.get('subjects', ['Unknown'])
-            reward = person.get('reward_text', 'No reward specified')
-            publication = person.get('publication', 'Unknown date')
-            uid = person.get('uid', 'No ID')
+            name = person.title or 'Unknown'
+            subjects = person.subjects or ['Unknown']
+            reward = person.reward_text or 'No reward specified'
+            publication = person.publication or 'Unknown date'
+            uid = person.uid or 'No ID'
             
-            result += f"{i}. **{name}** (ID: {uid})\n"
-            result += f"   Subjects: {', '.join(subjects)}\n"
-            result += f"   Reward: {reward}\n"
-            result += f"   Publication: {publication}\n"
+            entry = f"{i}. **{name}** (ID: {uid})\n"
+            entry += f"   Subjects: {', '.join(subjects)}\n"
+            entry += f"   Reward: {reward}\n"
+            entry += f"   Publication: {publication}\n"
             
             # Add warning info if available
-            if person.get('warning_message'):
-                result += f"   ⚠️ Warning: {person['warning_message']}\n"
+            if person.warning_message:
+                entry += f"   ⚠️ Warning: {person.warning_message}\n"
+            output.add(entry, SUMMARY, "result", group=i)
             
-            if person.get('description'):
-                desc = person['description'][:120] + "..." if len(person['description']) > 120 else person['description']
-                result += f"   Description: {desc}\n"
+            description = person.description
+            if description:
+                desc = description[:120] + "..." if len(description) > 120 else description
+                output.add(f"   Description: {desc}\n", NARRATIVE, "description")
             
-            result += "\n"
+            output.add("\n", SUMMARY, group=i)
         
-        result += f"Total available: {data.get('total', 'Unknown')} results"
-        result += f"\nSorted by: {sort_criteria} (descending order)"
+        output.add(f"Total available: {data.get('total', 'Unknown')} results"
+                   f"\nSorted by: {sort_criteria} (descending order)")
         
-        return result
+        return output.render(LIST_HINT)
         
     except Exception as e:
-        return f"Error in advanced search: {str(e)}"
\ No newline at end of file
+        return f"Error in advanced search: {str(e)}"
+
+
+# Staleness note: while the FBI API is unreachable, the catalog keeps serving
+# its local copy (see catalog.ensure_fresh); every tool then says how old
+# the data is, so the agent can tell the user.
+
+def _format_age(seconds: float) -> str:
+    """Human-readable age, e.g. "45 minutes" or "3 hours"."""
+    minutes = int(seconds // 60)
+    if minutes < 120:
+        return f"{minutes} minutes"
+    hours = minutes // 60
+    return f"{hours} hours" if hours < 48 else f"{hours // 24} days"
+
+def _staleness_note() -> str:
+    """Note appended to tool outputs when the catalog data may be out of date."""
+    age = get_catalog().staleness()
+    if age is None:
+        return ""
+    return (f"\n\n🕒 Data from the local copy of the FBI list, last refreshed {_format_age(age)} ago: "
+            f"the FBI API is slow or unreachable and may have newer information.")
+
+def _with_staleness_note(func):
+    """Wrap a tool function so that its output ends with the staleness note."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return func(*args, **kwargs) + _staleness_note()
+    return wrapper
+
+for _tool in (get_fbi_most_wanted,
+              search_fbi_person_by_name,
+              search_fbi_by_field_office_tool,
+              search_fbi_by_status_tool,
+              search_fbi_by_classification_tool,
+              get_fbi_person_details_tool,
+              get_fbi_person_section_tool,
+              search_fbi_by_criteria_tool,
+              aggregate_fbi_cases,
+              get_fbi_terrorism_list,
+              get_fbi_by_poster_classification,
+              get_fbi_advanced_search,
+              search_fbi_by_description):
+    _tool.func = _with_staleness_note(_tool.func)
+
+
+# Async implementations, used by ChatBackend.aprocess_message().
+# Tools only read the local catalog, so the one thing worth awaiting is a due
+# catalog sync (or a uid missing from the index); the formatting itself is
+# fast and runs directly on the event loop.
+
+def _catalog_coroutine(func):
+    """Build the async variant of a tool that only reads the catalog."""
+    async def coroutine(*args, **kwargs):
+        await get_catalog().aensure_fresh()
+        return func(*args, **kwargs)
+    return coroutine
+
+async def _aget_fbi_person_details(input_string: str) -> str:
+    """Async variant of get_fbi_person_details_tool: warm the uid index first."""
+    person_id = input_string.strip()
+    try:
+        person = await get_catalog().aget(person_id)
+    except Exception as e:
+        return f"Error retrieving details for person ID '{person_id}': {str(e)}"
+    
+    if not person:
+        return f"No person found with ID '{person_id}'"
+    
+    return get_fbi_person_details_tool.func(input_string)
+
+async def _aget_fbi_person_section(input_string: str) -> str:
+    """Async variant of get_fbi_person_section_tool: warm the uid index first."""
+    person_id = input_string.split(',')[0].strip()
+    try:
+        person = await get_catalog().aget(person_id)
+    except Exception as e:
+        return f"Error retrieving details for person ID '{person_id}': {str(e)}"
+    
+    if not person:
+        return f"No person found with ID '{person_id}'"
+    
+    return get_fbi_person_section_tool.func(input_string)
+
+for _tool in (get_fbi_most_wanted,
+              search_fbi_person_by_name,
+              search_fbi_by_field_office_tool,
+              search_fbi_by_status_tool,
+              search_fbi_by_classification_tool,
+              search_fbi_by_criteria_tool,
+              aggregate_fbi_cases,
+              get_fbi_terrorism_list,
+              get_fbi_by_poster_classification,
+              get_fbi_advanced_search,
+              search_fbi_by_description):
+    _tool.coroutine = _catalog_coroutine(_tool.func)
+
+get_fbi_person_details_tool.coroutine = _aget_fbi_person_details
+get_fbi_person_section_tool.coroutine = _aget_fbi_person_section
@@ -0,0 +1,222 @@
+"""
+LXP - Advanced AI development Workshop: non-blocking tracing
+
+The Langfuse callback handler does its work (building trace objects,
+serializing prompts and outputs) inside the callbacks, that is, on the thread
+answering the user. BackgroundCallbackHandler wraps it: each callback only
+puts the event in a bounded in-memory queue, and a background worker hands the
+events to Langfuse, whose SDK sends them to the server in batches.
+
+If the queue is full (Langfuse slow or unreachable), events are dropped and
+counted instead of making the user wait. Dropping is done per run: once an
+event of a run is dropped, the rest of that run and its children are dropped
+too, so Langfuse never receives an "end" without its "start".
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, Optional, Set
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Callbacks that may be forwarded (only those the wrapped handler implements are)
+EVENTS = (
+    'on_llm_start', 'on_chat_model_start', 'on_llm_new_token', 'on_llm_end', 'on_llm_error',
+    'on_chain_start', 'on_chain_end', 'on_chain_error',
+    'on_tool_start', 'on_tool_end', 'on_tool_error',
+    'on_agent_action', 'on_agent_finish', 'on_text', 'on_retry',
+    'on_retriever_start', 'on_retriever_end', 'on_retriever_error',
+)
+
+# Events closing a run
+END_EVENTS = frozenset(name for name in EVENTS if name.endswith(('_end', '_error')))
+
+_STOP = object()
+
+
+class BackgroundCallbackHandler(BaseCallbackHandler):
+    """
+    Callback handler forwarding events to another handler from a background thread.
+
+    Args:
+        handler: Handler doing the actual work (e.g. the Langfuse handler)
+        max_events: Size of the queue; events arriving when it is full are dropped
+        batch_size: Maximum number of events handed over per worker wake-up
+        flush_interval: Seconds between two flushes of the wrapped handler
+            (if it has a `flush` method, as the Langfuse handler does)
+    """
+
+    # Queueing is cheap: run in the caller's thread, even for async runs,
+    # so events keep their order
+    run_inline = True
+
+    def __init__(self,
+                 handler: BaseCallbackHandler,
+                 max_events: int = 10000,
+                 batch_size: int = 100,
+                 flush_interval: float = 1.0):
+        self.handler = handler
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_events)
+
+        # Only forward what the wrapped handler implements
+        self._events = frozenset(
+            name for name in EVENTS
+            if getattr(type(handler), name, None) is not getattr(BaseCallbackHandler, name)
+        )
+
+        self._lock = threading.Lock()
+        self._dropped_runs: Set[UUID] = set()
+        self._streaming_runs: Set[UUID] = set()  # LLM runs whose first token was forwarded
+
+        self.sent = 0
+        self.dropped = 0
+        self.errors = 0
+
+        self._worker = threading.Thread(target=self._work, daemon=True, name="tracing-worker")
+        self._worker.start()
+        atexit.register(self.close)
+
+    def _enqueue(self, name: str, args, kwargs: Dict[str, Any]):
+        """Queue an event, or drop it (and the rest of its run) if the queue is full."""
+        if name not in self._events:
+            # Default behavior (e.g. on_chat_model_start raising NotImplementedError
+            # so that LangChain falls back to on_llm_start)
+            return getattr(BaseCallbackHandler, name)(self, *args, **kwargs)
+
+        run_id = kwargs.get('run_id')
+        parent_run_id = kwargs.get('parent_run_id')
+
+        with self._lock:
+            if name == 'on_llm_new_token':
+                # Tracing only needs the first token (time to first token)
+                if run_id in self._streaming_runs:
+                    return
+                self._streaming_runs.add(run_id)
+            elif name in END_EVENTS:
+                self._streaming_runs.discard(run_id)
+
+            if run_id in self._dropped_runs or parent_run_id in self._dropped_runs:
+                self._drop(name, run_id)
+                return
+
+            try:
+                self._queue.put_nowait((name, args, kwargs))
+            except queue.Full:
+                self._drop(name, run_id)
+
+    def _drop(self, name: str, run_id: Optional[UUID]):
+        """Count a dropped event and remember its run (lock held)."""
+        self.dropped += 1
+        get_metrics().increment("tracing.dropped")
+
+        if name in END_EVENTS:
+            self._dropped_runs.discard(run_id)  # Nothing more will come for this run
+        elif run_id is not None:
+            self._dropped_runs.add(run_id)
+
+    def _work(self):
+        """
+        Hand the queued events to the wrapped handler, and flush it every
+        `flush_interval` seconds so its export happens in batches.
+
+        While a flush waits on a slow server, events pile up in the queue,
+        which is what makes the handler drop them rather than block.
+        """
+        last_flush = time.monotonic()
+        pending = False  # Events forwarded since the last flush
+
+        while True:
+            timeout = max(last_flush + self.flush_interval - time.monotonic(), 0) if pending else None
+            try:
+                batch = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                batch = []
+            while batch and len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for event in batch:
+                if event is _STOP:
+                    self._flush_handler()
+                    return
+                self._forward(*event)
+                pending = True
+
+            if pending and time.monotonic() - last_flush >= self.flush_interval:
+                self._flush_handler()
+                last_flush = time.monotonic()
+                pending = False
+
+    def _forward(self, name: str, args, kwargs: Dict[str, Any]):
+        try:
+            getattr(self.handler, name)(*args, **kwargs)
+            self.sent += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Tracing handler failed on %s: %s", name, e)
+
+    def _flush_handler(self):
+        flush = getattr(self.handler, 'flush', None)
+        if flush is None:
+            return
+        try:
+            flush()
+        except Exception as e:
+            logger.warning("Tracing flush failed: %s", e)
+
+    def close(self, timeout: float = 5.0):
+        """
+        Send the queued events and stop the worker.
+
+        Args:
+            timeout: Maximum number of seconds to wait for the queue to drain
+        """
+        if not self._worker.is_alive():
+            return
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self._queue.put(_STOP, timeout=max(deadline - time.monotonic(), 0.01))
+                break
+            except queue.Full:
+                if time.monotonic() >= deadline:
+                    return
+        self._worker.join(max(deadline - time.monotonic(), 0))
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the tracing counters.
+
+        Returns:
+            Dict with sent, dropped, errors and queued (events waiting)
+        """
+        return {
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'queued': self._queue.qsize(),
+        }
+
+
+def _queueing_callback(name: str):
+    def callback(self, *args, **kwargs):
+        return self._enqueue(name, args, kwargs)
+    callback.__name__ = name
+    return callback
+
+
+# LangChain calls handlers' callbacks by name: give each event a method that queues it
+for _name in EVENTS:
+    setattr(BackgroundCallbackHandler, _name, _queueing_callback(_name))